@@ -0,0 +1,124 @@
+"""
+Size and read/write time of the attitude output formats.
+
+    python benchmarks/archive.py --days 10 --rate 1
+
+Writes ``--days`` days of synthetic attitude (the orbit-rate attitude of
+benchmarks/preprocess.py, with an outage) at one row every ``--rate``
+seconds in every output format, the archive with each of its codecs, and
+reports the size, the write time and the time to read the rows back into
+NumPy arrays: the CSV with pandas, the binary columns without memory
+mapping, the archive decoded whole and for one day.  The largest error of
+the archived values is reported against the quantisation bound.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from preprocess import START, attitude, panel_angles
+
+from preprocessors.attitude_output import (
+    ARCHIVE_CODECS,
+    ARCHIVE_QUANTUM,
+    ArchiveWriter,
+    open_writer,
+    read_archive,
+    read_binary_attitude,
+)
+
+COLUMNS = ["q0", "q1", "q2", "q3", "left_panel", "right_panel"]
+WRITE_ROWS = 1 << 18
+
+
+def frame(days: float, rate: float) -> pd.DataFrame:
+    seconds = np.arange(0.0, days * 86400.0, rate)
+    # A two-hour outage on the first day.
+    seconds = seconds[(seconds < 30000.0) | (seconds >= 37200.0)]
+    index = pd.DatetimeIndex(START + (seconds * 1e9).astype("timedelta64[ns]"))
+
+    return pd.DataFrame(
+        np.column_stack([attitude(seconds), panel_angles(seconds)]),
+        index=index,
+        columns=COLUMNS,
+    )
+
+
+def size(path: Path) -> int:
+    if path.is_dir():
+        return sum(file.stat().st_size for file in path.iterdir())
+
+    return path.stat().st_size
+
+
+def timed(function, *args):
+    begin = time.perf_counter()
+    result = function(*args)
+
+    return result, time.perf_counter() - begin
+
+
+def read_csv(path: Path) -> np.ndarray:
+    return pd.read_csv(path, sep=" ", header=None).to_numpy()
+
+
+def write(writer, df: pd.DataFrame) -> None:
+    with writer:
+        for first in range(0, len(df), WRITE_ROWS):
+            writer.write(df.iloc[first : first + WRITE_ROWS])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=float, default=5.0, help="Days of data.")
+    parser.add_argument("--rate", type=float, default=1.0, help="Row interval (s).")
+    args = parser.parse_args()
+
+    df = frame(args.days, args.rate)
+    day = (START.astype("datetime64[D]") + np.timedelta64(1, "D")).astype(
+        "datetime64[ns]"
+    )
+    # The first and last epoch of the second day, nanoseconds.
+    window = (int(day.astype(np.int64)), int(day.astype(np.int64)) + 86399 * 10**9)
+
+    print(f"{len(df)} rows, {args.days:g} days at {args.rate:g} s")
+    print(f"{'output':>14} {'MB':>10} {'write s':>9} {'read s':>9} {'day s':>9}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+
+        csv = directory / "q.csv"
+        _, written = timed(write, open_writer(csv, "csv"), df)
+        _, read = timed(read_csv, csv)
+        print(f"{'csv':>14} {size(csv) / 1e6:10.2f} {written:9.3f} {read:9.3f}")
+
+        binary = directory / "q.columns"
+        _, written = timed(write, open_writer(binary, "binary"), df)
+        _, read = timed(read_binary_attitude, binary, False)
+        print(f"{'binary':>14} {size(binary) / 1e6:10.2f} {written:9.3f} {read:9.3f}")
+
+        for codec in ARCHIVE_CODECS:
+            archive = directory / f"q_{codec}.qar"
+            _, written = timed(write, ArchiveWriter(archive, codec=codec), df)
+            columns, read = timed(read_archive, archive)
+            _, one_day = timed(read_archive, archive, *window)
+            print(
+                f"{'archive ' + codec:>14} {size(archive) / 1e6:10.2f} "
+                f"{written:9.3f} {read:9.3f} {one_day:9.3f}"
+            )
+
+            error = max(
+                np.abs(columns[name] - df[name].to_numpy()).max() for name in COLUMNS
+            )
+            print(
+                f"{'':>14} largest error {error:.3e} (bound {ARCHIVE_QUANTUM / 2:.1e})"
+            )
+
+
+if __name__ == "__main__":
+    main()
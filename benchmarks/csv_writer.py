@@ -0,0 +1,92 @@
+"""
+Throughput of the attitude CSV writer against the original pandas path.
+
+    python benchmarks/csv_writer.py --rows 1000000
+
+Both writers format the same synthetic Jason-like frame (quaternions plus
+two panel angles on a 1 s TT grid); the script checks that the files are
+identical and prints rows per second for each.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from preprocessors.attitude_output import CsvWriter
+from preprocessors.timescales import NANOSECONDS_PER_SECOND, split_mjd
+
+
+def synthetic_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    index = pd.DatetimeIndex(
+        np.datetime64("2024-01-01T00:00:00", "ns")
+        + np.arange(rows) * np.timedelta64(NANOSECONDS_PER_SECOND, "ns"),
+        name="date_time",
+    )
+    q = rng.normal(size=(rows, 4))
+    q /= np.linalg.norm(q, axis=1, keepdims=True)
+    panels = rng.uniform(-180.0, 180.0, (rows, 2))
+
+    return pd.DataFrame(
+        np.column_stack([q, panels]),
+        index=index,
+        columns=["q0", "q1", "q2", "q3", "left_panel", "right_panel"],
+    )
+
+
+def write_pandas(df: pd.DataFrame, path: Path) -> None:
+    mjd_days, nsec_of_day = split_mjd(df.index.values)
+
+    df = df.copy()
+    df["MJDay"] = mjd_days
+    df["SecOfDay"] = nsec_of_day / NANOSECONDS_PER_SECOND
+    df = df.reset_index(drop=True).set_index(["MJDay", "SecOfDay"])
+
+    with path.open("w", encoding="utf-8", newline="") as out:
+        df.dropna().to_csv(out, sep=" ", float_format="%.12e", header=False)
+
+
+def write_fast(df: pd.DataFrame, path: Path) -> None:
+    with CsvWriter(path) as writer:
+        writer.write(df)
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000, help="Rows to write.")
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pandas_file = Path(tmp) / "pandas.csv"
+        fast_file = Path(tmp) / "fast.csv"
+
+        results = {
+            "pandas": timed(write_pandas, df, pandas_file),
+            "CsvWriter": timed(write_fast, df, fast_file),
+        }
+
+        if pandas_file.read_bytes() != fast_file.read_bytes():
+            raise SystemExit("ERROR: CsvWriter output differs from the pandas output")
+
+    for name, seconds in results.items():
+        print(f"{name:>10}: {seconds:8.3f} s  {args.rows / seconds:12,.0f} rows/s")
+
+    print(f"{'speed-up':>10}: {results['pandas'] / results['CsvWriter']:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
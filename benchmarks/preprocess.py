@@ -0,0 +1,395 @@
+"""
+End-to-end and per-stage timing of preprocess_attitude on synthetic products.
+
+    python benchmarks/preprocess.py --days 2 --rate 1 --output results.json
+    python benchmarks/preprocess.py --families jason3 cryosat --compare results.json
+
+For every product family read_attitude_file handles (Jason-1 and Jason-2/3
+qbody/qsolp text, SWOT qbody text with qsolp XML, Sentinel DBL files in a
+tar archive, CryoSat EEF XML in a .TGZ) the script writes realistic
+synthetic products covering ``--days`` days at one body sample every
+``--rate`` seconds, runs preprocess_attitude on them and reports the total
+and per-stage times (see preprocessors.metrics).  Consecutive products
+overlap by half an hour, like the archived ones, so the merge does real
+work.  Everything runs offline in a temporary directory.
+
+Results are saved as JSON with ``--output``; ``--compare`` prints the
+speed-up of this run over an earlier results file, family by family and
+stage by stage.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import io
+import json
+import platform
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from preprocessors.attitude import preprocess_attitude
+from preprocessors.attitude_output import OUTPUT_FORMATS
+from preprocessors.metrics import RunMetrics
+
+START = np.datetime64("2024-01-01T00:00:00", "ns")
+NANOSECONDS_PER_SECOND = 1_000_000_000
+ORBIT_PERIOD = 6745.0
+PRODUCT_OVERLAP = 1800.0
+
+
+def attitude(seconds: np.ndarray) -> np.ndarray:
+    """Scalar-first quaternions: orbit-rate pitch plus yaw steering."""
+
+    pitch = 2.0 * np.pi * seconds / ORBIT_PERIOD
+    yaw = np.radians(15.0) * np.sin(pitch)
+    cp, sp = np.cos(pitch / 2.0), np.sin(pitch / 2.0)
+    cy, sy = np.cos(yaw / 2.0), np.sin(yaw / 2.0)
+
+    # Pitch about y, then yaw about z.
+    return np.column_stack([cp * cy, -sp * sy, sp * cy, cp * sy])
+
+
+def panel_angles(seconds: np.ndarray) -> np.ndarray:
+    """Left and right panel angles (degrees), tracking the orbit."""
+
+    phase = np.degrees(2.0 * np.pi * seconds / ORBIT_PERIOD) % 360.0 - 180.0
+
+    return np.column_stack([phase, phase + 0.2 * np.sin(seconds / 600.0)])
+
+
+def epochs(first: float, last: float, rate: float, jitter: bool) -> np.ndarray:
+    """Sample seconds since START in [first, last), with sub-ms jitter."""
+
+    seconds = np.arange(first, last, rate)
+
+    if jitter:
+        seconds += np.random.default_rng(int(first)).uniform(0.0, 1e-3, len(seconds))
+
+    return seconds
+
+
+def timestamps(seconds: np.ndarray, date_sep: str = "-", sep: str = " ") -> list[str]:
+    times = START + (seconds * NANOSECONDS_PER_SECOND).astype("timedelta64[ns]")
+    text = np.datetime_as_string(times, unit="us")
+
+    return [value.replace("-", date_sep).replace("T", sep) for value in text]
+
+
+def product_spans(days: float, length: float) -> list[tuple[float, float]]:
+    """(first, last) seconds of consecutive, overlapping products."""
+
+    total = days * 86400.0
+    starts = np.arange(0.0, total, length * 86400.0)
+
+    return [
+        (start, min(start + length * 86400.0 + PRODUCT_OVERLAP, total))
+        for start in starts
+    ]
+
+
+def tag(seconds: float, fmt: str = "%Y%m%d%H%M%S") -> str:
+    return (dt.datetime(2024, 1, 1) + dt.timedelta(seconds=seconds)).strftime(fmt)
+
+
+def write_text(path: Path, lines: list[str]) -> None:
+    path.write_text("\n".join(lines) + "\n")
+
+
+def jason1_products(directory: Path, days: float, rate: float, panel_rate: float):
+    for first, last in product_spans(days, 1.0):
+        seconds = epochs(first, last, rate, jitter=True)
+        stamps = timestamps(seconds, date_sep="/")
+        q = attitude(seconds)
+        write_text(
+            directory / f"ja1qbody{tag(first)}",
+            [
+                f"{t} {a:.15e} {b:.15e} {c:.15e} {d:.15e}"
+                for t, (a, b, c, d) in zip(stamps, q, strict=True)
+            ],
+        )
+
+        seconds = epochs(first, last, panel_rate, jitter=False)
+        stamps = timestamps(seconds, date_sep="/")
+        write_text(
+            directory / f"ja1qsolp{tag(first)}",
+            [
+                f"{t} {lp:.10f} {rp:.10f}"
+                for t, (lp, rp) in zip(stamps, panel_angles(seconds), strict=True)
+            ],
+        )
+
+    return "ja1"
+
+
+def _jason_body(path: Path, first: float, last: float, rate: float) -> None:
+    seconds = epochs(first, last, rate, jitter=True)
+    stamps = timestamps(seconds, date_sep="/")
+    write_text(
+        path,
+        ["# synthetic qbody"]
+        + [
+            f"{t} Q0 {a:.15e} x Q1 {b:.15e} x Q2 {c:.15e} x Q3 {d:.15e}"
+            for t, (a, b, c, d) in zip(stamps, attitude(seconds), strict=True)
+        ],
+    )
+
+
+def jason3_products(directory: Path, days: float, rate: float, panel_rate: float):
+    for first, last in product_spans(days, 1.0):
+        _jason_body(directory / f"ja3qbody{tag(first)}", first, last, rate)
+
+        seconds = epochs(first, last, panel_rate, jitter=False)
+        stamps = timestamps(seconds, date_sep="/")
+        write_text(
+            directory / f"ja3qsolp{tag(first)}",
+            [
+                f"{t} LP {lp:.10f} x RP {rp:.10f}"
+                for t, (lp, rp) in zip(stamps, panel_angles(seconds), strict=True)
+            ],
+        )
+
+    return "ja3"
+
+
+def swot_products(directory: Path, days: float, rate: float, panel_rate: float):
+    for first, last in product_spans(days, 1.0):
+        _jason_body(directory / f"swoqbody{tag(first)}", first, last, rate)
+
+        seconds = epochs(first, last, panel_rate, jitter=False)
+        stamps = timestamps(seconds, sep="T")
+        params = []
+
+        for stamp, (lp, rp) in zip(stamps, panel_angles(seconds), strict=True):
+            for mnemo, angle in [("PX", lp - 0.2), ("MX", rp + 0.2)]:
+                params.append(
+                    f"<PARAM><MNEMO>OBSSD_AM_ZESTSMPOS{mnemo}</MNEMO>"
+                    f"<ONBOARD_DATE>{stamp}Z</ONBOARD_DATE>"
+                    f"<ENG_VALUE>{angle * 120.0:.6f}</ENG_VALUE></PARAM>"
+                )
+
+        write_text(
+            directory / f"swoqsolp{tag(first)}.xml",
+            ["<ROOT><DATA><DATA_LIST>", *params, "</DATA_LIST></DATA></ROOT>"],
+        )
+
+    return "swo"
+
+
+def _add_member(archive: tarfile.TarFile, name: str, data: bytes) -> None:
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    archive.addfile(info, io.BytesIO(data))
+
+
+def sentinel_products(directory: Path, days: float, rate: float, panel_rate: float):
+    for first, last in product_spans(days, 1.0):
+        name = (
+            f"S6A_OPER_AUX_PROQUA_{tag(first, '%Y%m%dT%H%M%S')}_"
+            f"{tag(last, '%Y%m%dT%H%M%S')}_0001"
+        )
+        seconds = epochs(first, last, rate, jitter=False)
+        stamps = timestamps(seconds)
+        q = attitude(seconds)
+        # Products hold a few data blocks each.
+        blocks = np.array_split(np.arange(len(seconds)), 4)
+
+        with tarfile.open(directory / f"{name}.TGZ", "w:gz") as archive:
+            _add_member(archive, f"{name}/{name}.HDR", b"<Earth_Explorer_Header/>\n")
+
+            for number, rows in enumerate(blocks, start=1):
+                lines = ["# synthetic Sentinel attitude"] + [
+                    f"{stamps[i]} {q[i, 0]:.15e} {q[i, 1]:.15e} "
+                    f"{q[i, 2]:.15e} {q[i, 3]:.15e}"
+                    for i in rows
+                ]
+                data = ("\n".join(lines) + "\n").encode()
+                _add_member(archive, f"{name}/{name}_{number}.DBL", data)
+
+    return "s6a"
+
+
+def cryosat_products(directory: Path, days: float, rate: float, panel_rate: float):
+    # AUX_PROQUA products are long; one per 30 days.
+    for first, last in product_spans(days, 30.0):
+        name = (
+            f"CS_OPER_AUX_PROQUA_{tag(first, '%Y%m%dT%H%M%S')}_"
+            f"{tag(last, '%Y%m%dT%H%M%S')}_0001"
+        )
+        seconds = epochs(first, last, rate, jitter=False)
+        records = [
+            f"<Quaternions><Time>TAI={stamp}</Time><Q1>{b:.15e}</Q1>"
+            f"<Q2>{c:.15e}</Q2><Q3>{d:.15e}</Q3><Q4>{a:.15e}</Q4></Quaternions>"
+            for stamp, (a, b, c, d) in zip(
+                timestamps(seconds, sep="T"), attitude(seconds), strict=True
+            )
+        ]
+        document = "\n".join(
+            [
+                '<?xml version="1.0"?>',
+                '<Earth_Explorer_File xmlns="http://eop-cfi.esa.int/CFI">',
+                "<Data_Block><List_of_Quaternions>",
+                *records,
+                "</List_of_Quaternions></Data_Block></Earth_Explorer_File>",
+            ]
+        )
+
+        with tarfile.open(directory / f"{name}.TGZ", "w:gz") as archive:
+            _add_member(archive, f"{name}.HDR", b"<Earth_Explorer_Header/>\n")
+            _add_member(archive, f"{name}.EEF", document.encode())
+
+    return "cs2"
+
+
+FAMILIES = {
+    "jason1": jason1_products,
+    "jason3": jason3_products,
+    "swot": swot_products,
+    "sentinel": sentinel_products,
+    "cryosat": cryosat_products,
+}
+
+
+def benchmark(family: str, directory: Path, args: argparse.Namespace) -> dict:
+    raw = directory / family
+    raw.mkdir()
+
+    start = time.perf_counter()
+    satellite = FAMILIES[family](raw, args.days, args.rate, args.panel_rate)
+    generate_sec = time.perf_counter() - start
+    files = sorted(raw.iterdir())
+
+    runs = []
+
+    for _ in range(args.repeat):
+        metrics = RunMetrics(trace_memory=args.trace_memory)
+        output = preprocess_attitude(
+            satellite,
+            files,
+            nsec=args.nsec,
+            output_file=directory / f"{family}.out",
+            chunk_days=args.chunk_days,
+            output_format=args.output_format,
+            jobs=args.jobs,
+            metrics=metrics,
+        )
+        runs.append(metrics)
+
+    # The fastest run is the least disturbed by the rest of the machine.
+    best = min(runs, key=lambda metrics: metrics.stages["total"].wall_sec)
+    result = best.as_dict()
+
+    return {
+        "satellite": satellite,
+        "files": len(files),
+        "input_bytes": sum(file.stat().st_size for file in files),
+        "input_rows": best.stages["read"].rows_out,
+        "output_rows": best.stages["write"].rows_out,
+        "output": output.name,
+        "generate_sec": generate_sec,
+        "total_sec": best.stages["total"].wall_sec,
+        "all_total_sec": [metrics.stages["total"].wall_sec for metrics in runs],
+        **result,
+    }
+
+
+def compare(results: dict, previous: dict) -> None:
+    print(f"\nSpeed-up over the earlier run ({previous['config']['date']}):")
+
+    for family, result in results["results"].items():
+        before = previous["results"].get(family)
+
+        if before is None:
+            continue
+
+        print(f"  {family:<9} total {before['total_sec'] / result['total_sec']:6.2f}x")
+
+        for name, stage in result["stages"].items():
+            earlier = before["stages"].get(name)
+
+            if name != "total" and earlier and stage["wall_sec"] > 0:
+                ratio = earlier["wall_sec"] / stage["wall_sec"]
+                print(f"  {'':<9} {name:<12} {ratio:6.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--families",
+        nargs="+",
+        choices=sorted(FAMILIES),
+        default=list(FAMILIES),
+        help="Product families to benchmark. Default: all.",
+    )
+    parser.add_argument("--days", type=float, default=1.0, help="Days of data.")
+    parser.add_argument(
+        "--rate", type=float, default=1.0, help="Seconds between body samples."
+    )
+    parser.add_argument(
+        "--panel-rate",
+        type=float,
+        default=10.0,
+        help="Seconds between solar-panel samples (Jason, SWOT).",
+    )
+    parser.add_argument("--nsec", type=float, default=5.0, help="Output interval.")
+    parser.add_argument("--chunk-days", type=float, default=None)
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default="csv")
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Runs per family; the fastest is kept."
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Record peak traced memory per stage (slows the run down).",
+    )
+    parser.add_argument("--output", type=Path, help="Write the results to this JSON.")
+    parser.add_argument(
+        "--compare", type=Path, help="Earlier results JSON to compare against."
+    )
+    args = parser.parse_args()
+
+    results = {
+        "config": {
+            "date": dt.datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.platform(),
+            **{
+                key: str(value) if isinstance(value, Path) else value
+                for key, value in vars(args).items()
+            },
+        },
+        "results": {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for family in args.families:
+            result = benchmark(family, Path(tmp), args)
+            results["results"][family] = result
+
+            print(
+                f"{family:>9}: {result['input_rows']:>10,} rows in, "
+                f"{result['output_rows']:>9,} out, {result['total_sec']:8.3f} s"
+            )
+
+            for name, stage in result["stages"].items():
+                if name != "total":
+                    print(f"{'':>9}  {name:<12} {stage['wall_sec']:8.3f} s")
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.compare is not None:
+        compare(results, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
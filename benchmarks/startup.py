@@ -0,0 +1,173 @@
+"""
+Import time of every console entry point against a per-command budget.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --commands prepattitude sp3dwn --top 10
+
+Each entry point in pyproject.toml is imported in a fresh interpreter
+with ``python -X importtime``, ``--repeat`` times, and the fastest
+cumulative import time of its module is compared with its budget in
+BUDGETS_MS.  That is what ``<command> --help`` and every run pay before
+doing anything; interpreter start-up itself is not included.  Over budget,
+the slowest direct imports of the module are listed, and the script exits
+with status 1.
+
+Heavy dependencies (pandas, boto3, requests, matplotlib) are imported by
+the code paths that use them, so none of them should show up here.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tomllib
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Import-time budget of each command, in milliseconds.  prepattitude,
+# attserve and prepyda import numpy (the attitude output formats and the
+# service protocol) and PyYAML.
+BUDGETS_MS = {
+    "prepattitude": 200.0,
+    "attserve": 200.0,
+    "prepyda": 200.0,
+    "satmass": 100.0,
+    "rnxdwn": 100.0,
+    "sp3dwn": 100.0,
+    "vmfdwn": 100.0,
+    "ptroposnx": 100.0,
+}
+DEFAULT_BUDGET_MS = 100.0
+
+
+def entry_points() -> dict[str, str]:
+    """Command name -> module of the console scripts in pyproject.toml."""
+
+    with (ROOT / "pyproject.toml").open("rb") as fp:
+        scripts = tomllib.load(fp)["project"]["scripts"]
+
+    return {name: target.split(":")[0] for name, target in scripts.items()}
+
+
+def import_times(module: str) -> list[tuple[int, str, int]]:
+    """
+    ``-X importtime`` records of importing ``module`` in a new interpreter.
+
+    Returns (depth, module, cumulative microseconds) in the order Python
+    reports them: every module after the modules it imports.
+    """
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(ROOT / "src"), env.get("PYTHONPATH")])
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    records = []
+
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        records.append((depth, name.strip(), int(cumulative)))
+
+    return records
+
+
+def measure(module: str, repeat: int) -> tuple[float, list[tuple[str, float]]]:
+    """Fastest import time (ms) of ``module``, with its direct imports."""
+
+    best = None
+
+    for _ in range(repeat):
+        records = import_times(module)
+        position = max(
+            i for i, (depth, name, _) in enumerate(records) if name == module
+        )
+        total = records[position][2]
+
+        if best is None or total < best[0]:
+            # The direct imports of a module are the records one level down
+            # between it and the previous record at its own level.
+            depth = records[position][0]
+            first = position
+
+            while first > 0 and records[first - 1][0] > depth:
+                first -= 1
+
+            children = [
+                (name, micros / 1000.0)
+                for level, name, micros in records[first:position]
+                if level == depth + 1
+            ]
+            best = (total, children)
+
+    total, children = best
+
+    return total / 1000.0, sorted(children, key=lambda child: -child[1])
+
+
+def main() -> None:
+    commands = entry_points()
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--commands",
+        nargs="+",
+        choices=sorted(commands),
+        default=list(commands),
+        help="Commands to measure. Default: all in pyproject.toml.",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Imports per command; fastest is kept."
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Multiply every budget, for slower machines. Default: 1.",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=5,
+        help="Direct imports to list for commands over budget. Default: 5.",
+    )
+    args = parser.parse_args()
+
+    over = []
+
+    for command in args.commands:
+        module = commands[command]
+        budget = BUDGETS_MS.get(command, DEFAULT_BUDGET_MS) * args.scale
+        total, children = measure(module, args.repeat)
+        status = "ok" if total <= budget else "OVER"
+
+        print(
+            f"{command:>14}  {module:<24} {total:8.1f} ms "
+            f"(budget {budget:6.1f} ms)  {status}"
+        )
+
+        if total > budget:
+            over.append(command)
+
+            for name, child in children[: args.top]:
+                print(f"{'':>16}{name:<32} {child:8.1f} ms")
+
+    if over:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,9 @@ import datetime as dt
 import logging
 from pathlib import Path
 
-from sources import cddis, copernicus, cryosat
 from sources.attitude import SATELLITE_INFO, product_overlaps_range
-from preprocessors.attitude import preprocess_attitude
+from preprocessors.attitude_cache import DEFAULT_CACHE_MAX_BYTES
+from preprocessors.attitude_output import OUTPUT_FORMATS
 
 logger = logging.getLogger(__name__)
 
@@ -64,7 +64,11 @@ def download_attitude_files(
     satellite = satellite.lower()
     info = SATELLITE_INFO[satellite]
 
+    # Download clients are imported by the source that needs them: requests
+    # and boto3 take longer to import than the rest of the command.
     if info["source"] == "cddis":
+        from sources import cddis
+
         return cddis.download_attitude(
             satellite=satellite,
             start=start,
@@ -76,6 +80,8 @@ def download_attitude_files(
         )
 
     if info["source"] == "copernicus":
+        from sources import copernicus
+
         return copernicus.download_attitude(
             satellite=satellite,
             start=start,
@@ -87,6 +93,8 @@ def download_attitude_files(
         )
 
     if info["source"] == "cryosat":
+        from sources import cryosat
+
         return cryosat.download_attitude(
             satellite=satellite,
             start=start,
@@ -151,9 +159,70 @@ def build_parser() -> argparse.ArgumentParser:
         "-n",
         "--every-sec",
         dest="nsec",
-        default=5.0,
+        nargs="+",
+        default=[5.0],
+        type=float,
+        help=(
+            "Interpolation interval in seconds. Several intervals write one "
+            "output per interval (see --output-file) from a single pass over "
+            "the products."
+        ),
+    )
+
+    parser.add_argument(
+        "--max-gap",
+        default=None,
+        type=float,
+        metavar="SECONDS",
+        help=(
+            "Do not interpolate across gaps in the input attitude longer than "
+            "this many seconds; such epochs are left out of the output."
+        ),
+    )
+
+    parser.add_argument(
+        "--chunk-days",
+        default=None,
+        type=float,
+        metavar="DAYS",
+        help=(
+            "Process and write the output in chunks of this many days, to bound "
+            "memory use on long ranges. The output is the same as without it."
+        ),
+    )
+
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default=None,
+        type=int,
+        metavar="N",
+        help=(
+            "Parse the input attitude files in N worker processes. "
+            "Default: parse them one at a time."
+        ),
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help=(
+            "Cache the parsed input files in DIR, so files shared with earlier "
+            "runs are not parsed again. Default: no cache."
+        ),
+    )
+
+    parser.add_argument(
+        "--cache-max-mb",
         type=float,
-        help="Interpolation interval in seconds.",
+        default=DEFAULT_CACHE_MAX_BYTES / 1024**2,
+        metavar="MB",
+        help=(
+            "Size limit of the parse cache; least recently used entries are "
+            "removed first. Default: %(default).0f MB."
+        ),
     )
 
     parser.add_argument(
@@ -187,9 +256,96 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "-o",
         "--output-file",
+        nargs="+",
         type=Path,
         default=None,
-        help="Output CSV file. Default: qua_<satellite>.csv beside the input files.",
+        help=(
+            "Output file, one per --every-sec interval. Default (one interval "
+            "only): qua_<satellite>.csv (qua_<satellite>.columns for binary, "
+            "qua_<satellite>.qar for archive output) beside the input files."
+        ),
+    )
+
+    parser.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        default="csv",
+        help=(
+            "Output format: csv text, binary, a directory of memory-mappable "
+            "column files with a JSON header, or archive, a compressed file of "
+            "values quantised to 1e-10 and indexed by day, for long-term "
+            "storage. Default: csv."
+        ),
+    )
+
+    parser.add_argument(
+        "--partitioned",
+        action="store_true",
+        help=(
+            "Write one output file per TT day, named by its MJD, into the "
+            "--output-file directory (default qua_<satellite>.days), with an "
+            "index.json of the epochs and rows of each. Days that come out "
+            "unchanged are not rewritten."
+        ),
+    )
+
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        help=(
+            "Extend an existing output file instead of rebuilding it: only the "
+            "products near and after its end are processed. The result is the "
+            "same as a full rebuild."
+        ),
+    )
+
+    parser.add_argument(
+        "--backfill-days",
+        type=float,
+        default=None,
+        metavar="DAYS",
+        help=(
+            "Backfill a long range: process it in chunks of this many days on "
+            "--jobs worker processes and stitch them into the output, which is "
+            "the same as without it. Completed chunks are kept until the output "
+            "is written, so an interrupted backfill resumes where it stopped."
+        ),
+    )
+
+    parser.add_argument(
+        "--backfill-dir",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help=(
+            "Directory for the chunks of --backfill-days. "
+            "Default: <output-file>.backfill."
+        ),
+    )
+
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=None,
+        metavar="URAD",
+        help=(
+            "Decimate the output: write only the epochs needed to reproduce "
+            "every -n/--every-sec epoch by SLERP between consecutive rows "
+            "within this many microradians (panel angles within the same "
+            "value, in their own units). Default: write every epoch."
+        ),
+    )
+
+    parser.add_argument(
+        "--metrics",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help=(
+            "Write per-stage wall/CPU time, peak traced memory and row counts "
+            "of the preprocessing to FILE as JSON. Tracing memory slows the "
+            "run down somewhat."
+        ),
     )
 
     parser.add_argument(
@@ -216,7 +372,20 @@ def build_parser() -> argparse.ArgumentParser:
 
 
 def main() -> None:
-    args = build_parser().parse_args()
+    parser = build_parser()
+    args = parser.parse_args()
+
+    if (len(args.nsec) > 1 and args.output_file is None) or (
+        args.output_file is not None and len(args.output_file) != len(args.nsec)
+    ):
+        parser.error("give one --output-file for every --every-sec interval")
+
+    if args.backfill_days is not None and (
+        len(args.nsec) > 1 or args.append or args.chunk_days is not None
+    ):
+        parser.error(
+            "--backfill-days takes a single --every-sec and no --append or --chunk-days"
+        )
 
     logging.basicConfig(
         level=logging.DEBUG if args.verbose else logging.INFO,
@@ -245,14 +414,72 @@ def main() -> None:
             password=args.password,
         )
 
-    output_file = preprocess_attitude(
-        satellite=args.satellite,
-        qfns=files,
-        nsec=args.nsec,
-        start=args.begin,
-        end=args.end,
-        output_file=args.output_file,
-    )
+    # pandas is only needed once there is something to preprocess.
+    from preprocessors.attitude import preprocess_attitude
+    from preprocessors.metrics import RunMetrics
+
+    metrics = RunMetrics(trace_memory=args.metrics is not None)
+    nsec, output_file = args.nsec, args.output_file
+
+    if len(nsec) == 1:
+        nsec = nsec[0]
+        output_file = None if output_file is None else output_file[0]
+
+    tolerance = None if args.tolerance is None else args.tolerance * 1e-6
+
+    if args.backfill_days is not None:
+        from preprocessors.backfill import backfill_attitude
+
+        output_file = backfill_attitude(
+            satellite=args.satellite,
+            qfns=files,
+            start=args.begin,
+            end=args.end,
+            nsec=nsec,
+            output_file=output_file,
+            chunk_days=args.backfill_days,
+            jobs=args.jobs,
+            max_gap=args.max_gap,
+            output_format=args.output_format,
+            partitioned=args.partitioned,
+            tolerance=tolerance,
+            work_dir=args.backfill_dir,
+            cache_dir=args.cache_dir,
+            cache_max_bytes=int(args.cache_max_mb * 1024**2),
+            metrics=metrics,
+        )
+    else:
+        output_file = preprocess_attitude(
+            satellite=args.satellite,
+            qfns=files,
+            nsec=nsec,
+            start=args.begin,
+            end=args.end,
+            output_file=output_file,
+            max_gap=args.max_gap,
+            chunk_days=args.chunk_days,
+            output_format=args.output_format,
+            jobs=args.jobs,
+            cache_dir=args.cache_dir,
+            cache_max_bytes=int(args.cache_max_mb * 1024**2),
+            append=args.append,
+            tolerance=tolerance,
+            metrics=metrics,
+            partitioned=args.partitioned,
+        )
+
+    if args.metrics is not None:
+        metrics.write_json(
+            args.metrics,
+            satellite=args.satellite,
+            output_file=(
+                [str(file) for file in output_file]
+                if isinstance(output_file, list)
+                else str(output_file)
+            ),
+            files=len(files),
+        )
+        logger.info("Wrote metrics to %s", args.metrics)
 
     logger.info("Wrote %s", output_file)
 
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import signal
+import sys
+from pathlib import Path
+
+from preprocessors.attitude_cache import DEFAULT_CACHE_MAX_BYTES
+from preprocessors.attitude_service import (
+    DEFAULT_SERVICE_HOST,
+    DEFAULT_SERVICE_PORT,
+    SERVICE_POLL_SEC,
+    AttitudeService,
+    AttitudeSource,
+    make_server,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="attserve",
+        description=(
+            "Serve satellite attitude at arbitrary epochs to local jobs, from "
+            "preprocessed outputs or raw products kept loaded in memory and "
+            "reloaded when their files change."
+        ),
+    )
+
+    parser.add_argument(
+        "--output",
+        nargs=2,
+        action="append",
+        default=[],
+        metavar=("SATELLITE", "PATH"),
+        help=(
+            "Serve SATELLITE from a preprocessed output (CSV, binary, archive or "
+            "partitioned). May be given for several satellites."
+        ),
+    )
+
+    parser.add_argument(
+        "--products",
+        nargs="+",
+        action="append",
+        default=[],
+        metavar="SATELLITE PATTERN",
+        help=(
+            "Serve SATELLITE from the raw products matching the glob PATTERNs "
+            "(quote them), matched again on every check so that new products "
+            "are picked up. May be given for several satellites."
+        ),
+    )
+
+    parser.add_argument(
+        "--max-gap",
+        default=None,
+        type=float,
+        metavar="SECONDS",
+        help=(
+            "Answer NaN inside gaps in the attitude longer than this many "
+            "seconds. For preprocessed outputs it must exceed their interval."
+        ),
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help=(
+            "Cache the parsed raw products in DIR, so that reloads only parse "
+            "the new ones. Default: no cache."
+        ),
+    )
+
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=DEFAULT_CACHE_MAX_BYTES / 1024**2,
+        metavar="MB",
+        help="Size limit of the parse cache. Default: %(default).0f MB.",
+    )
+
+    parser.add_argument(
+        "--poll",
+        type=float,
+        default=SERVICE_POLL_SEC,
+        metavar="SECONDS",
+        help="Check the files for changes this often. Default: %(default)g s.",
+    )
+
+    address = parser.add_mutually_exclusive_group()
+
+    address.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help=f"Serve HTTP on this port of --host. Default: {DEFAULT_SERVICE_PORT}.",
+    )
+
+    address.add_argument(
+        "--socket",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="Serve HTTP on this Unix socket instead of a port.",
+    )
+
+    parser.add_argument(
+        "--host",
+        default=DEFAULT_SERVICE_HOST,
+        help="Address to serve --port on. Default: %(default)s.",
+    )
+
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Enable debug logging, including every request.",
+    )
+
+    return parser
+
+
+def main() -> None:
+    parser = build_parser()
+    args = parser.parse_args()
+
+    if not args.output and not args.products:
+        parser.error("give at least one --output or --products")
+
+    if any(len(products) < 2 for products in args.products):
+        parser.error("--products takes a satellite and at least one pattern")
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        style="{",
+        format="{levelname}: {name} ({funcName}) [{lineno}]: {message}",
+    )
+
+    options = dict(
+        max_gap=args.max_gap,
+        cache_dir=args.cache_dir,
+        cache_max_bytes=int(args.cache_max_mb * 1024**2),
+    )
+    sources = [
+        AttitudeSource(satellite, output=Path(path), **options)
+        for satellite, path in args.output
+    ]
+    sources += [
+        AttitudeSource(satellite, products=patterns, **options)
+        for satellite, *patterns in args.products
+    ]
+
+    port = None
+
+    if args.socket is None:
+        port = DEFAULT_SERVICE_PORT if args.port is None else args.port
+
+    try:
+        service = AttitudeService(sources, poll=args.poll)
+        server = make_server(
+            service, port=port, socket_path=args.socket, host=args.host
+        )
+    except ValueError as exc:
+        raise SystemExit(f"ERROR: {exc}") from exc
+
+    # Stopped by a service manager as by Ctrl-C: clean up either way.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    service.start()
+    logger.info(
+        "Serving attitude of %s on %s",
+        ", ".join(service.sources),
+        args.socket or f"http://{args.host}:{server.server_address[1]}",
+    )
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+
+        if args.socket is not None:
+            args.socket.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,6 @@ import datetime as dt
 import logging
 from pathlib import Path
 
-from sources import cddis, ign
 from sources.orbits import DEFAULT_ANALYSIS_CENTER
 
 
@@ -131,6 +130,8 @@ def download_sp3_files(args) -> list[Path]:
     source = args.source.lower()
 
     if source == "ign":
+        from sources import ign
+
         return ign.download_orbits(
             satellite=args.satellite,
             start=args.begin,
@@ -151,6 +152,9 @@ def download_sp3_files(args) -> list[Path]:
                 "CDDIS files will be downloaded compressed."
             )
 
+        # Imports requests, so only when it is used.
+        from sources import cddis
+
         return cddis.download_orbits(
             satellite=args.satellite,
             start=args.begin,
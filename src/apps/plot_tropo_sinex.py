@@ -42,13 +42,22 @@ from __future__ import annotations
 import argparse
 import datetime
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
-
-import matplotlib.dates as mdates
-import matplotlib.pyplot as plt
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from parsers.tropo_sinex import TropoSinex
 
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
+
 
 ScalarValue = Optional[float]
 StddevValue = Dict[str, Optional[float]]
@@ -246,6 +255,8 @@ def source_labels(paths: Sequence[Path]) -> Dict[Path, str]:
 def format_time_axis(ax: plt.Axes) -> None:
     """Apply a readable date/time formatter to the x-axis."""
 
+    import matplotlib.dates as mdates
+
     locator = mdates.AutoDateLocator(minticks=4, maxticks=10)
     formatter = mdates.ConciseDateFormatter(locator)
     ax.xaxis.set_major_locator(locator)
@@ -278,6 +289,9 @@ def make_plot(
     labels = source_labels(paths)
     multiple_files = len(sinex_items) > 1
 
+    # matplotlib is imported when plotting, not for --help or argument errors.
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots(figsize=(10, 5))
     ylabel = "STDDEV" if parameter == "STDDEV" else parameter
     total_plotted = 0
@@ -463,6 +463,15 @@ def preprocess_attitude_product(
     *,
     nsec: float,
     output_file: Path,
+    max_gap: float | None = None,
+    chunk_days: float | None = None,
+    output_format: str = "csv",
+    partitioned: bool = False,
+    jobs: int | None = None,
+    cache_dir: Path | None = None,
+    cache_max_mb: float = 2048.0,
+    append: bool = False,
+    tolerance_urad: float | None = None,
 ) -> Path:
     from preprocessors.attitude import preprocess_attitude
 
@@ -473,6 +482,15 @@ def preprocess_attitude_product(
         start=start,
         end=stop,
         output_file=output_file,
+        max_gap=max_gap,
+        chunk_days=chunk_days,
+        output_format=output_format,
+        partitioned=partitioned,
+        jobs=jobs,
+        cache_dir=cache_dir,
+        cache_max_bytes=int(cache_max_mb * 1024**2),
+        append=append,
+        tolerance=None if tolerance_urad is None else tolerance_urad * 1e-6,
     )
     return Path(file)
 
@@ -555,6 +573,15 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--ftp-password", default="anonymous@", help="FTP password for IGN SP3. Default: anonymous@")
 
     parser.add_argument("--attitude-every-sec", type=float, default=None, help="Attitude interpolation interval. Default: per-satellite YAML satellite-attitude[].every_sec/nsec or 5")
+    parser.add_argument("--attitude-max-gap", type=float, default=None, metavar="SECONDS", help="Do not interpolate attitude across input gaps longer than this. Default: interpolate across all gaps")
+    parser.add_argument("--attitude-chunk-days", type=float, default=None, metavar="DAYS", help="Preprocess attitude in chunks of this many days to bound memory use. Default: whole range at once")
+    parser.add_argument("--attitude-output-format", choices=("csv", "binary", "archive"), default="csv", help="Attitude output format: csv text, binary memory-mappable column files (qua_<sat>.columns) or archive, a compressed file of values quantised to 1e-10 for long-term storage (qua_<sat>.qar). Default: csv")
+    parser.add_argument("--attitude-partitioned", action="store_true", help="Write one attitude output file per TT day into a qua_<sat>.days directory with an index.json; days that come out unchanged are not rewritten. Not available for the archive format")
+    parser.add_argument("--jobs", type=int, default=None, metavar="N", help="Parse attitude input files in N worker processes. Default: one file at a time")
+    parser.add_argument("--attitude-cache-dir", type=Path, default=None, metavar="DIR", help="Cache parsed attitude input files in DIR so overlapping daily runs do not parse them again. Default: no cache")
+    parser.add_argument("--attitude-cache-max-mb", type=float, default=2048.0, metavar="MB", help="Size limit of the attitude parse cache; least recently used entries are removed first. Default: 2048")
+    parser.add_argument("--attitude-append", action="store_true", help="Extend existing qua_<sat> outputs with the new range instead of rebuilding them; the result matches a full rebuild")
+    parser.add_argument("--attitude-tolerance", type=float, default=None, metavar="URAD", help="Decimate attitude outputs: keep only the epochs needed to reproduce every grid epoch by SLERP within this many microradians")
     parser.add_argument("--s3cfg", type=Path, default=None, help="Copernicus S3 config for attitude products")
     parser.add_argument("--attitude-ftp-user", default=None, help="FTPS username for attitude products such as CryoSat-2. Default: CRYOSAT_FTP_USER")
     parser.add_argument("--attitude-ftp-password", default=None, help="FTPS password for attitude products such as CryoSat-2. Default: CRYOSAT_FTP_PASSWORD")
@@ -563,7 +590,12 @@ def build_parser() -> argparse.ArgumentParser:
 
 
 def main() -> int:
-    args = build_parser().parse_args()
+    parser = build_parser()
+    args = parser.parse_args()
+
+    if args.attitude_partitioned and args.attitude_output_format == "archive":
+        parser.error("--attitude-partitioned does not apply to archive output")
+
     logging.basicConfig(
         level=logging.DEBUG if args.verbose else logging.INFO,
         style="{",
@@ -731,6 +763,8 @@ def main() -> int:
             )
         elif "attitude" in products:
             def _attitude(cfg: SatelliteConfig = sat_cfg) -> None:
+                from preprocessors.attitude_output import default_output_file
+
                 out_dir = mkdir(data_dir_override or cfg.data_dir or (cfg.data_file.parent if cfg.data_file else attitude_dir))
                 raw_files = download_attitude_files(
                     cfg.satellite,
@@ -744,7 +778,12 @@ def main() -> int:
                 )
                 raw_files = keep_overlapping_attitude_files(raw_files, attitude_start, attitude_stop)
 
-                attitude_output = cfg.data_file or (out_dir / f"qua_{cfg.satellite}.csv")
+                attitude_output = cfg.data_file or default_output_file(
+                    out_dir,
+                    cfg.satellite,
+                    args.attitude_output_format,
+                    args.attitude_partitioned,
+                )
                 attitude_output.parent.mkdir(parents=True, exist_ok=True)
 
                 nsec = (
@@ -762,6 +801,15 @@ def main() -> int:
                     attitude_stop,
                     nsec=float(nsec),
                     output_file=attitude_output,
+                    max_gap=args.attitude_max_gap,
+                    chunk_days=args.attitude_chunk_days,
+                    output_format=args.attitude_output_format,
+                    partitioned=args.attitude_partitioned,
+                    jobs=args.jobs,
+                    cache_dir=args.attitude_cache_dir,
+                    cache_max_mb=args.attitude_cache_max_mb,
+                    append=args.attitude_append,
+                    tolerance_urad=args.attitude_tolerance,
                 )
                 append_result(results, f"attitude_raw:{cfg.satellite}", raw_files)
                 append_result(results, f"attitude_prepared:{cfg.satellite}", [prepared_file])
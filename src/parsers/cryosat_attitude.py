@@ -1,16 +1,35 @@
 from __future__ import annotations
 
-from datetime import datetime
-from pathlib import Path
 import tarfile
 import xml.etree.ElementTree as ET
+from collections.abc import Iterator
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import IO
 
+import numpy as np
 import pandas as pd
 
+from parsers.timestamps import parse_datetimes
+
 
 QUATERNION_XML_SUFFIXES = (".eef", ".xml")
 ARCHIVE_SUFFIXES = (".tgz", ".tar", ".tar.gz")
 
+# Tag of a quaternion record, its child tags and the output column of each.
+# The product stores vector-first Q1/Q2/Q3 and scalar Q4.
+RECORD_TAG = "Quaternions"
+RECORD_FIELDS = ("Time", "Q4", "Q1", "Q2", "Q3")
+QUATERNION_COLUMNS = ["q0", "q1", "q2", "q3"]
+
+# Records whose text is collected before it is converted in bulk.
+PARSE_BLOCK_ROWS = 8192
+
+# Rough size of a Quaternions record in the XML, used to size the output
+# arrays up front; they grow if it was too large.
+RECORD_BYTES_GUESS = 160
+
 
 def _local_name(tag: str) -> str:
     """Return an XML tag name without its namespace, if present."""
@@ -18,86 +37,117 @@ def _local_name(tag: str) -> str:
     return tag.rsplit("}", 1)[-1]
 
 
-def _children_by_local_name(element: ET.Element) -> dict[str, ET.Element]:
-    return {_local_name(child.tag): child for child in list(element)}
+def _parse_tai_timestamps(values: list[str]) -> np.ndarray:
+    """
+    Parse CryoSat quaternion timestamps into datetime64[ns] (TAI).
+
+    The specification uses values such as:
+        TAI=2019-11-02T21:55:23.000000
+    The reference may also be left out.
+    """
+
+    array = np.char.strip(np.array(values, dtype="S"))
+    reference, separator, stamp = np.char.partition(array, b"=").T
+    has_reference = separator != b""
+    unsupported = has_reference & (np.char.upper(np.char.strip(reference)) != b"TAI")
 
+    if unsupported.any():
+        bad = reference[unsupported][0].decode()
+        raise ValueError(f"Unsupported CryoSat time reference {bad!r}")
 
-def _required_child_text(element: ET.Element, child_name: str) -> str:
-    children = _children_by_local_name(element)
+    stamps = np.where(has_reference, stamp, reference)
 
     try:
-        child = children[child_name]
-    except KeyError as exc:
-        raise ValueError(f"Missing CryoSat quaternion XML tag {child_name!r}") from exc
+        return parse_datetimes(stamps)
+    except ValueError as exc:
+        raise ValueError(f"Unsupported CryoSat timestamp: {exc}") from exc
 
-    if child.text is None:
-        raise ValueError(f"Empty CryoSat quaternion XML tag {child_name!r}")
 
-    return child.text.strip()
+def _is_quaternion_xml_member(name: str) -> bool:
+    name = Path(name).name.lower()
+    return name.endswith(QUATERNION_XML_SUFFIXES)
 
 
-def _parse_tai_timestamp(value: str) -> datetime:
+@contextmanager
+def _open_xml(path: Path) -> Iterator[tuple[IO[bytes], int]]:
     """
-    Parse CryoSat quaternion timestamps.
+    Open a CryoSat .EEF XML file, directly or from a .TGZ/.tar archive.
 
-    The specification uses values such as:
-        TAI=2019-11-02T21:55:23.000000
+    Yields the binary stream and its size.  The archive member is read as it
+    is decompressed, never as a whole.
     """
 
-    value = value.strip()
+    if not path.name.lower().endswith(ARCHIVE_SUFFIXES):
+        with path.open("rb") as stream:
+            yield stream, path.stat().st_size
+        return
+
+    with tarfile.open(path, "r:*") as archive:
+        # Prefer the normal CryoSat Earth Explorer payload when more than one
+        # XML-like member is present, and the first by name among those.
+        candidates = [
+            member
+            for member in archive.getmembers()
+            if member.isfile() and _is_quaternion_xml_member(member.name)
+        ]
+
+        if not candidates:
+            raise ValueError(f"No .EEF/.xml file found inside CryoSat archive {path}")
+
+        candidates.sort(
+            key=lambda member: (
+                not Path(member.name).name.upper().endswith(".EEF"),
+                Path(member.name).name,
+            )
+        )
+        member = candidates[0]
+        stream = archive.extractfile(member)
 
-    if "=" in value:
-        reference, value = value.split("=", 1)
-        if reference.strip().upper() != "TAI":
-            raise ValueError(f"Unsupported CryoSat time reference {reference!r}")
+        if stream is None:
+            raise ValueError(
+                f"Could not read {member.name} from CryoSat archive {path}"
+            )
 
-    value = value.rstrip("Z")
+        with stream:
+            yield stream, member.size
 
-    for fmt in ("%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%dT%H:%M:%S"):
-        try:
-            return datetime.strptime(value, fmt)
-        except ValueError:
-            pass
 
-    raise ValueError(f"Unsupported CryoSat timestamp: {value!r}")
+def _records(stream: IO[bytes]) -> Iterator[list[str | None]]:
+    """
+    Texts of the RECORD_FIELDS of every Quaternions element, in file order
+    (None where a field is missing).
 
+    Every record is removed from the tree once it has been read, so memory
+    does not grow with the file.
+    """
 
-def _is_quaternion_xml_member(name: str) -> bool:
-    name = Path(name).name.lower()
-    return name.endswith(QUATERNION_XML_SUFFIXES)
+    # Qualified tags of the fields, by qualified tag of the record.
+    field_tags: dict[str, list[str]] = {}
+    # Open elements: the parent of a record is the last one.
+    open_elements: list[ET.Element] = []
 
+    for event, element in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            open_elements.append(element)
+            continue
 
-def _read_xml_bytes(path: Path) -> bytes:
-    """Read a CryoSat .EEF XML file, directly or from a .TGZ/.tar archive."""
+        open_elements.pop()
+        tag = element.tag
 
-    lower_name = path.name.lower()
+        if _local_name(tag) != RECORD_TAG:
+            continue
 
-    if lower_name.endswith(ARCHIVE_SUFFIXES):
-        with tarfile.open(path, "r:*") as archive:
-            candidates = [
-                member
-                for member in archive.getmembers()
-                if member.isfile() and _is_quaternion_xml_member(member.name)
-            ]
+        if tag not in field_tags:
+            namespace = tag[: -len(RECORD_TAG)]
+            field_tags[tag] = [namespace + field for field in RECORD_FIELDS]
 
-            if not candidates:
-                raise ValueError(f"No .EEF/.xml file found inside CryoSat archive {path}")
+        texts = {child.tag: child.text for child in element}
 
-            # Prefer the normal CryoSat Earth Explorer payload when more than one
-            # XML-like member is present.
-            candidates.sort(
-                key=lambda member: (
-                    not Path(member.name).name.upper().endswith(".EEF"),
-                    Path(member.name).name,
-                )
-            )
-            member = candidates[0]
-            stream = archive.extractfile(member)
-            if stream is None:
-                raise ValueError(f"Could not read {member.name} from CryoSat archive {path}")
-            return stream.read()
+        yield [texts.get(field) for field in field_tags[tag]]
 
-    return path.read_bytes()
+        # Records read before were removed, so this is the parent's only child.
+        if open_elements:
+            open_elements[-1].clear()
 
 
 def read_cryosat_quaternion_file(path: str | Path) -> pd.DataFrame:
@@ -108,36 +158,63 @@ def read_cryosat_quaternion_file(path: str | Path) -> pd.DataFrame:
     Q4.  The project preprocessor uses scalar-first q0/q1/q2/q3, so this reader
     maps Q4 -> q0 and Q1/Q2/Q3 -> q1/q2/q3.
 
+    The XML is parsed as a stream (iterparse), straight from the archive
+    member; the texts of PARSE_BLOCK_ROWS records at a time are converted in
+    bulk into NumPy arrays sized from the member up front.
+
     Returns a dataframe with columns:
         date_time, q0, q1, q2, q3
     """
 
     path = Path(path)
-    root = ET.fromstring(_read_xml_bytes(path))
-
-    rows: list[dict[str, object]] = []
-
-    for element in root.iter():
-        if _local_name(element.tag) != "Quaternions":
-            continue
+    rows = 0
+
+    with _open_xml(path) as (stream, size):
+        capacity = max(size // RECORD_BYTES_GUESS, PARSE_BLOCK_ROWS)
+        times = np.empty(capacity, dtype="datetime64[ns]")
+        quaternions = np.empty((capacity, 4), dtype=np.float64)
+        block: list[list[str | None]] = []
+        records = _records(stream)
+
+        while True:
+            block.clear()
+            block.extend(islice(records, PARSE_BLOCK_ROWS))
+
+            if not block:
+                break
+
+            if rows + len(block) > capacity:
+                capacity = max(2 * capacity, rows + len(block))
+                times = np.resize(times, capacity)
+                quaternions = np.resize(quaternions, (capacity, 4))
+
+            columns = list(zip(*block, strict=True))
+
+            for name, column in zip(RECORD_FIELDS, columns, strict=True):
+                if None in column:
+                    raise ValueError(
+                        f"Missing or empty CryoSat quaternion XML tag {name!r} in "
+                        f"{path}"
+                    )
+
+            stop = rows + len(block)
+            times[rows:stop] = _parse_tai_timestamps(columns[0])
+
+            try:
+                quaternions[rows:stop] = (
+                    np.array(columns[1:], dtype="S").astype(np.float64).T
+                )
+            except ValueError as exc:
+                raise ValueError(
+                    f"Invalid CryoSat quaternion in {path}: {exc}"
+                ) from exc
 
-        q1 = float(_required_child_text(element, "Q1"))
-        q2 = float(_required_child_text(element, "Q2"))
-        q3 = float(_required_child_text(element, "Q3"))
-        q4 = float(_required_child_text(element, "Q4"))
-        time = _parse_tai_timestamp(_required_child_text(element, "Time"))
-
-        rows.append(
-            {
-                "date_time": time,
-                "q0": q4,
-                "q1": q1,
-                "q2": q2,
-                "q3": q3,
-            }
-        )
+            rows = stop
 
     if not rows:
         raise ValueError(f"No CryoSat quaternion records found in {path}")
 
-    return pd.DataFrame.from_records(rows, columns=["date_time", "q0", "q1", "q2", "q3"])
+    df = pd.DataFrame(quaternions[:rows], columns=QUATERNION_COLUMNS)
+    df.insert(0, "date_time", times[:rows])
+
+    return df
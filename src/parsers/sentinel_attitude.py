@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import io
+import queue
+import tarfile
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pandas as pd
+
+from parsers.timestamps import combine_date_time
+
+
+DBL_SUFFIX = ".DBL"
+
+# Decompressed tar blocks handed from the reader thread to the parser, and how
+# many of them may be waiting at a time.
+READ_AHEAD_BLOCK = 1 << 20
+READ_AHEAD_DEPTH = 8
+
+QUATERNION_COLUMNS = ["q0", "q1", "q2", "q3"]
+
+
+class _Stopped(Exception):
+    """Raised in the reader thread when the consumer has gone away."""
+
+
+def _is_dbl_member(member: tarfile.TarInfo) -> bool:
+    return member.isfile() and Path(member.name).name.upper().endswith(DBL_SUFFIX)
+
+
+def _put(blocks: queue.Queue, stop: threading.Event, item: tuple) -> None:
+    while not stop.is_set():
+        try:
+            blocks.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+    raise _Stopped
+
+
+def _read_archive(path: Path, blocks: queue.Queue, stop: threading.Event) -> None:
+    """
+    Reader thread: decompress the DBL members of a tar archive into ``blocks``.
+
+    Each member is sent as ("member", name), a run of ("data", bytes) and
+    ("end", None); the archive ends with ("done", None), or ("error", exc).
+    The archive is read as a stream, front to back, without seeking.
+    """
+
+    try:
+        with tarfile.open(path, "r|*") as archive:
+            for member in archive:
+                if not _is_dbl_member(member):
+                    continue
+
+                stream = archive.extractfile(member)
+                _put(blocks, stop, ("member", member.name))
+
+                while block := stream.read(READ_AHEAD_BLOCK):
+                    _put(blocks, stop, ("data", block))
+
+                _put(blocks, stop, ("end", None))
+
+        _put(blocks, stop, ("done", None))
+
+    except _Stopped:
+        pass
+
+    except BaseException as exc:
+        try:
+            _put(blocks, stop, ("error", exc))
+        except _Stopped:
+            pass
+
+
+class _MemberReader(io.RawIOBase):
+    """File-like view of one member's blocks as queued by _read_archive."""
+
+    def __init__(self, blocks: queue.Queue) -> None:
+        self._blocks = blocks
+        self._data = memoryview(b"")
+        self.exhausted = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._data and not self.exhausted:
+            kind, value = self._blocks.get()
+
+            if kind == "data":
+                self._data = memoryview(value)
+            elif kind == "end":
+                self.exhausted = True
+            elif kind == "error":
+                raise value
+
+        size = min(len(buffer), len(self._data))
+        buffer[:size] = self._data[:size]
+        self._data = self._data[size:]
+
+        return size
+
+    def drain(self) -> None:
+        while self.readinto(bytearray(READ_AHEAD_BLOCK)):
+            pass
+
+
+def _dbl_members(path: Path) -> Iterator[tuple[str, io.BufferedReader]]:
+    """
+    Yield (name, stream) for the DBL members of a tar archive, in order.
+
+    Decompression runs in a background thread, READ_AHEAD_DEPTH blocks ahead
+    of the consumer, so it overlaps with parsing.  Each stream must be used
+    before advancing to the next member.
+    """
+
+    blocks: queue.Queue = queue.Queue(maxsize=READ_AHEAD_DEPTH)
+    stop = threading.Event()
+    reader = threading.Thread(
+        target=_read_archive,
+        args=(path, blocks, stop),
+        name=f"tar-reader-{path.name}",
+        daemon=True,
+    )
+    reader.start()
+
+    try:
+        while True:
+            kind, value = blocks.get()
+
+            if kind == "done":
+                return
+
+            if kind == "error":
+                raise value
+
+            member = _MemberReader(blocks)
+            yield value, io.BufferedReader(member, buffer_size=READ_AHEAD_BLOCK)
+            member.drain()
+
+    finally:
+        stop.set()
+        reader.join()
+
+
+def _read_dbl(stream) -> pd.DataFrame:
+    df = pd.read_csv(
+        stream,
+        sep=r"\s+",
+        comment="#",
+        header=None,
+        usecols=[0, 1, 2, 3, 4, 5],
+        names=["_date", "_time", *QUATERNION_COLUMNS],
+        dtype={"_date": object, "_time": object},
+    )
+
+    df["date_time"] = combine_date_time(
+        df.pop("_date").to_numpy(),
+        df.pop("_time").to_numpy(),
+    )
+
+    return df
+
+
+def read_sentinel_attitude_file(path: str | Path) -> pd.DataFrame:
+    """
+    Read a Sentinel attitude product: a .DBL file, or a tar archive of them.
+
+    DBL members are parsed straight from the (decompressed) tar stream;
+    nothing is extracted to disk.  The members of one archive are returned
+    concatenated in archive order.
+
+    Returns a dataframe with columns:
+        q0, q1, q2, q3, date_time
+    """
+
+    path = Path(path)
+
+    if path.name.upper().endswith(DBL_SUFFIX):
+        return _read_dbl(path)
+
+    frames = [_read_dbl(stream) for _, stream in _dbl_members(path)]
+
+    if not frames:
+        raise ValueError(f"No .DBL file found inside Sentinel archive {path}")
+
+    return pd.concat(frames, ignore_index=True)
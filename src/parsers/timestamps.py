@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+NANOSECONDS_PER_SECOND = 1_000_000_000
+NANOSECONDS_PER_DAY = 86_400 * NANOSECONDS_PER_SECOND
+
+_ZERO = ord("0")
+
+# Days in each month of a common year; February gains one in leap years.
+_MONTH_DAYS = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+def _as_byte_matrix(values, width: int | None = None) -> np.ndarray:
+    """
+    Return fixed-width byte strings as a (N, width) uint8 matrix.
+
+    Shorter strings are NUL-padded on the right, which is what NumPy does for
+    ``S`` arrays anyway.
+    """
+
+    array = np.asarray(values)
+
+    if array.dtype.kind != "S":
+        # Object arrays of str (what pandas hands out) encode straight to ASCII.
+        array = array.astype("S")
+
+    array = np.char.strip(array)
+    itemsize = max(array.dtype.itemsize, 1)
+
+    if width is not None and itemsize < width:
+        array = array.astype(f"S{width}")
+        itemsize = width
+
+    array = np.ascontiguousarray(array)
+
+    return array.view(np.uint8).reshape(len(array), itemsize)
+
+
+def _row(matrix: np.ndarray, index: int) -> bytes:
+    return matrix[index].tobytes().rstrip(b"\0")
+
+
+def _digits(matrix: np.ndarray, start: int, stop: int) -> np.ndarray:
+    """Decode the fixed digit field matrix[:, start:stop] into int64."""
+
+    field = matrix[:, start:stop].astype(np.int64) - _ZERO
+
+    if field.size and ((field < 0) | (field > 9)).any():
+        bad = np.flatnonzero(((field < 0) | (field > 9)).any(axis=1))[0]
+        raise ValueError(
+            f"Invalid digits in timestamp field at row {bad}: {_row(matrix, bad)!r}"
+        )
+
+    value = np.zeros(len(field), dtype=np.int64)
+    for column in range(field.shape[1]):
+        value = value * 10 + field[:, column]
+
+    return value
+
+
+def _check_separators(matrix: np.ndarray, positions: dict[int, bytes]) -> None:
+    for position, allowed in positions.items():
+        column = matrix[:, position]
+        ok = np.isin(column, np.frombuffer(allowed, dtype=np.uint8))
+        if not ok.all():
+            bad = np.flatnonzero(~ok)[0]
+            raise ValueError(
+                f"Unexpected timestamp separator at row {bad}: {_row(matrix, bad)!r}"
+            )
+
+
+def days_from_civil(year: np.ndarray, month: np.ndarray, day: np.ndarray) -> np.ndarray:
+    """
+    Return days since 1970-01-01 for proleptic Gregorian calendar dates.
+
+    Vectorized version of H. Hinnant's ``days_from_civil`` algorithm.
+    """
+
+    year = year - (month <= 2)
+    era = np.floor_divide(year, 400)
+    yoe = year - era * 400
+    mp = (month + 9) % 12
+    doy = (153 * mp + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+
+    return era * 146097 + doe - 719468
+
+
+def _month_days(year: np.ndarray, month: np.ndarray) -> np.ndarray:
+    """Number of days in the given months (1-12) of the proleptic calendar."""
+
+    leap = ((year % 4 == 0) & (year % 100 != 0)) | (year % 400 == 0)
+
+    return _MONTH_DAYS[month - 1] + (leap & (month == 2))
+
+
+def parse_dates(values) -> np.ndarray:
+    """
+    Parse ``YYYY/MM/DD`` or ``YYYY-MM-DD`` strings into int64 days since
+    1970-01-01.
+    """
+
+    matrix = _as_byte_matrix(values, width=10)
+    _check_separators(matrix, {4: b"/-"})
+
+    invalid = (matrix[:, 7] != matrix[:, 4]) | matrix[:, 10:].any(axis=1)
+
+    if invalid.any():
+        bad = np.flatnonzero(invalid)[0]
+        raise ValueError(f"Invalid date format: {_row(matrix, bad)!r}")
+
+    year = _digits(matrix, 0, 4)
+    month = _digits(matrix, 5, 7)
+    day = _digits(matrix, 8, 10)
+
+    invalid = (month < 1) | (month > 12) | (day < 1)
+    invalid[~invalid] = day[~invalid] > _month_days(year[~invalid], month[~invalid])
+
+    if invalid.any():
+        bad = np.flatnonzero(invalid)[0]
+        raise ValueError(f"Invalid calendar date: {_row(matrix, bad)!r}")
+
+    return days_from_civil(year, month, day)
+
+
+def parse_times(values) -> np.ndarray:
+    """
+    Parse ``HH:MM:SS[.f...]`` strings into int64 nanoseconds of day.
+
+    Up to nine fractional digits are honoured; rows with fewer digits are
+    right-padded with zeros.  Leap seconds (``:60``) are rejected, as by
+    pandas.
+    """
+
+    matrix = _as_byte_matrix(values, width=8)
+
+    if len(matrix):
+        # A trailing UTC designator carries no information here.
+        last = np.count_nonzero(matrix, axis=1) - 1
+        rows = np.flatnonzero(matrix[np.arange(len(matrix)), last] == ord("Z"))
+        matrix[rows, last[rows]] = 0
+
+    _check_separators(matrix, {2: b":", 5: b":"})
+
+    hour = _digits(matrix, 0, 2)
+    minute = _digits(matrix, 3, 5)
+    second = _digits(matrix, 6, 8)
+
+    invalid = (hour > 23) | (minute > 59) | (second > 59)
+
+    if invalid.any():
+        bad = np.flatnonzero(invalid)[0]
+        raise ValueError(f"Invalid time of day: {_row(matrix, bad)!r}")
+
+    nsec = (hour * 3600 + minute * 60 + second) * NANOSECONDS_PER_SECOND
+
+    if matrix.shape[1] > 18 and matrix[:, 18:].any():
+        bad = np.flatnonzero(matrix[:, 18:].any(axis=1))[0]
+        raise ValueError(
+            f"More than nine fractional second digits: {_row(matrix, bad)!r}"
+        )
+
+    if matrix.shape[1] > 8:
+        _check_separators(matrix[matrix[:, 8] != 0], {8: b"."})
+
+    if matrix.shape[1] > 9:
+        fraction = matrix[:, 9:18].copy()
+        # NUL padding of shorter rows counts as trailing zeros.
+        fraction[fraction == 0] = _ZERO
+        ndigits = fraction.shape[1]
+        nsec += _digits(fraction, 0, ndigits) * 10 ** (9 - ndigits)
+
+    return nsec
+
+
+def parse_datetimes(values) -> np.ndarray:
+    """
+    Parse ``YYYY-MM-DD?HH:MM:SS[.f...]`` strings into datetime64[ns].
+
+    The character between date and time may be a space or ``T``; the date may
+    also use ``/``, and the time may end in ``Z``.
+    """
+
+    matrix = _as_byte_matrix(values, width=19)
+    _check_separators(matrix, {10: b"T "})
+
+    days = parse_dates(matrix[:, :10].copy().view("S10").ravel())
+    nsec = parse_times(
+        np.ascontiguousarray(matrix[:, 11:]).view(f"S{matrix.shape[1] - 11}").ravel()
+    )
+
+    return (days * NANOSECONDS_PER_DAY + nsec).view("datetime64[ns]")
+
+
+def combine_date_time(dates, times) -> np.ndarray:
+    """Parse separate date and time columns into datetime64[ns]."""
+
+    days = parse_dates(dates)
+    nsec = parse_times(times)
+
+    if len(days) != len(nsec):
+        raise ValueError("Date and time columns have different lengths")
+
+    return (days * NANOSECONDS_PER_DAY + nsec).view("datetime64[ns]")
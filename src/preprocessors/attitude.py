@@ -1,17 +1,43 @@
 from __future__ import annotations
 
+import bisect
+import datetime as dt
 import logging
-import tarfile
+import re
+from collections import deque
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import chain, islice, tee, zip_longest
+from operator import itemgetter
 from pathlib import Path
 
-import astropy.time as atime
 import numpy as np
 import pandas as pd
-from scipy.spatial.transform import Rotation as R
-from scipy.spatial.transform import Slerp
 
 from parsers.cryosat_attitude import read_cryosat_quaternion_file
+from parsers.sentinel_attitude import read_sentinel_attitude_file
 from parsers.swot_attitude import read_swot_qsolp_xml
+from parsers.timestamps import combine_date_time
+from preprocessors.attitude_cache import DEFAULT_CACHE_MAX_BYTES, ParsedFileCache
+from preprocessors.attitude_output import (
+    check_output_format,
+    default_output_file,
+    last_output_epoch,
+    open_writer,
+    output_prefix,
+)
+from preprocessors.decimation import Decimator
+from preprocessors.interpolation import interp_linear, slerp
+from preprocessors.merge import MergeStats, merge_pair, merge_runs, sorted_run
+from preprocessors.metrics import RunMetrics
+from preprocessors.timescales import (
+    NANOSECONDS_PER_SECOND,
+    as_nanoseconds,
+    convert,
+    to_tt,
+)
+from sources.attitude import parse_product_range
 
 
 logger = logging.getLogger(__name__)
@@ -29,6 +55,22 @@ SUPPORTED_SATELLITES = (
     | CRYOSAT_SATELLITES
 )
 
+# Bump whenever a reader or the time conversion changes what is parsed out of
+# a raw product; this invalidates the parsed-file cache.
+READER_VERSION = "1"
+
+# Seconds before the end of an existing output from which an append
+# recomputes it; new products must not start earlier than that.
+APPEND_MARGIN = 6 * 3600.0
+
+# Seconds by which the products read for a [start, end) range reach past its
+# edges, since the times in product names need not match the samples exactly.
+PRODUCT_RANGE_MARGIN = 6 * 3600.0
+
+# Samples read on either side of a requested time window: enough to bracket
+# its edges, and to leave every product at least two samples.
+WINDOW_PAD = 2
+
 QUATERNION_COLUMNS = ["q0", "q1", "q2", "q3"]
 SOLAR_PANEL_COLUMNS = ["left_panel", "right_panel"]
 
@@ -59,17 +101,25 @@ def _read_text_attitude_file(
         header=None,
         usecols=usecols,
         names=names,
+        dtype={"_date": object, "_time": object},
     )
 
-    df["date_time"] = pd.to_datetime(
-        df["_date"].astype(str) + " " + df["_time"].astype(str),
-        format="%Y/%m/%d %H:%M:%S.%f",
+    # Parse the fixed-width YYYY/MM/DD and HH:MM:SS.ffffff columns straight
+    # into int64 nanoseconds instead of joining and reparsing strings.
+    date_time = combine_date_time(
+        df.pop("_date").to_numpy(),
+        df.pop("_time").to_numpy(),
     )
+    df["date_time"] = date_time
 
-    return df.drop(columns=["_date", "_time"])
+    return df
 
 
-def read_attitude_file(satellite: str, qfile: str | Path) -> pd.DataFrame:
+def read_attitude_file(
+    satellite: str,
+    qfile: str | Path,
+    window: tuple | None = None,
+) -> pd.DataFrame:
     """
     Read one local attitude file.
 
@@ -78,8 +128,57 @@ def read_attitude_file(satellite: str, qfile: str | Path) -> pd.DataFrame:
 
     or:
         date_time, left_panel, right_panel
+
+    With ``window``, a (start, end) pair of epochs in the time scale of the
+    file (datetime64 or int64 nanoseconds, either may be None), only the
+    records inside it are returned, with the WINDOW_PAD records on either
+    side of it; see _window_mask.
+    """
+
+    df = _read_attitude_file(satellite, qfile)
+
+    if window is None:
+        return df
+
+    times = as_nanoseconds(df["date_time"].to_numpy(dtype="datetime64[ns]"))
+    keep = _window_mask(times, window)
+
+    return df if keep.all() else df[keep].reset_index(drop=True)
+
+
+def _window_mask(times: np.ndarray, window: tuple) -> np.ndarray:
     """
+    Mask of the int64 ``times`` inside ``window`` (start, end), or among the
+    WINDOW_PAD latest before it or earliest after it.
 
+    ``times`` need not be sorted; the mask keeps their order.
+    """
+
+    keep = np.ones(len(times), dtype=bool)
+
+    for bound, outside in zip(window, (np.less, np.greater), strict=True):
+        if bound is None:
+            continue
+
+        beyond = outside(times, int(as_nanoseconds(bound)))
+
+        if not beyond.any():
+            continue
+
+        # The WINDOW_PAD epochs beyond the bound nearest to it.
+        nearest = times[beyond] if outside is np.greater else -times[beyond]
+        pad = min(WINDOW_PAD, len(nearest))
+        limit = np.partition(nearest, pad - 1)[pad - 1]
+
+        if outside is np.less:
+            limit = -limit
+
+        keep &= ~beyond | ~outside(times, limit)
+
+    return keep
+
+
+def _read_attitude_file(satellite: str, qfile: str | Path) -> pd.DataFrame:
     satellite = satellite.lower()
     qfile = Path(qfile)
     name = qfile.name.lower()
@@ -130,11 +229,24 @@ def read_attitude_file(satellite: str, qfile: str | Path) -> pd.DataFrame:
         raise ValueError(f"Cannot identify attitude file type: {qfile}")
 
     if satellite in SENTINEL_SATELLITES:
-        return _read_text_attitude_file(
-            qfile,
-            usecols=[0, 1, 2, 3, 4, 5],
-            names=["_date", "_time", *QUATERNION_COLUMNS],
-        )
+        return read_sentinel_attitude_file(qfile)
+
+    raise ValueError(f"Unsupported satellite: {satellite}")
+
+
+def _time_scale(satellite: str) -> str:
+    """Time scale of the epochs in the products of a satellite."""
+
+    satellite = satellite.lower()
+
+    if satellite in JASON_SATELLITES | SWOT_SATELLITES:
+        return "utc"
+
+    if satellite in SENTINEL_SATELLITES:
+        return "gpst"
+
+    if satellite in CRYOSAT_SATELLITES:
+        return "tai"
 
     raise ValueError(f"Unsupported satellite: {satellite}")
 
@@ -144,167 +256,170 @@ def _fix_time(satellite: str, df: pd.DataFrame) -> pd.DataFrame:
     Convert input times to TT datetime64 and set them as the dataframe index.
 
     Jason and SWOT files are treated as UTC.
-    Sentinel files are treated as GPST, represented as TAI after adding 19 seconds.
+    Sentinel files are treated as GPST (TAI - 19 seconds).
     CryoSat-2 AUX_PROQUA data-block times are treated as TAI.
     """
 
-    satellite = satellite.lower()
-
-    if satellite in JASON_SATELLITES | SWOT_SATELLITES:
-        tt = atime.Time(df["date_time"].to_numpy(), scale="utc").tt
-
-    elif satellite in SENTINEL_SATELLITES:
-        tai_datetimes = df["date_time"] + np.timedelta64(19, "s")
-        tt = atime.Time(tai_datetimes.to_numpy(), scale="tai").tt
-
-    elif satellite in CRYOSAT_SATELLITES:
-        tt = atime.Time(df["date_time"].to_numpy(), scale="tai").tt
-
-    else:
-        raise ValueError(f"Unsupported satellite: {satellite}")
+    scale = _time_scale(satellite)
 
     df = df.copy()
-    df["date_time"] = tt.to_value(format="datetime64")
+    df["date_time"] = to_tt(df["date_time"].to_numpy(dtype="datetime64[ns]"), scale)
 
     return df.set_index("date_time")
 
 
-def _time_to_mjd_and_sod(
-    time_array, scale: str = "tt"
-) -> tuple[np.ndarray, np.ndarray]:
-    t = atime.Time(time_array, format="datetime64", scale=scale)
-    mjd_days = t.mjd.astype(int)
-    sec_of_day = (t.mjd - mjd_days) * 86400.0
-
-    return mjd_days, sec_of_day
-
 def _deduplicate_attitude(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.sort_index()
+    if df.index.is_monotonic_increasing and df.index.is_unique:
+        return df
+
+    df = df.sort_index(kind="stable")
 
     # For exact duplicate timestamps, keep the last product's value.
     # Do not arithmetic-average quaternions.
     return df[~df.index.duplicated(keep="last")]
 
-def _interpolate(
-    df: pd.DataFrame,
-    nsec: float,
-    times: np.ndarray | None = None,
-) -> tuple[pd.DataFrame, np.ndarray]:
+
+def _interval_to_nanoseconds(nsec: float) -> int:
+    if nsec <= 0:
+        raise ValueError("Interpolation interval nsec must be positive")
+
+    step = int(round(nsec * NANOSECONDS_PER_SECOND))
+
+    if step <= 0:
+        raise ValueError(f"Interpolation interval {nsec} s is below 1 ns")
+
+    return step
+
+
+def _output_grid(first: int, last: int, nsec: float) -> np.ndarray:
     """
-    Interpolate either body quaternions or solar-panel angles.
+    Return the int64 TT nanosecond epochs of the output grid within [first, last].
 
-    Quaternion interpolation uses SLERP.
-    Solar-panel interpolation is linear in time.
+    Grid epochs are integer multiples of the interval, counted from
+    1970-01-01T00:00:00 TT, so for intervals dividing a day they fall on the
+    same seconds of day every day.
     """
 
+    step = _interval_to_nanoseconds(nsec)
+    grid_start = -(-first // step) * step
+
+    return np.arange(grid_start, last + 1, step, dtype=np.int64)
+
+
+def _prepare_source(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         raise ValueError("Cannot interpolate an empty dataframe")
 
-    # df = df.sort_index().groupby(df.index).mean()
     df = _deduplicate_attitude(df)
 
-    source_times = atime.Time(df.index.values, scale="tt").mjd
-
-    if len(source_times) < 2:
-        raise ValueError("At least two unique attitude epochs are required for interpolation")
+    if len(df) < 2:
+        raise ValueError(
+            "At least two unique attitude epochs are required for interpolation"
+        )
 
-    if nsec <= 0:
-        raise ValueError("Interpolation interval nsec must be positive")
+    return df
 
-    if times is None:
-        step = nsec / 86400.0
-        n_steps = int(np.floor((source_times[-1] - source_times[0]) / step)) + 1
-        times = source_times[0] + np.arange(n_steps, dtype=float) * step
-        times = times[times <= source_times[-1]]
 
+def _attitude_columns(df: pd.DataFrame) -> list[str]:
     if all(col in df.columns for col in QUATERNION_COLUMNS):
-        logger.info("Interpolating body quaternions")
-
-        quaternions = df[QUATERNION_COLUMNS].to_numpy()
+        return QUATERNION_COLUMNS
 
-        rotations = R.from_quat(quaternions, scalar_first=True)
-        slerp = Slerp(source_times, rotations)
-        interpolated = slerp(times)
+    if all(col in df.columns for col in SOLAR_PANEL_COLUMNS):
+        return SOLAR_PANEL_COLUMNS
 
-        out = pd.DataFrame(
-            data=interpolated.as_quat(scalar_first=True),
-            index=times,
-            columns=QUATERNION_COLUMNS,
-        )
+    raise ValueError(
+        "Input dataframe has neither quaternion columns nor solar-panel columns"
+    )
 
-    elif all(col in df.columns for col in SOLAR_PANEL_COLUMNS):
-        logger.info("Interpolating solar-panel angles")
 
-        numeric = pd.DataFrame(
-            data=df[SOLAR_PANEL_COLUMNS].to_numpy(),
-            index=source_times,
-            columns=SOLAR_PANEL_COLUMNS,
-        )
+def _interpolate_into(
+    df: pd.DataFrame,
+    times: np.ndarray,
+    out: np.ndarray,
+    max_gap: float | None = None,
+) -> np.ndarray:
+    """
+    Evaluate a prepared (sorted, deduplicated) source dataframe at ``times``.
 
-        target_index = pd.Index(times, name="mjd")
+    ``times`` are int64 TT nanoseconds; the result is written into ``out``,
+    which may be a column slice of a wider output block.
+    """
 
-        out = (
-            numeric.reindex(numeric.index.union(target_index))
-            .sort_index()
-            .interpolate(method="index")
-            .loc[target_index]
-        )
+    # Kernels work on the int64 epochs directly: interpolation weights come
+    # from exact integer differences, whatever the span of the source.
+    source_times = as_nanoseconds(df.index.values)
+    gap = None if max_gap is None else max_gap * NANOSECONDS_PER_SECOND
 
-    else:
-        raise ValueError(
-            "Input dataframe has neither quaternion columns nor solar-panel columns"
-        )
+    columns = _attitude_columns(df)
 
-    out.index = atime.Time(
-        out.index.to_numpy(),
-        format="mjd",
-        scale="tt",
-    ).to_value(format="datetime64")
+    if columns is QUATERNION_COLUMNS:
+        logger.info("Interpolating body quaternions")
 
-    return out, times
+        return slerp(
+            source_times,
+            df[columns].to_numpy(dtype=np.float64),
+            times,
+            max_gap=gap,
+            out=out,
+        )
 
+    logger.info("Interpolating solar-panel angles")
 
-def _to_output_index(df: pd.DataFrame) -> pd.DataFrame:
-    mjd_days, sec_of_day = _time_to_mjd_and_sod(df.index.values, scale="tt")
+    # Like the previous pandas index interpolation: nothing before the first
+    # panel sample, the last value held after the last one.
+    return interp_linear(
+        source_times,
+        df[columns].to_numpy(dtype=np.float64),
+        times,
+        max_gap=gap,
+        out=out,
+    )
 
-    df = df.copy()
-    df["MJDay"] = mjd_days
-    df["SecOfDay"] = sec_of_day
 
-    return df.reset_index(drop=True).set_index(["MJDay", "SecOfDay"])
+def _attitude_frame(
+    data: np.ndarray,
+    times: np.ndarray,
+    columns: list[str],
+) -> pd.DataFrame:
+    """Wrap an output block and its int64 TT epochs without copying."""
 
+    return pd.DataFrame(
+        data,
+        index=pd.DatetimeIndex(times.view("datetime64[ns]"), name="date_time"),
+        columns=columns,
+        copy=False,
+    )
 
-def _extract_sentinel_dbl_files(files: list[Path]) -> list[Path]:
-    """
-    Extract Sentinel DBL files from tar archives.
 
-    If an input file is already a .DBL file, keep it.
+def _interpolate(
+    df: pd.DataFrame,
+    nsec: float,
+    times: np.ndarray | None = None,
+    max_gap: float | None = None,
+) -> tuple[pd.DataFrame, np.ndarray]:
     """
+    Interpolate either body quaternions or solar-panel angles.
 
-    extracted: list[Path] = []
-
-    for file in files:
-        file = Path(file)
-
-        if file.name.upper().endswith(".DBL"):
-            extracted.append(file)
-            continue
-
-        target_dir = file.parent
+    Quaternion interpolation uses SLERP.
+    Solar-panel interpolation is linear in time.
 
-        with tarfile.open(file, "r:*") as archive:
-            for member in archive.getmembers():
-                if not member.name.upper().endswith(".DBL"):
-                    continue
+    ``times`` and the returned grid are int64 TT nanoseconds since
+    1970-01-01; the returned dataframe is indexed by the same epochs as
+    datetime64[ns].  Grid epochs falling inside a gap of more than
+    ``max_gap`` seconds between source epochs are set to NaN.
+    """
 
-                archive.extract(member, path=target_dir, filter="data")
+    df = _prepare_source(df)
+    columns = _attitude_columns(df)
 
-                extracted_file = target_dir / member.name
-                extracted.append(extracted_file)
+    if times is None:
+        source_times = as_nanoseconds(df.index.values)
+        times = _output_grid(source_times[0], source_times[-1], nsec)
 
-                logger.debug("Extracted %s from %s", member.name, file)
+    out = np.empty((len(times), len(columns)), dtype=np.float64)
+    _interpolate_into(df, times, out, max_gap=max_gap)
 
-    return extracted
+    return _attitude_frame(out, times, columns), times
 
 
 def _matching_qsolp_file(qbody_file: Path, files_by_name: dict[str, Path]) -> Path:
@@ -324,116 +439,733 @@ def _matching_qsolp_file(qbody_file: Path, files_by_name: dict[str, Path]) -> Pa
     )
 
 
-def _process_body_and_panel_files(
+def _product_sort_key(path: Path) -> tuple[dt.datetime, str]:
+    """Order products by the validity start in their name, then by name."""
+
+    product_range = parse_product_range(path.name)
+    product_start = product_range[0] if product_range else dt.datetime.min
+
+    return product_start, path.name
+
+
+def _product_start(path: Path) -> dt.datetime | None:
+    """Validity start in a product name, also for names with a single time."""
+
+    product_range = parse_product_range(path.name)
+
+    if product_range is not None:
+        return product_range[0]
+
+    match = re.search(r"(?<!\d)(\d{8})T?(\d{6})(?!\d)", path.name)
+
+    if match is None:
+        return None
+
+    return dt.datetime.strptime("".join(match.groups()), "%Y%m%d%H%M%S")
+
+
+def _products_since(files: list[Path], since: dt.datetime) -> list[Path]:
+    """
+    The products that may hold samples at or after ``since``, in input order.
+
+    Products named with a validity range are kept if it ends at or after
+    ``since``.  Of the products named with their start only (Jason), the
+    last one starting at or before ``since`` is kept, with its predecessor
+    (consecutive products overlap) and all later ones.  Products whose name
+    holds no time are always kept.
+    """
+
+    start_only = sorted(
+        (start, file.name)
+        for file in files
+        if parse_product_range(file.name) is None
+        and (start := _product_start(file)) is not None
+    )
+    starts = [start for start, _ in start_only]
+    first = max(bisect.bisect_right(starts, since) - 2, 0)
+    kept_start_only = {name for _, name in start_only[first:]}
+
+    selected = []
+
+    for file in files:
+        product_range = parse_product_range(file.name)
+
+        if product_range is not None:
+            keep = product_range[1] >= since
+        else:
+            keep = _product_start(file) is None or file.name in kept_start_only
+
+        if keep:
+            selected.append(file)
+
+    return selected
+
+
+def _products_in_range(
+    files: list[Path],
+    start: dt.datetime,
+    end: dt.datetime,
+) -> list[Path]:
+    """
+    The products that may hold samples in [start, end], in input order.
+
+    Products named with a validity range are kept if it overlaps the range.
+    Products named with their start only (Jason) are taken to last until the
+    start of the product after the next one, since consecutive products
+    overlap.  The product ending last before the range and the one starting
+    first after it are kept as well, for the samples bracketing the range.
+    Products whose name holds no time are always kept.
+    """
+
+    start_only = sorted(
+        (product_start, file.name)
+        for file in files
+        if parse_product_range(file.name) is None
+        and (product_start := _product_start(file)) is not None
+    )
+    spans = {
+        name: (
+            product_start,
+            start_only[i + 2][0] if i + 2 < len(start_only) else dt.datetime.max,
+        )
+        for i, (product_start, name) in enumerate(start_only)
+    }
+
+    for file in files:
+        if (product_range := parse_product_range(file.name)) is not None:
+            spans[file.name] = product_range
+
+    before = max(
+        ((last, name) for name, (_, last) in spans.items() if last < start),
+        default=None,
+    )
+    after = min(
+        ((first, name) for name, (first, _) in spans.items() if first > end),
+        default=None,
+    )
+    neighbours = {pair[1] for pair in (before, after) if pair is not None}
+
+    return [
+        file
+        for file in files
+        if file.name not in spans
+        or file.name in neighbours
+        or (spans[file.name][0] <= end and spans[file.name][1] >= start)
+    ]
+
+
+def _jason_inputs(files: list[Path]) -> tuple[list[Path], list[Path]]:
+    files_by_name = {file.name.lower(): file for file in files}
+
+    body_files = sorted(file for file in files if _is_qbody(file))
+    panel_files = [_matching_qsolp_file(file, files_by_name) for file in body_files]
+
+    return body_files, panel_files
+
+
+def _swot_inputs(files: list[Path]) -> tuple[list[Path], list[Path]]:
+    body_files = sorted(file for file in files if _is_qbody(file))
+    panel_files = sorted(file for file in files if _is_qsolp(file))
+
+    return body_files, panel_files
+
+
+def _attitude_inputs(
     satellite: str,
-    body_files: list[Path],
-    panel_files: list[Path],
-    nsec: float,
-) -> pd.DataFrame:
+    files: list[Path],
+) -> tuple[list[Path], list[Path]]:
+    """
+    Return the (body, panel) raw files to read for a satellite, in product order.
+
+    The panel list is empty for satellites without solar-panel files.
+    Sentinel tar archives are read as they are; see read_sentinel_attitude_file.
+    """
+
+    satellite = satellite.lower()
+
+    if satellite in JASON_SATELLITES:
+        body_files, panel_files = _jason_inputs(files)
+
+    elif satellite in SWOT_SATELLITES:
+        body_files, panel_files = _swot_inputs(files)
+
+    elif satellite in SENTINEL_SATELLITES | CRYOSAT_SATELLITES:
+        body_files = sorted(files, key=_product_sort_key)
+        panel_files = []
+
+    else:
+        raise ValueError(f"Unsupported satellite: {satellite}")
+
     if not body_files:
         raise ValueError(f"No qbody files found for {satellite}")
 
-    if not panel_files:
+    if satellite in JASON_SATELLITES | SWOT_SATELLITES and not panel_files:
         raise ValueError(f"No qsolp files found for {satellite}")
 
-    body_dfs = [
-        _fix_time(satellite, read_attitude_file(satellite, file)) for file in body_files
-    ]
+    return body_files, panel_files
 
-    panel_dfs = [
-        _fix_time(satellite, read_attitude_file(satellite, file))
-        for file in panel_files
-    ]
 
-    df_body, times = _interpolate(pd.concat(body_dfs), nsec)
-    df_panel, _ = _interpolate(pd.concat(panel_dfs), nsec, times=times)
+def _read_source(
+    satellite: str,
+    file: Path,
+    cache: ParsedFileCache | None = None,
+    metrics: RunMetrics | None = None,
+    window: tuple[int | None, int | None] | None = None,
+) -> tuple[np.ndarray, np.ndarray, list[str]]:
+    """
+    Read and time-convert one product into (int64 TT epochs, values, columns).
 
-    return _to_output_index(
-        pd.merge(df_body, df_panel, left_index=True, right_index=True)
-    )
+    This runs in the parser worker processes, so it returns bare arrays:
+    they pickle with little overhead, unlike a DataFrame with its index.
+    With a ``cache`` the product is only parsed if it has no valid entry.
+
+    With ``window`` (TT nanoseconds) only the samples inside it and the
+    WINDOW_PAD ones on either side are kept, before the time conversion.
+    Cache entries always hold the whole product, and are cut after reading.
+    """
+
+    metrics = metrics if metrics is not None else RunMetrics()
+
+    if cache is not None:
+        with metrics.stage("cache") as stage:
+            cached = cache.get(satellite, file)
+
+            if cached is not None:
+                cached = _window_run(cached, window)
+                stage.rows_out += len(cached[0])
+                return cached
+
+    file_window = None
+
+    if window is not None and cache is None:
+        scale = _time_scale(satellite)
+        file_window = tuple(
+            None if bound is None else convert(np.int64(bound), "tt", scale)
+            for bound in window
+        )
+
+    with metrics.stage("read") as stage:
+        df = read_attitude_file(satellite, file, file_window)
+        stage.rows_out += len(df)
+
+    with metrics.stage("fix_time") as stage:
+        stage.rows_in += len(df)
+        df = _fix_time(satellite, df)
+        columns = _attitude_columns(df)
+        times = as_nanoseconds(df.index.values)
+        values = df[columns].to_numpy(dtype=np.float64)
+        stage.rows_out += len(times)
+
+    if cache is not None:
+        with metrics.stage("cache"):
+            cache.put(satellite, file, times, values, columns)
+
+        return _window_run((times, values, columns), window)
 
+    return times, values, columns
 
-def _process_jason_files(
+
+def _window_run(
+    run: tuple[np.ndarray, np.ndarray, list[str]],
+    window: tuple[int | None, int | None] | None,
+) -> tuple[np.ndarray, np.ndarray, list[str]]:
+    """Cut a parsed product to ``window``, as read_attitude_file would."""
+
+    if window is None:
+        return run
+
+    times, values, columns = run
+    keep = _window_mask(times, window)
+
+    return times[keep], values[keep], columns
+
+
+def _measured_read_source(
     satellite: str,
-    nsec: float,
-    qfns: list[str | Path],
-) -> pd.DataFrame:
-    files = [Path(file) for file in qfns]
-    files_by_name = {file.name.lower(): file for file in files}
+    file: Path,
+    cache: ParsedFileCache | None,
+    trace_memory: bool,
+    window: tuple[int | None, int | None] | None = None,
+) -> tuple[tuple[np.ndarray, np.ndarray, list[str]], RunMetrics]:
+    """_read_source in a worker process, with the metrics measured there."""
 
-    body_files = sorted(file for file in files if _is_qbody(file))
-    panel_files = [_matching_qsolp_file(file, files_by_name) for file in body_files]
+    metrics = RunMetrics(trace_memory)
 
-    return _process_body_and_panel_files(
-        satellite=satellite,
-        body_files=body_files,
-        panel_files=panel_files,
-        nsec=nsec,
-    )
+    with metrics.tracing():
+        run = _read_source(satellite, file, cache, metrics, window)
+
+    return run, metrics
 
 
-def _process_swot_files(
+class _FileParser:
+    """
+    Parse attitude products in order, optionally in a pool of processes.
+
+    With ``jobs`` > 1 up to twice that many products are parsed ahead of the
+    one being consumed, which keeps the workers busy while bounding how many
+    parsed products wait in memory.  Products are always yielded in the
+    order given, so results do not depend on ``jobs``.
+
+    Stage metrics of the run (see preprocessors.metrics) are collected in
+    ``metrics``, including those measured in the workers.  With ``window``
+    (TT nanoseconds) products are cut to it while they are read; see
+    _read_source.
+    """
+
+    def __init__(
+        self,
+        jobs: int | None = None,
+        cache: ParsedFileCache | None = None,
+        metrics: RunMetrics | None = None,
+        window: tuple[int | None, int | None] | None = None,
+    ) -> None:
+        if jobs is not None and jobs < 1:
+            raise ValueError("Number of parser jobs must be at least 1")
+
+        self.jobs = jobs or 1
+        self.cache = cache
+        self.metrics = metrics if metrics is not None else RunMetrics()
+        self.window = window
+        self._pool = ProcessPoolExecutor(self.jobs) if self.jobs > 1 else None
+
+        if self._pool is not None and cache is not None:
+            # Workers get copies of the cache: scan its size once here rather
+            # than in every copy, and enforce the limit on their entries when
+            # the pool is done.
+            cache.size()
+
+    def __enter__(self) -> _FileParser:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+            if self.cache is not None:
+                self.cache.evict()
+
+    def runs(
+        self, satellite: str, files: list[Path]
+    ) -> Iterator[tuple[np.ndarray, np.ndarray, list[str]]]:
+        """Yield (int64 TT epochs, values, columns) for each product."""
+
+        if self._pool is None:
+            for file in files:
+                yield _read_source(
+                    satellite, file, self.cache, self.metrics, self.window
+                )
+            return
+
+        files = iter(files)
+        pending = deque(
+            self._submit(satellite, file) for file in islice(files, 2 * self.jobs)
+        )
+
+        while pending:
+            run, metrics = pending.popleft().result()
+            self.metrics.add(metrics)
+
+            file = next(files, None)
+            if file is not None:
+                pending.append(self._submit(satellite, file))
+
+            yield run
+
+    def _submit(self, satellite: str, file: Path):
+        return self._pool.submit(
+            _measured_read_source,
+            satellite,
+            file,
+            self.cache,
+            self.metrics.trace_memory,
+            self.window,
+        )
+
+
+def _read_sources(
     satellite: str,
-    nsec: float,
-    qfns: list[str | Path],
+    files: list[Path],
+    parser: _FileParser | None = None,
+    stats: MergeStats | None = None,
 ) -> pd.DataFrame:
-    files = [Path(file) for file in qfns]
+    """
+    Read products and merge them into one sorted, deduplicated frame.
 
-    body_files = sorted(file for file in files if _is_qbody(file))
-    panel_files = sorted(file for file in files if _is_qsolp(file))
+    Each product is a sorted run; see merge_runs.  Overlap statistics are
+    logged, and added to ``stats`` if given.
+    """
 
-    return _process_body_and_panel_files(
-        satellite=satellite,
-        body_files=body_files,
-        panel_files=panel_files,
-        nsec=nsec,
+    parser = parser or _FileParser()
+    stats = stats if stats is not None else MergeStats()
+    runs = list(parser.runs(satellite, files))
+
+    with parser.metrics.stage("merge") as stage:
+        times, values = merge_runs([run[:2] for run in runs], stats)
+        stage.rows_in += stats.samples
+        stage.rows_out += len(times)
+
+    logger.info(
+        "Merged %d products: %d samples, %d in overlaps, %d duplicate epochs",
+        stats.runs,
+        stats.samples,
+        stats.overlap_samples,
+        stats.duplicates,
     )
 
+    return _attitude_frame(values, times, runs[-1][2])
 
-def _process_cryosat_files(
-    satellite: str,
-    nsec: float,
-    qfns: list[str | Path],
+
+def _evaluate(
+    df_body: pd.DataFrame,
+    df_panel: pd.DataFrame | None,
+    times: np.ndarray,
+    max_gap: float | None = None,
 ) -> pd.DataFrame:
-    files = [Path(file) for file in qfns]
+    """
+    Evaluate prepared body (and panel) sources on the int64 TT grid ``times``.
+
+    Body and panel columns share the body grid, so both kernels write
+    straight into column slices of one output block; no index join needed.
+    """
+
+    columns = QUATERNION_COLUMNS
+
+    if df_panel is not None:
+        columns = QUATERNION_COLUMNS + SOLAR_PANEL_COLUMNS
 
-    dfs = [_fix_time(satellite, read_attitude_file(satellite, file)) for file in files]
+    data = np.empty((len(times), len(columns)), dtype=np.float64)
 
-    df, _ = _interpolate(pd.concat(dfs), nsec)
-    return _to_output_index(df)
+    _interpolate_into(df_body, times, data[:, :4], max_gap=max_gap)
 
+    if df_panel is not None:
+        _interpolate_into(df_panel, times, data[:, 4:], max_gap=max_gap)
+
+    return _attitude_frame(data, times, columns)
+
+
+def _resume_point(times: np.ndarray, resume_from: int) -> int:
+    """
+    First sample at or after ``resume_from`` (the last one if there is none).
+
+    Output epochs from there on are interpolated from samples at or after
+    ``resume_from`` only, so they do not depend on any earlier product.
+    """
 
-def _process_sentinel_files(
+    index = np.searchsorted(times, resume_from, side="left")
+
+    return times[min(index, len(times) - 1)]
+
+
+def _grid_starts(
+    body_times: np.ndarray,
+    panel_times: np.ndarray | None,
+    resume_from: list[int | None],
+) -> list[int]:
+    """
+    First output epoch allowed for each grid: the first body sample, or with
+    a ``resume_from`` (int64 TT) the first epoch whose bracketing samples all
+    lie at or after it; see _resume_point.
+    """
+
+    starts = []
+
+    for resume in resume_from:
+        first = body_times[0]
+
+        if resume is not None:
+            first = _resume_point(body_times, resume)
+
+            if panel_times is not None:
+                first = max(first, _resume_point(panel_times, resume))
+
+        starts.append(first)
+
+    return starts
+
+
+def _grid_bounds(
+    starts: list[int],
+    last: int,
+    window: tuple[int | None, int | None] | None,
+) -> tuple[list[int], int]:
+    """
+    Limit the grid starts and the last grid epoch to ``window`` (TT
+    nanoseconds, end excluded), so that no epoch outside the requested
+    range is interpolated.  Grid epochs stay multiples of their interval.
+    """
+
+    if window is None:
+        return starts, last
+
+    start, end = window
+
+    if start is not None:
+        starts = [max(first, start) for first in starts]
+
+    if end is not None:
+        last = min(last, end - 1)
+
+    return starts, last
+
+
+def _process_files(
     satellite: str,
-    nsec: float,
-    qfns: list[str | Path],
-    cleanup_extracted: bool = True,
-) -> pd.DataFrame:
-    files = [Path(file) for file in qfns]
-    attitude_files = _extract_sentinel_dbl_files(files)
+    body_files: list[Path],
+    panel_files: list[Path],
+    intervals: list[float],
+    max_gap: float | None = None,
+    parser: _FileParser | None = None,
+    resume_from: list[int | None] | None = None,
+    window: tuple[int | None, int | None] | None = None,
+) -> list[pd.DataFrame]:
+    """
+    Read, time-convert and interpolate the whole input span at once.
 
-    if not attitude_files:
-        raise ValueError(f"No Sentinel DBL files found for {satellite}")
+    The sources are read, merged and deduplicated once and evaluated on one
+    grid per interval of ``intervals``; one dataframe is returned for each.
+    ``resume_from`` holds an optional resume epoch per grid (see
+    _grid_starts).  Grids are limited to ``window`` (TT nanoseconds, end
+    excluded); see _grid_bounds.
+    """
 
-    dfs = [
-        _fix_time(satellite, read_attitude_file(satellite, file))
-        for file in attitude_files
-    ]
+    parser = parser or _FileParser()
+    metrics = parser.metrics
+    resume_from = resume_from or [None] * len(intervals)
+
+    df_body = _read_sources(satellite, body_files, parser, metrics.source("body"))
+    df_panel = (
+        _read_sources(satellite, panel_files, parser, metrics.source("panel"))
+        if panel_files
+        else None
+    )
 
-    df, _ = _interpolate(pd.concat(dfs), nsec)
-    df = _to_output_index(df)
+    with metrics.stage("deduplicate") as stage:
+        stage.rows_in += len(df_body) + (0 if df_panel is None else len(df_panel))
+        df_body = _prepare_source(df_body)
+        df_panel = None if df_panel is None else _prepare_source(df_panel)
+        stage.rows_out += len(df_body) + (0 if df_panel is None else len(df_panel))
+
+    body_times = as_nanoseconds(df_body.index.values)
+    starts = _grid_starts(
+        body_times,
+        None if df_panel is None else as_nanoseconds(df_panel.index.values),
+        resume_from,
+    )
+    starts, last = _grid_bounds(starts, body_times[-1], window)
+    frames = []
 
-    if cleanup_extracted:
-        original_files = {file.resolve() for file in files}
+    with metrics.stage("interpolate") as stage:
+        for nsec, first in zip(intervals, starts, strict=True):
+            times = _output_grid(first, last, nsec)
+            stage.rows_out += len(times)
+            frames.append(_evaluate(df_body, df_panel, times, max_gap=max_gap))
 
-        for file in attitude_files:
-            try:
-                if file.resolve() not in original_files:
-                    file.unlink()
-            except FileNotFoundError:
-                pass
+    return frames
 
-    return df
+
+class _SourceBuffer:
+    """
+    Sliding window over the samples of time-ordered attitude products.
+
+    Products are taken one at a time, in the order given, and merged into
+    the samples still buffered ("last product wins" for duplicate epochs, as
+    in merge_runs).  Products are assumed to be ordered by their first
+    epoch, which is what _product_sort_key gives for the supported product
+    names.
+    """
+
+    def __init__(
+        self,
+        runs: Iterator[tuple[np.ndarray, np.ndarray, list[str]]],
+        stats: MergeStats | None = None,
+        metrics: RunMetrics | None = None,
+    ) -> None:
+        self._runs = runs
+        self._last_product_start: int | None = None
+        self.stats = stats if stats is not None else MergeStats()
+        self.metrics = metrics if metrics is not None else RunMetrics()
+        self.exhausted = False
+        self.columns: list[str] = []
+        self.times = np.empty(0, dtype=np.int64)
+        self.values = np.empty((0, 0), dtype=np.float64)
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        return _attitude_frame(self.values, self.times, self.columns)
+
+    def _load_next(self) -> bool:
+        run = next(self._runs, None)
+
+        if run is None:
+            self.exhausted = True
+            return False
+
+        times, values, self.columns = run
+
+        if not len(times):
+            return True
+
+        with self.metrics.stage("merge") as stage:
+            buffered = len(self.times)
+            stage.rows_in += len(times)
+
+            times, values = sorted_run(times, values, self.stats)
+            self.stats.add_run(times)
+
+            if not buffered:
+                self.values = np.empty((0, values.shape[1]), dtype=np.float64)
+
+            self._last_product_start = int(times[0])
+            self.times, self.values = merge_pair(
+                self.times, self.values, times, values, self.stats
+            )
+            stage.rows_out += len(self.times) - buffered
+
+        return True
+
+    def prime(self) -> None:
+        """Read products until at least two samples are buffered."""
+
+        while len(self.times) < 2 and not self.exhausted:
+            self._load_next()
+
+        if len(self.times) < 2:
+            raise ValueError(
+                "At least two unique attitude epochs are required for interpolation"
+            )
+
+    def fill(self, until: int) -> None:
+        """
+        Read products until every sample up to the first one at or after
+        ``until`` is final, i.e. no unread product can still override it.
+        """
+
+        while not self.exhausted:
+            right = np.searchsorted(self.times, until, side="left")
+
+            if (
+                right < len(self.times)
+                and self._last_product_start is not None
+                and self._last_product_start > self.times[right]
+            ):
+                return
+
+            self._load_next()
+
+    def trim(self, before: int) -> None:
+        """Drop samples before ``before``, keeping two to bracket it."""
+
+        keep = max(np.searchsorted(self.times, before, side="left") - 2, 0)
+
+        if keep:
+            self.times = self.times[keep:]
+            self.values = self.values[keep:]
+
+
+def _stream_files(
+    satellite: str,
+    body_files: list[Path],
+    panel_files: list[Path],
+    intervals: list[float],
+    max_gap: float | None = None,
+    chunk_days: float = 1.0,
+    parser: _FileParser | None = None,
+    resume_from: list[int | None] | None = None,
+    window: tuple[int | None, int | None] | None = None,
+) -> Iterator[list[pd.DataFrame]]:
+    """
+    Yield the interpolated output in consecutive TT chunks of ``chunk_days``.
+
+    Every chunk is a list with one dataframe per interval of ``intervals``,
+    all evaluated from the same buffered samples (some may be empty).  Only
+    the products needed for the current chunk, plus the samples that
+    bracket its edges, are held in memory, and products past the end of
+    ``window`` are not read.  Because grid epochs are absolute multiples of
+    the interval, the concatenated chunks are identical to the output of
+    _process_files.
+    """
+
+    chunk = int(round(chunk_days * 86400 * NANOSECONDS_PER_SECOND))
+
+    if chunk <= 0:
+        raise ValueError("Chunk length must be positive")
+
+    parser = parser or _FileParser()
+    metrics = parser.metrics
+    resume_from = resume_from or [None] * len(intervals)
+
+    body = _SourceBuffer(
+        parser.runs(satellite, body_files), metrics.source("body"), metrics
+    )
+    panel = (
+        _SourceBuffer(
+            parser.runs(satellite, panel_files), metrics.source("panel"), metrics
+        )
+        if panel_files
+        else None
+    )
+
+    body.prime()
+    if panel is not None:
+        panel.prime()
+
+    resumes = [resume for resume in resume_from if resume is not None]
+
+    if resumes:
+        body.fill(max(resumes))
+        if panel is not None:
+            panel.fill(max(resumes))
+
+    starts = _grid_starts(
+        body.times, None if panel is None else panel.times, resume_from
+    )
+    starts, _ = _grid_bounds(starts, body.times[-1], window)
+    chunk_start = min(starts) // chunk * chunk
+    # Last epoch of the window: no products past it are needed.
+    end = None if window is None or window[1] is None else window[1] - 1
+
+    while True:
+        chunk_end = chunk_start + chunk
+        body.fill(chunk_end)
+
+        _, last = _grid_bounds(starts, body.times[-1], window)
+        grids = [
+            _output_grid(max(chunk_start, first), min(chunk_end - 1, last), nsec)
+            for nsec, first in zip(intervals, starts, strict=True)
+        ]
+
+        if any(len(times) for times in grids):
+            if panel is not None:
+                panel.fill(chunk_end)
+
+            logger.debug(
+                "Interpolating chunk %s - %s",
+                np.int64(chunk_start).view("datetime64[ns]"),
+                np.int64(chunk_end).view("datetime64[ns]"),
+            )
+
+            with metrics.stage("interpolate") as stage:
+                frames = [
+                    _evaluate(
+                        body.frame,
+                        None if panel is None else panel.frame,
+                        times,
+                        max_gap=max_gap,
+                    )
+                    for times in grids
+                ]
+                stage.rows_out += sum(len(times) for times in grids)
+
+            yield frames
+
+        if chunk_end > last and (body.exhausted or last == end):
+            return
+
+        body.trim(chunk_end)
+        if panel is not None:
+            panel.trim(chunk_end)
+
+        chunk_start = chunk_end
 
 
 def _clip_output_range(
@@ -443,89 +1175,421 @@ def _clip_output_range(
     requested_time_scale: str = "utc",
 ) -> pd.DataFrame:
     """
-    Clip output dataframe indexed by TT (MJDay, SecOfDay) to [start, end).
+    Clip an interpolated dataframe indexed by TT datetime64[ns] to [start, end).
 
     CLI/YAML request datetimes are interpreted as UTC by default and converted
     to TT before comparison.  This avoids dropping/keeping samples off by the
-    current UTC-to-TT offset.
+    current UTC-to-TT offset.  The comparison is done on integer nanoseconds.
     """
 
     if start is None and end is None:
         return df
 
-    index_mjd = (
-        df.index.get_level_values("MJDay").to_numpy(dtype=float)
-        + df.index.get_level_values("SecOfDay").to_numpy(dtype=float) / 86400.0
-    )
+    index_nsec = as_nanoseconds(df.index.values)
 
-    mask = np.ones(len(df), dtype=bool)
+    first = 0
+    last = len(index_nsec)
 
     if start is not None:
-        start_mjd = atime.Time(start, scale=requested_time_scale).tt.mjd
-        mask &= index_mjd >= start_mjd
+        start_nsec = as_nanoseconds(to_tt(start, requested_time_scale))
+        first = np.searchsorted(index_nsec, start_nsec, side="left")
 
     if end is not None:
-        end_mjd = atime.Time(end, scale=requested_time_scale).tt.mjd
-        mask &= index_mjd < end_mjd
+        end_nsec = as_nanoseconds(to_tt(end, requested_time_scale))
+        last = np.searchsorted(index_nsec, end_nsec, side="left")
 
-    return df.loc[mask]
+    return df.iloc[first : max(first, last)]
 
 
-def preprocess_attitude(
-    satellite: str,
-    qfns: list[str | Path],
-    nsec: float = 5.0,
+def _tt_window(
     start=None,
     end=None,
-    output_file: str | Path | None = None,
-) -> Path:
+    requested_time_scale: str = "utc",
+) -> tuple[int | None, int | None] | None:
+    """[start, end) as TT nanoseconds, like _clip_output_range; None if open."""
+
+    if start is None and end is None:
+        return None
+
+    return tuple(
+        None
+        if epoch is None
+        else int(as_nanoseconds(to_tt(epoch, requested_time_scale)))
+        for epoch in (start, end)
+    )
+
+
+def _tt_datetime(nanoseconds: int) -> dt.datetime:
+    return dt.datetime(1970, 1, 1) + dt.timedelta(microseconds=int(nanoseconds) // 1000)
+
+
+def _tail_frames(
+    frames: Iterator[pd.DataFrame],
+    output_file: Path,
+    output_format: str,
+    last: int,
+    nsec: float,
+) -> tuple[Iterator[pd.DataFrame] | None, int]:
     """
-    Process local attitude files and write the interpolated output CSV.
+    Line up a recomputed tail with the existing output ending at ``last``.
 
-    This function does not download anything.
+    Returns the frames to write and the part of the existing output to keep
+    before them (see output_prefix), or (None, 0) if there is nothing new.
     """
 
-    satellite = satellite.lower()
-    files = [Path(file) for file in qfns]
+    # Chunks shared with other grids may hold nothing for this one yet.
+    frames = iter(frames)
+    first = next((df for df in frames if not df.empty), None)
 
-    if not files:
-        raise ValueError(f"No attitude files provided for satellite {satellite}")
+    if first is None:
+        return None, 0
 
-    if satellite in JASON_SATELLITES:
-        df = _process_jason_files(satellite, nsec, files)
+    step = _interval_to_nanoseconds(nsec)
+    grid_start = int(as_nanoseconds(first.index.values[:1])[0])
 
-    elif satellite in SENTINEL_SATELLITES:
-        df = _process_sentinel_files(satellite, nsec, files)
+    if (last - grid_start) % step:
+        raise ValueError(
+            f"{output_file} is not on a {nsec} s grid; rebuild it instead of appending"
+        )
 
-    elif satellite in SWOT_SATELLITES:
-        df = _process_swot_files(satellite, nsec, files)
+    if grid_start > last + step:
+        raise ValueError(
+            f"The input products do not reach back to the end of {output_file}; "
+            "include the products covering it or rebuild instead of appending"
+        )
 
-    elif satellite in CRYOSAT_SATELLITES:
-        df = _process_cryosat_files(satellite, nsec, files)
+    keep = output_prefix(output_file, output_format, grid_start - step // 2)
 
-    else:
-        raise ValueError(f"Unsupported satellite: {satellite}")
+    return chain([first], frames), keep
 
-    if start is not None or end is not None:
-        df = _clip_output_range(df, start=start, end=end)
 
-    if output_file is None:
-        output_file = files[0].parent / f"qua_{satellite}.csv"
-    else:
-        output_file = Path(output_file)
+def _output_frames(
+    frames: Iterator[pd.DataFrame],
+    start=None,
+    end=None,
+    decimator: Decimator | None = None,
+    metrics: RunMetrics | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Clip the frames to [start, end) and decimate them, if asked to."""
 
-    output_file.parent.mkdir(parents=True, exist_ok=True)
+    metrics = metrics if metrics is not None else RunMetrics()
 
-    logger.info("Writing preprocessed attitude file to %s", output_file)
+    for df in frames:
+        if start is not None or end is not None:
+            with metrics.stage("clip") as stage:
+                stage.rows_in += len(df)
+                df = _clip_output_range(df, start=start, end=end)
+                stage.rows_out += len(df)
 
-    df.dropna().to_csv(
-        output_file,
-        sep=" ",
-        float_format="%.12e",
-        header=False,
-    )
+        if decimator is not None:
+            with metrics.stage("decimate") as stage:
+                stage.rows_in += len(df)
+                df = decimator.push(df)
+                stage.rows_out += len(df)
+
+        yield df
+
+    if decimator is not None:
+        with metrics.stage("decimate") as stage:
+            df = decimator.finish()
+            stage.rows_out += len(df)
+
+        yield df
+
+        logger.info(
+            "Decimated %d output epochs to %d", decimator.rows_in, decimator.rows_out
+        )
+
+
+def _write_outputs(
+    outputs: list[tuple[Path, dict, int, Iterator[pd.DataFrame]]],
+    output_format: str,
+    metrics: RunMetrics,
+    partitioned: bool = False,
+) -> None:
+    """
+    Write (file, metadata, keep, frames) outputs, a frame of each in turn.
+
+    Taking the frames of all outputs in step keeps the chunks they are
+    evaluated from in memory only once.
+    """
+
+    with ExitStack() as stack:
+        writers = [
+            stack.enter_context(
+                open_writer(
+                    file,
+                    output_format,
+                    metadata=metadata,
+                    keep=keep,
+                    partitioned=partitioned,
+                )
+            )
+            for file, metadata, keep, _ in outputs
+        ]
+
+        for step in zip_longest(*(frames for *_, frames in outputs)):
+            for writer, df in zip(writers, step, strict=True):
+                if df is None:
+                    continue
+
+                with metrics.stage("write") as stage:
+                    stage.rows_in += len(df)
+                    rows = writer.rows
+                    writer.write(df)
+                    stage.rows_out += writer.rows - rows
+
+
+def preprocess_attitude(
+    satellite: str,
+    qfns: list[str | Path],
+    nsec: float | Sequence[float] = 5.0,
+    start=None,
+    end=None,
+    output_file: str | Path | Sequence[str | Path] | None = None,
+    max_gap: float | None = None,
+    chunk_days: float | None = None,
+    output_format: str = "csv",
+    jobs: int | None = None,
+    cache_dir: str | Path | None = None,
+    cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+    append: bool = False,
+    append_margin: float = APPEND_MARGIN,
+    tolerance: float | None = None,
+    metrics: RunMetrics | None = None,
+    partitioned: bool = False,
+) -> Path | list[Path]:
+    """
+    Process local attitude files and write the interpolated output.
+
+    This function does not download anything.  If ``max_gap`` (seconds) is
+    given, output epochs inside a data outage longer than that are dropped
+    instead of being interpolated across.
+
+    ``start`` and ``end`` (UTC) limit the output to [start, end).  Only the
+    products that may hold samples within PRODUCT_RANGE_MARGIN seconds of
+    it (and the nearest ones beyond; see _products_in_range) are read, they
+    are cut to that range, and the samples just outside it, as they are
+    read, and the grid is only built inside it, so time and memory depend
+    on the range rather than on how much the products cover.
+
+    With ``chunk_days`` the span is processed and appended to the output in
+    consecutive chunks of that many (TT) days, so peak memory depends on the
+    chunk length rather than on the requested range.  The output is the same
+    either way.
+
+    With ``jobs`` > 1 the input products are parsed and time-converted in
+    that many worker processes; the output does not depend on it.
+
+    With ``cache_dir`` the parsed, TT-converted samples of every input
+    product are cached there (up to ``cache_max_bytes``, least recently used
+    entries are evicted first), so products shared by overlapping runs are
+    parsed only once.
+
+    ``output_format`` is ``"csv"`` (the default text product),
+    ``"binary"``, a directory of memory-mappable column files, or
+    ``"archive"``, a compressed file of quantised values indexed by day for
+    long-term storage; see preprocessors.attitude_output.
+
+    With ``partitioned`` the output is a directory (default
+    ``qua_<satellite>.days``) of one file of ``output_format`` per TT day,
+    named by its MJD, with an index of the epochs and rows of each; see
+    preprocessors.attitude_output.PartitionedWriter.  Partitions that come
+    out the same as the existing ones are not rewritten.
+
+    With ``append`` an existing output is extended instead of rebuilt: only
+    the products that may hold samples from ``append_margin`` seconds before
+    its last epoch on are read, and the output is rewritten from the first
+    epoch that only depends on those.  The result is the same as a rebuild
+    from all products, provided products are only ever added after the end
+    of the output (no new product starts more than ``append_margin`` before
+    it).  ``start`` is not applied then: the output keeps its beginning.
+
+    With ``tolerance`` (radians) the output is decimated: only the epochs
+    needed to reproduce every ``nsec`` epoch by SLERP between consecutive
+    output rows within that angle are written (panel angles by linear
+    interpolation, within the same value in their own units); see
+    preprocessors.decimation.Decimator.  Rows keep their exact epochs, but
+    are no longer evenly spaced, so outages are only visible as steps longer
+    than those around them.  Decimated outputs cannot be appended to.
+
+    With a sequence of intervals as ``nsec`` and one output file for each
+    in ``output_file``, the products are read, merged and deduplicated once
+    and every output grid is evaluated from the same samples; the list of
+    output files is returned.  Everything else (format, range, decimation,
+    appending) applies to every output.
+
+    Per-stage wall and CPU time, row counts and, if it was created with
+    ``trace_memory``, peak memory of the run are added to ``metrics`` (a
+    preprocessors.metrics.RunMetrics), with the merge statistics of the
+    inputs; the whole run is the "total" stage.
+    """
+
+    check_output_format(output_format, partitioned)
+
+    if append and tolerance is not None:
+        raise ValueError("Decimated attitude outputs cannot be appended to")
+
+    satellite = satellite.lower()
+    files = [Path(file) for file in qfns]
+
+    if not files:
+        raise ValueError(f"No attitude files provided for satellite {satellite}")
+
+    several = not isinstance(nsec, (int, float))
+    intervals = list(nsec) if several else [nsec]
+
+    if not several:
+        output_files = [
+            default_output_file(files[0].parent, satellite, output_format, partitioned)
+            if output_file is None
+            else Path(output_file)
+        ]
+    elif output_file is None or len(output_file) != len(intervals):
+        raise ValueError("Give one output file for every interpolation interval")
+    else:
+        output_files = [Path(file) for file in output_file]
+
+    if len(set(output_files)) != len(output_files):
+        raise ValueError("Every interpolation interval needs its own output file")
+
+    for interval in intervals:
+        _interval_to_nanoseconds(interval)
+
+    result = output_files if several else output_files[0]
+    metrics = metrics if metrics is not None else RunMetrics()
+
+    with metrics.tracing(), metrics.stage("total"):
+        body_files, panel_files = _attitude_inputs(satellite, files)
+        read_body_files, read_panel_files = body_files, panel_files
+        lasts = [
+            last_output_epoch(file, output_format) if append else None
+            for file in output_files
+        ]
+        resume_from = [
+            None
+            if last is None
+            else last - int(round(append_margin * NANOSECONDS_PER_SECOND))
+            for last in lasts
+        ]
+
+        # Outputs resuming an existing one are not cut at ``start``.
+        resuming = any(resume is not None for resume in resume_from)
+        window = _tt_window(None if resuming else start, end)
+
+        # Only outputs that all exist already can skip the earlier products.
+        if None not in resume_from:
+            since = _tt_datetime(min(resume_from))
+            read_body_files = _products_since(body_files, since)
+            read_panel_files = _products_since(panel_files, since)
+
+            logger.info(
+                "Appending to %s from %s TT with %d products",
+                ", ".join(str(file) for file in output_files),
+                since,
+                len(read_body_files) + len(read_panel_files),
+            )
+        elif window is not None and not resuming:
+            margin = dt.timedelta(seconds=PRODUCT_RANGE_MARGIN)
+            window_start, window_end = window
+            first = (
+                dt.datetime.min
+                if window_start is None
+                else _tt_datetime(window_start) - margin
+            )
+            last = (
+                dt.datetime.max
+                if window_end is None
+                else _tt_datetime(window_end) + margin
+            )
+            read_body_files = _products_in_range(body_files, first, last)
+            read_panel_files = _products_in_range(panel_files, first, last)
+
+            logger.info(
+                "Reading %d of %d products for %s to %s",
+                len(read_body_files) + len(read_panel_files),
+                len(body_files) + len(panel_files),
+                start,
+                end,
+            )
+
+        if not read_body_files:
+            logger.info("No products after the end of %s", output_files[0])
+            return result
+
+        cache = (
+            None
+            if cache_dir is None
+            else ParsedFileCache(cache_dir, cache_max_bytes, version=READER_VERSION)
+        )
 
-    return output_file
+        with _FileParser(jobs, cache, metrics, window) as parser:
+            if chunk_days is None:
+                chunks = iter(
+                    [
+                        _process_files(
+                            satellite,
+                            read_body_files,
+                            read_panel_files,
+                            intervals,
+                            max_gap,
+                            parser,
+                            resume_from,
+                            window,
+                        )
+                    ]
+                )
+            else:
+                chunks = _stream_files(
+                    satellite,
+                    read_body_files,
+                    read_panel_files,
+                    intervals,
+                    max_gap,
+                    chunk_days,
+                    parser,
+                    resume_from,
+                    window,
+                )
+
+            # One frame stream per output, consumed in step below, so tee
+            # holds at most a chunk or so back.
+            streams = tee(chunks, len(intervals))
+            outputs = []
+
+            for index, (file, interval, last) in enumerate(
+                zip(output_files, intervals, lasts, strict=True)
+            ):
+                frames = map(itemgetter(index), streams[index])
+                keep = 0
+
+                if last is not None:
+                    frames, keep = _tail_frames(
+                        frames, file, output_format, last, interval
+                    )
+
+                    if frames is None:
+                        logger.info("%s is up to date", file)
+                        continue
+
+                logger.info("Writing preprocessed attitude file to %s", file)
+
+                metadata = {"satellite": satellite, "interval_sec": interval}
+                decimator = None
+
+                if tolerance is not None:
+                    decimator = Decimator(tolerance)
+                    metadata["tolerance_rad"] = tolerance
+
+                # Appended outputs keep their beginning.
+                frames = _output_frames(
+                    frames, None if last is not None else start, end, decimator, metrics
+                )
+                outputs.append((file, metadata, keep, frames))
+
+            _write_outputs(outputs, output_format, metrics, partitioned)
+
+        return result
 
 
 # Backwards-compatible alias while refactoring callers.
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CACHE_MAX_BYTES = 2 * 1024**3
+
+CACHE_SUFFIX = ".npz"
+
+
+class ParsedFileCache:
+    """
+    On-disk cache of parsed, TT-converted attitude products.
+
+    Entries are ``.npz`` files in ``directory`` holding the int64 TT epochs,
+    the float64 values and the column names of one raw product.  They are
+    keyed by the product's resolved path, size and mtime, the satellite and
+    ``version`` (the reader version), so an entry goes stale as soon as the
+    raw file or the readers change.
+
+    A hit refreshes the entry's mtime; when the directory grows beyond
+    ``max_bytes`` the least recently used entries are removed.  The size of
+    the directory is scanned once and then kept as a running total, so
+    entries stored by other processes (or by copies of the cache sent to
+    them) are only counted at the next eviction.  Cache failures are logged
+    and treated as misses, never as errors.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        version: str = "",
+    ) -> None:
+        if max_bytes <= 0:
+            raise ValueError("Cache size limit must be positive")
+
+        self.directory = Path(directory)
+        self.max_bytes = int(max_bytes)
+        self.version = str(version)
+        # Running total of the entry sizes; scanned on first use.
+        self._size: int | None = None
+
+    def _entry(self, satellite: str, file: Path) -> Path:
+        file = Path(file).resolve()
+        stat = file.stat()
+
+        key = "\0".join(
+            [
+                self.version,
+                satellite,
+                str(file),
+                str(stat.st_size),
+                str(stat.st_mtime_ns),
+            ]
+        )
+        digest = hashlib.sha256(key.encode()).hexdigest()
+
+        return self.directory / f"{digest}{CACHE_SUFFIX}"
+
+    def get(
+        self, satellite: str, file: Path
+    ) -> tuple[np.ndarray, np.ndarray, list[str]] | None:
+        """Return the cached (epochs, values, columns) of ``file``, or None."""
+
+        entry = self._entry(satellite, file)
+
+        try:
+            with np.load(entry, allow_pickle=False) as data:
+                times = data["times"]
+                values = data["values"]
+                columns = data["columns"].tolist()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Ignoring unreadable cache entry %s: %s", entry, exc)
+            return None
+
+        # A read-only cache, or an entry evicted meanwhile, is still a hit.
+        try:
+            os.utime(entry)
+        except OSError as exc:
+            logger.debug("Could not refresh cache entry %s: %s", entry, exc)
+
+        logger.debug("Using cached parse of %s", file)
+
+        return times, values, columns
+
+    def put(
+        self,
+        satellite: str,
+        file: Path,
+        times: np.ndarray,
+        values: np.ndarray,
+        columns: list[str],
+    ) -> None:
+        entry = self._entry(satellite, file)
+        total = self.size()
+
+        try:
+            previous = entry.stat().st_size
+        except OSError:
+            previous = 0
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+            # Write to a unique temporary name first: several worker
+            # processes may store entries at the same time.
+            fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    np.savez(out, times=times, values=values, columns=np.array(columns))
+                size = Path(temporary).stat().st_size
+                os.replace(temporary, entry)
+            finally:
+                Path(temporary).unlink(missing_ok=True)
+        except OSError as exc:
+            logger.warning("Could not cache parsed %s: %s", file, exc)
+            return
+
+        self._size = total + size - previous
+
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def _entries(self) -> list[tuple[int, int, Path]]:
+        """(mtime, size, path) of every entry in the directory."""
+
+        entries = []
+
+        for entry in self.directory.glob(f"*{CACHE_SUFFIX}"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry))
+
+        return entries
+
+    def size(self) -> int:
+        """Total size of the entries in bytes, as far as this cache knows."""
+
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+
+        return self._size
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the size limit is met."""
+
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+
+            entry.unlink(missing_ok=True)
+            total -= size
+            logger.debug("Evicted cache entry %s", entry)
+
+        self._size = total
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from preprocessors.attitude import (
+    QUATERNION_COLUMNS,
+    READER_VERSION,
+    SOLAR_PANEL_COLUMNS,
+    _attitude_inputs,
+    _FileParser,
+    _prepare_source,
+    _read_sources,
+)
+from preprocessors.attitude_cache import DEFAULT_CACHE_MAX_BYTES, ParsedFileCache
+from preprocessors.attitude_output import (
+    is_archive,
+    is_partitioned,
+    partition_files,
+    read_archive,
+    read_binary_attitude,
+)
+from preprocessors.interpolation import (
+    _check_source,
+    _unit_quaternions,
+    interp_linear,
+    slerp,
+)
+from preprocessors.timescales import (
+    MJD_UNIX_EPOCH,
+    NANOSECONDS_PER_DAY,
+    NANOSECONDS_PER_SECOND,
+    as_nanoseconds,
+    to_tt,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class AttitudeInterpolator:
+    """
+    Attitude quaternions (and solar-panel angles) at arbitrary epochs.
+
+    Holds the sorted, deduplicated source samples as int64 TT epochs and
+    float64 arrays, checked and normalised once, so that every evaluate call
+    only costs a search and the kernels for the requested epochs.  Results
+    are the same as in the preprocessed output: quaternions are SLERPed,
+    panel angles interpolated linearly (NaN before the first panel sample,
+    the last value held after the last one), and epochs outside the body
+    span or inside a gap longer than ``max_gap`` seconds are NaN.
+
+    Build it from raw products with from_files or from a preprocessed output
+    (CSV or binary) with from_output.
+    """
+
+    def __init__(
+        self,
+        times: np.ndarray,
+        quaternions: np.ndarray,
+        panel_times: np.ndarray | None = None,
+        panels: np.ndarray | None = None,
+        max_gap: float | None = None,
+    ) -> None:
+        times = as_nanoseconds(times)
+        _check_source(times, quaternions)
+
+        self._times = times
+        self._quaternions = _unit_quaternions(quaternions)
+        self._panel_times = None
+        self._panels = None
+        self._gap = None if max_gap is None else max_gap * NANOSECONDS_PER_SECOND
+
+        if panels is not None:
+            panel_times = times if panel_times is None else as_nanoseconds(panel_times)
+            panels = np.array(panels, dtype=np.float64, order="C", ndmin=2)
+            _check_source(panel_times, panels)
+
+            self._panel_times = panel_times
+            self._panels = panels
+
+    @classmethod
+    def from_frames(
+        cls,
+        body: pd.DataFrame,
+        panel: pd.DataFrame | None = None,
+        max_gap: float | None = None,
+    ) -> AttitudeInterpolator:
+        """Build from TT-indexed frames as returned by _fix_time."""
+
+        body = _prepare_source(body)
+        panel = None if panel is None else _prepare_source(panel)
+
+        return cls(
+            as_nanoseconds(body.index.values),
+            body[QUATERNION_COLUMNS].to_numpy(dtype=np.float64),
+            None if panel is None else as_nanoseconds(panel.index.values),
+            None if panel is None else panel[SOLAR_PANEL_COLUMNS].to_numpy(np.float64),
+            max_gap=max_gap,
+        )
+
+    @classmethod
+    def from_files(
+        cls,
+        satellite: str,
+        qfns: list[str | Path],
+        max_gap: float | None = None,
+        jobs: int | None = None,
+        cache_dir: str | Path | None = None,
+        cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+    ) -> AttitudeInterpolator:
+        """
+        Read raw attitude products, as preprocess_attitude would.
+
+        ``jobs`` and ``cache_dir`` work as in preprocess_attitude.
+        """
+
+        satellite = satellite.lower()
+        files = [Path(file) for file in qfns]
+
+        if not files:
+            raise ValueError(f"No attitude files provided for satellite {satellite}")
+
+        body_files, panel_files = _attitude_inputs(satellite, files)
+        cache = (
+            None
+            if cache_dir is None
+            else ParsedFileCache(cache_dir, cache_max_bytes, version=READER_VERSION)
+        )
+
+        with _FileParser(jobs, cache) as parser:
+            body = _read_sources(satellite, body_files, parser)
+            panel = None
+
+            if panel_files:
+                panel = _read_sources(satellite, panel_files, parser)
+
+        return cls.from_frames(body, panel, max_gap=max_gap)
+
+    @classmethod
+    def from_output(
+        cls,
+        path: str | Path,
+        max_gap: float | None = None,
+        start=None,
+        end=None,
+        scale: str = "tt",
+    ) -> AttitudeInterpolator:
+        """
+        Load a preprocessed output: a CSV file, a binary output directory, an
+        archive or a partitioned output directory.
+
+        The samples are the grid epochs of the output, so ``max_gap`` should
+        be larger than its interval.  Of a partitioned output or an archive
+        only the days needed between ``start`` and ``end`` (given in
+        ``scale``, as for evaluate) are read; other outputs are read whole.
+        """
+
+        path = Path(path)
+        window = [
+            None if epoch is None else int(as_nanoseconds(to_tt(epoch, scale)))
+            for epoch in (start, end)
+        ]
+
+        if not is_partitioned(path):
+            times, quaternions, panels = _read_output(path, window)
+
+            return cls(times, quaternions, panels=panels, max_gap=max_gap)
+
+        parts = [_read_output(file) for file in partition_files(path, *window)]
+
+        if not parts:
+            raise ValueError(f"{path} has no attitude rows")
+
+        times, quaternions, panels = zip(*parts, strict=True)
+
+        return cls(
+            np.concatenate(times),
+            np.concatenate(quaternions),
+            panels=None if panels[0] is None else np.concatenate(panels),
+            max_gap=max_gap,
+        )
+
+    @property
+    def columns(self) -> list[str]:
+        """Column names of the evaluate result."""
+
+        if self._panels is None:
+            return list(QUATERNION_COLUMNS)
+
+        return QUATERNION_COLUMNS + SOLAR_PANEL_COLUMNS
+
+    @property
+    def span(self) -> tuple[np.datetime64, np.datetime64]:
+        """First and last body epoch, TT."""
+
+        return tuple(self._times[[0, -1]].view("datetime64[ns]"))
+
+    def evaluate(self, epochs, scale: str = "tt") -> np.ndarray:
+        """
+        Evaluate at ``epochs`` given in ``scale`` (utc, tai, gpst or tt).
+
+        ``epochs`` may be datetime64 values, datetimes, or int64 nanoseconds
+        since 1970-01-01 in that scale, in any order.  Returns a (M, 4) array
+        of scalar-first quaternions, or (M, 6) with the left and right panel
+        angles appended; see columns.
+        """
+
+        targets = as_nanoseconds(to_tt(np.atleast_1d(epochs), scale))
+        out = np.empty((len(targets), len(self.columns)), dtype=np.float64)
+
+        slerp(
+            self._times,
+            self._quaternions,
+            targets,
+            max_gap=self._gap,
+            out=out[:, :4],
+            validate=False,
+        )
+
+        if self._panels is not None:
+            interp_linear(
+                self._panel_times,
+                self._panels,
+                targets,
+                max_gap=self._gap,
+                out=out[:, 4:],
+                validate=False,
+            )
+
+        return out
+
+
+def _read_output(
+    path: Path,
+    window: tuple[int | None, int | None] = (None, None),
+) -> tuple[np.ndarray, np.ndarray, np.ndarray | None]:
+    """
+    TT epochs, quaternions and panel angles (or None) of a single output.
+
+    Of an archive only the days covering ``window`` (see read_archive) are
+    decoded.
+    """
+
+    if path.is_dir() or is_archive(path):
+        if path.is_dir():
+            columns = read_binary_attitude(path, mmap=False)
+        else:
+            columns = read_archive(path, *window)
+
+        times = (
+            columns["MJDay"].astype(np.int64) - MJD_UNIX_EPOCH
+        ) * NANOSECONDS_PER_DAY + columns["NSecOfDay"]
+        quaternions = np.column_stack([columns[name] for name in QUATERNION_COLUMNS])
+        panels = None
+
+        if all(name in columns for name in SOLAR_PANEL_COLUMNS):
+            panels = np.column_stack([columns[name] for name in SOLAR_PANEL_COLUMNS])
+
+        return times, quaternions, panels
+
+    data = np.loadtxt(path, ndmin=2)
+    times = (data[:, 0].astype(np.int64) - MJD_UNIX_EPOCH) * NANOSECONDS_PER_DAY
+    times += np.round(data[:, 1] * NANOSECONDS_PER_SECOND).astype(np.int64)
+    panels = data[:, 6:8] if data.shape[1] >= 8 else None
+
+    return times, data[:, 2:6], panels
@@ -0,0 +1,1214 @@
+from __future__ import annotations
+
+import filecmp
+import json
+import logging
+import lzma
+import os
+import shutil
+import zlib
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from preprocessors.timescales import (
+    MJD_UNIX_EPOCH,
+    NANOSECONDS_PER_DAY,
+    NANOSECONDS_PER_SECOND,
+    split_mjd,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+
+OUTPUT_FORMATS = ("csv", "binary", "archive")
+
+# Rows formatted per write, and the text buffer size of the CSV output.
+CSV_BLOCK_ROWS = 16384
+CSV_BUFFER_SIZE = 1 << 20
+
+BINARY_FORMAT_NAME = "attitude-columns"
+BINARY_FORMAT_VERSION = 1
+BINARY_HEADER = "header.json"
+
+# Column name -> little-endian dtype of the binary column files.  MJDay and
+# NSecOfDay hold the TT epoch exactly; the remaining columns are whatever the
+# satellite provides.
+BINARY_TIME_COLUMNS = {"MJDay": "<i4", "NSecOfDay": "<i8"}
+BINARY_VALUE_DTYPE = "<f8"
+
+PARTITION_FORMAT_NAME = "attitude-partitions"
+PARTITION_FORMAT_VERSION = 1
+PARTITION_INDEX = "index.json"
+
+ARCHIVE_FORMAT_NAME = "attitude-archive"
+ARCHIVE_FORMAT_VERSION = 1
+# Leading and trailing bytes of an archive file; see ArchiveWriter.
+ARCHIVE_MAGIC = b"ATTARCH1"
+
+# Compression of the day blocks: the name of a stdlib module with compress
+# and decompress functions.
+ARCHIVE_CODECS = {"lzma": lzma, "zlib": zlib}
+ARCHIVE_CODEC = "lzma"
+
+# Quantisation step of the archived values.  Every value is stored to within
+# half of it (plus the float64 rounding of the value), so that a quaternion
+# rotates by at most twice the step (2e-10 rad, about 40 microarcseconds)
+# from the written one; panel angles are off by at most half of it in their
+# own units.
+ARCHIVE_QUANTUM = 1e-10
+
+# Order of the differences stored of the quantised values.  Attitude changes
+# smoothly, so second differences need far fewer bits than the values.
+ARCHIVE_DELTA_ORDER = 2
+
+
+def default_output_file(
+    directory: Path,
+    satellite: str,
+    output_format: str,
+    partitioned: bool = False,
+) -> Path:
+    if partitioned:
+        return directory / f"qua_{satellite}.days"
+
+    if output_format == "binary":
+        return directory / f"qua_{satellite}.columns"
+
+    if output_format == "archive":
+        return directory / f"qua_{satellite}.qar"
+
+    return directory / f"qua_{satellite}.csv"
+
+
+class _AttitudeWriter:
+    """
+    Base for output writers fed with TT-indexed chunks.
+
+    Output goes to a ``.part`` sibling and is moved into place only when the
+    writer is closed without an exception, so a failed run never leaves a
+    truncated product behind.
+
+    ``keep`` is the length of the leading part of an existing output at
+    ``path`` to carry over before the new rows (see output_prefix); the
+    writers of the individual formats define its unit.  All chunks, and the
+    part carried over, must have the same columns.
+    """
+
+    def __init__(self, path: str | Path, keep: int = 0) -> None:
+        self.path = Path(path)
+        self.partial = self.path.with_name(self.path.name + ".part")
+        self.keep = keep
+        self.rows = 0
+        self._columns: list[str] | None = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._close()
+
+        if exc_type is None:
+            self._commit()
+        else:
+            self._discard()
+
+    def write(self, df: pd.DataFrame) -> None:
+        raise NotImplementedError
+
+    def _check_columns(self, df: pd.DataFrame) -> None:
+        """Take the columns of the first chunk; raise if a later one differs."""
+
+        if self._columns is None:
+            self._columns = list(df.columns)
+        elif list(df.columns) != self._columns:
+            raise ValueError(
+                "All chunks written to one output must have the same columns"
+            )
+
+    def _open(self) -> None:
+        raise NotImplementedError
+
+    def _close(self) -> None:
+        raise NotImplementedError
+
+    def _commit(self) -> None:
+        self.partial.replace(self.path)
+
+    def _discard(self) -> None:
+        self.partial.unlink(missing_ok=True)
+
+
+class CsvWriter(_AttitudeWriter):
+    """
+    Space-separated ``MJDay SoD q0 q1 q2 q3 [LP RP]`` text output.
+
+    Rows are formatted CSV_BLOCK_ROWS at a time with a single ``%`` operation
+    on a repeated row template, which produces the same bytes as
+    ``DataFrame.to_csv(sep=" ", float_format="%.12e")`` on the
+    (MJDay, SecOfDay)-indexed frame, an order of magnitude faster.
+    """
+
+    def _open(self) -> None:
+        self._stream = self.partial.open(
+            "w", encoding="utf-8", newline="", buffering=CSV_BUFFER_SIZE
+        )
+
+        # ``keep`` counts bytes of whole lines, so the prefix is valid UTF-8.
+        if self.keep:
+            self._fields = _csv_fields(self.path, self.keep)
+
+            with self.path.open("rb") as existing:
+                _copy_bytes(existing, self._stream.buffer, self.keep)
+
+    def _close(self) -> None:
+        self._stream.close()
+
+    def write(self, df: pd.DataFrame) -> None:
+        self._check_columns(df)
+
+        # The text carries no column names: check the count of the lines kept.
+        if self.keep and self._fields != len(df.columns) + 2:
+            raise ValueError(
+                f"Existing output {self.path} has {self._fields - 2} value "
+                f"columns, not {len(df.columns)}"
+            )
+
+        values = df.to_numpy(dtype=np.float64)
+        keep = ~np.isnan(values).any(axis=1)
+        mjd_days, nsec_of_day = split_mjd(df.index.values[keep])
+
+        # MJDay goes through "%d", so carrying it as a float is exact.
+        rows = np.empty((len(mjd_days), values.shape[1] + 2), dtype=np.float64)
+        rows[:, 0] = mjd_days
+        rows[:, 1] = nsec_of_day / NANOSECONDS_PER_SECOND
+        rows[:, 2:] = values[keep]
+
+        self._write_rows(rows)
+        self.rows += len(rows)
+
+    def _write_rows(self, rows: np.ndarray) -> None:
+        template = "%d" + " %.12e" * (rows.shape[1] - 1) + "\n"
+        block = template * CSV_BLOCK_ROWS
+
+        for first in range(0, len(rows), CSV_BLOCK_ROWS):
+            chunk = rows[first : first + CSV_BLOCK_ROWS]
+
+            if len(chunk) < CSV_BLOCK_ROWS:
+                block = template * len(chunk)
+
+            self._stream.write(block % tuple(chunk.ravel().tolist()))
+
+
+class BinaryWriter(_AttitudeWriter):
+    """
+    Directory of raw fixed-dtype column files plus a JSON header.
+
+    Every column is a plain little-endian array, so readers can ``np.memmap``
+    (or ``np.fromfile``) it without parsing; see read_binary_attitude.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        metadata: dict | None = None,
+        keep: int = 0,
+    ) -> None:
+        super().__init__(path, keep=keep)
+        self.metadata = dict(metadata or {})
+        self._streams: dict = {}
+
+    def _open(self) -> None:
+        if self.partial.exists():
+            shutil.rmtree(self.partial)
+        self.partial.mkdir(parents=True)
+
+        if self.keep:
+            self._open_existing()
+
+    def _open_existing(self) -> None:
+        """Start from the first ``keep`` rows of the existing output."""
+
+        header = _read_binary_header(self.path)
+
+        for key, value in self.metadata.items():
+            if key in header and header[key] != value:
+                raise ValueError(
+                    f"Existing output {self.path} has {key}={header[key]!r}, "
+                    f"not {value!r}"
+                )
+
+        self._columns = [
+            column["name"]
+            for column in header["columns"]
+            if column["name"] not in BINARY_TIME_COLUMNS
+        ]
+
+        for column in header["columns"]:
+            name = column["name"]
+            size = self.keep * np.dtype(column["dtype"]).itemsize
+            self._streams[name] = (self.partial / self._column_file(name)).open("wb")
+
+            with (self.path / column["file"]).open("rb") as existing:
+                _copy_bytes(existing, self._streams[name], size)
+
+        self.rows = self.keep
+
+    def _close(self) -> None:
+        for stream in self._streams.values():
+            stream.close()
+
+        # Written here rather than on commit, so that the finished partial
+        # output can be compared with an existing one (see PartitionedWriter).
+        if self.partial.is_dir():
+            (self.partial / BINARY_HEADER).write_text(
+                json.dumps(self._header(), indent=2) + "\n", encoding="utf-8"
+            )
+
+    def _column_file(self, name: str) -> str:
+        return f"{name}.bin"
+
+    def write(self, df: pd.DataFrame) -> None:
+        df = df.dropna()
+        self._check_columns(df)
+
+        if not self._streams:
+            for name in [*BINARY_TIME_COLUMNS, *self._columns]:
+                file = self.partial / self._column_file(name)
+                self._streams[name] = file.open("wb")
+
+        mjd_days, nsec_of_day = split_mjd(df.index.values)
+
+        arrays = {
+            "MJDay": mjd_days.astype(BINARY_TIME_COLUMNS["MJDay"]),
+            "NSecOfDay": nsec_of_day.astype(BINARY_TIME_COLUMNS["NSecOfDay"]),
+        }
+        for name in self._columns:
+            arrays[name] = df[name].to_numpy(dtype=BINARY_VALUE_DTYPE)
+
+        for name, array in arrays.items():
+            self._streams[name].write(np.ascontiguousarray(array).tobytes())
+
+        self.rows += len(df)
+
+    def _header(self) -> dict:
+        columns = [
+            {"name": name, "dtype": dtype, "file": self._column_file(name)}
+            for name, dtype in BINARY_TIME_COLUMNS.items()
+        ]
+        columns += [
+            {"name": name, "dtype": BINARY_VALUE_DTYPE, "file": self._column_file(name)}
+            for name in self._columns or []
+        ]
+
+        return {
+            "format": BINARY_FORMAT_NAME,
+            "version": BINARY_FORMAT_VERSION,
+            "time_scale": "TT",
+            "rows": self.rows,
+            "columns": columns,
+            **self.metadata,
+        }
+
+    def _commit(self) -> None:
+        if self.path.exists():
+            shutil.rmtree(self.path)
+
+        self.partial.replace(self.path)
+
+    def _discard(self) -> None:
+        shutil.rmtree(self.partial, ignore_errors=True)
+
+
+class PartitionedWriter(_AttitudeWriter):
+    """
+    Directory of one output per TT day, named by its MJD, plus an index.
+
+    Every partition (``<MJD>.csv``, or ``<MJD>.columns`` for binary output)
+    is written by the writer of ``output_format``.  ``index.json`` lists the
+    MJD, file, row count and first and last epoch (TT nanoseconds of day)
+    of every partition, so that readers only open the partitions covering
+    their window; see partition_files.
+
+    Partitions are written to ``.part`` siblings and moved into place, with
+    the new index, only when the writer is closed without an exception.  A
+    finished partition identical to the existing one is dropped instead, so
+    rebuilding an output only touches the days that changed; partitions of
+    the existing output not written again are removed.
+
+    ``keep`` is the TT epoch (nanoseconds) before which the rows of the
+    existing output are kept (see output_prefix): partitions ending before
+    it are left alone, and the one it falls in is rewritten from it on.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        output_format: str = "csv",
+        metadata: dict | None = None,
+        keep: int = 0,
+    ) -> None:
+        super().__init__(path, keep=keep)
+        self.output_format = output_format
+        self.metadata = dict(metadata or {})
+        self._existing: list[dict] = []
+        self._entries: list[dict] = []
+        self._split: dict | None = None
+        # Finished partitions, written but not committed yet, with their entry.
+        self._done: list[tuple[_AttitudeWriter, dict]] = []
+        self._writer: _AttitudeWriter | None = None
+        self._entry: dict | None = None
+
+    def _open(self) -> None:
+        if is_partitioned(self.path):
+            index = read_partition_index(self.path)
+
+            if index["output_format"] != self.output_format:
+                raise ValueError(
+                    f"Existing output {self.path} holds {index['output_format']} "
+                    f"partitions, not {self.output_format}"
+                )
+
+            if self.keep:
+                for key, value in self.metadata.items():
+                    if key in index and index[key] != value:
+                        raise ValueError(
+                            f"Existing output {self.path} has {key}={index[key]!r}, "
+                            f"not {value!r}"
+                        )
+
+            self._existing = index["partitions"]
+        elif self.path.exists() and any(self.path.iterdir()):
+            raise ValueError(f"{self.path} is not a partitioned attitude output")
+
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        for entry in self._existing:
+            if _partition_epoch(entry, "last") < self.keep:
+                self._entries.append(entry)
+                self.rows += entry["rows"]
+            elif _partition_epoch(entry, "first") < self.keep:
+                self._split = entry
+
+    def _start_day(self, mjd: int) -> None:
+        if self._split is not None and self._split["mjd"] < mjd:
+            # Nothing new on the day the kept rows end: just cut it there.
+            self._start_day(self._split["mjd"])
+            self._finish_day()
+
+        name = f"{mjd}.{'columns' if self.output_format == 'binary' else 'csv'}"
+        file = self.path / name
+        entry = {
+            "mjd": mjd,
+            "file": name,
+            "rows": 0,
+            "first_nsec_of_day": None,
+            "last_nsec_of_day": None,
+        }
+        keep = 0
+
+        if self._split is not None and self._split["mjd"] == mjd:
+            keep = output_prefix(file, self.output_format, self.keep)
+            entry["rows"] = _prefix_rows(file, self.output_format, keep)
+            entry["first_nsec_of_day"] = self._split["first_nsec_of_day"]
+            self.rows += entry["rows"]
+            self._split = None
+
+        self._writer = open_writer(file, self.output_format, self.metadata, keep)
+        self._writer.__enter__()
+        self._entry = entry
+
+    def _finish_day(self) -> None:
+        if self._writer is None:
+            return
+
+        self._writer._close()
+        self._done.append((self._writer, self._entry))
+        self._entries.append(self._entry)
+        self._writer = None
+        self._entry = None
+
+    def _close(self) -> None:
+        self._finish_day()
+
+    def write(self, df: pd.DataFrame) -> None:
+        self._check_columns(df)
+        df = df[~np.isnan(df.to_numpy(dtype=np.float64)).any(axis=1)]
+
+        if df.empty:
+            return
+
+        mjd_days, nsec_of_day = split_mjd(df.index.values)
+        bounds = (np.flatnonzero(np.diff(mjd_days)) + 1).tolist()
+
+        for first, stop in zip([0, *bounds], [*bounds, len(df)], strict=True):
+            mjd = int(mjd_days[first])
+
+            if self._entry is None or self._entry["mjd"] != mjd:
+                self._finish_day()
+                self._start_day(mjd)
+
+            self._writer.write(df.iloc[first:stop])
+
+            if self._entry["first_nsec_of_day"] is None:
+                self._entry["first_nsec_of_day"] = int(nsec_of_day[first])
+
+            self._entry["last_nsec_of_day"] = int(nsec_of_day[stop - 1])
+            self._entry["rows"] += stop - first
+            self.rows += stop - first
+
+    def _commit(self) -> None:
+        if self._split is not None:
+            self._start_day(self._split["mjd"])
+            self._finish_day()
+
+        for writer, entry in self._done:
+            if entry["last_nsec_of_day"] is None:
+                entry["last_nsec_of_day"] = int(
+                    last_output_epoch(writer.partial, self.output_format)
+                    - (entry["mjd"] - MJD_UNIX_EPOCH) * NANOSECONDS_PER_DAY
+                )
+
+            if _same_output(writer.partial, writer.path):
+                writer._discard()
+            else:
+                writer._commit()
+
+        written = {entry["file"] for entry in self._entries}
+
+        for entry in self._existing:
+            if entry["file"] not in written:
+                _remove_output(self.path / entry["file"])
+
+        self._entries.sort(key=lambda entry: entry["mjd"])
+        index = {
+            "format": PARTITION_FORMAT_NAME,
+            "version": PARTITION_FORMAT_VERSION,
+            "time_scale": "TT",
+            "output_format": self.output_format,
+            "rows": self.rows,
+            "partitions": self._entries,
+            **self.metadata,
+        }
+        partial = self.path / (PARTITION_INDEX + ".part")
+        partial.write_text(json.dumps(index, indent=2) + "\n", encoding="utf-8")
+        partial.replace(self.path / PARTITION_INDEX)
+
+    def _discard(self) -> None:
+        for writer, _ in self._done:
+            writer._discard()
+
+        if not any(self.path.iterdir()):
+            self.path.rmdir()
+
+
+class ArchiveWriter(_AttitudeWriter):
+    """
+    Compressed single-file archive of quantised, delta-encoded day blocks.
+
+    Rows are grouped by TT day.  The epochs of a day are stored as segments
+    of evenly spaced rows (first epoch and row count, at the most common
+    step of the day), so a new segment only starts at a gap or at an
+    irregular step.  Every value column is quantised to ``quantum`` (see
+    ARCHIVE_QUANTUM), differenced ARCHIVE_DELTA_ORDER times and stored in
+    the narrowest integer type that holds the differences, with its bytes
+    grouped by significance.  A day block is compressed with ``codec`` as
+    a whole.
+
+    The file starts with ARCHIVE_MAGIC and ends with a JSON index of the
+    offset, size, rows, first and last epoch, step and leading values of
+    every day block, followed by the index length (8 bytes, little endian)
+    and ARCHIVE_MAGIC again.  Readers decompress only the days they need;
+    see read_archive.
+
+    ``keep`` is the TT epoch (nanoseconds) before which the rows of the
+    existing output are kept (see output_prefix): day blocks ending before
+    it are copied without decoding, and the day it falls in is re-encoded.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        metadata: dict | None = None,
+        keep: int = 0,
+        codec: str = ARCHIVE_CODEC,
+        quantum: float = ARCHIVE_QUANTUM,
+    ) -> None:
+        if codec not in ARCHIVE_CODECS:
+            raise ValueError(
+                f"Unsupported archive codec {codec!r}; use one of "
+                f"{tuple(ARCHIVE_CODECS)}"
+            )
+
+        if not quantum > 0:
+            raise ValueError("Archive quantum must be positive")
+
+        super().__init__(path, keep=keep)
+        self.metadata = dict(metadata or {})
+        self.codec = codec
+        self.quantum = quantum
+        self._days: list[dict] = []
+        # Rows of the day being collected: its MJD, and chunks of nanoseconds
+        # of day and of values.
+        self._mjd: int | None = None
+        self._times: list[np.ndarray] = []
+        self._values: list[np.ndarray] = []
+
+    def _open(self) -> None:
+        self._stream = self.partial.open("wb")
+        self._stream.write(ARCHIVE_MAGIC)
+
+        if self.keep:
+            self._open_existing()
+
+    def _open_existing(self) -> None:
+        """Start from the rows of the existing output before ``keep``."""
+
+        index = read_archive_index(self.path)
+        settings = {**self.metadata, "codec": self.codec, "quantum": self.quantum}
+
+        for key, value in settings.items():
+            if key in index and index[key] != value:
+                raise ValueError(
+                    f"Existing output {self.path} has {key}={index[key]!r}, "
+                    f"not {value!r}"
+                )
+
+        self._columns = index["columns"]
+
+        with self.path.open("rb") as existing:
+            for entry in index["days"]:
+                if _partition_epoch(entry, "last") < self.keep:
+                    existing.seek(entry["offset"])
+                    self._days.append({**entry, "offset": self._stream.tell()})
+                    _copy_bytes(existing, self._stream, entry["size"])
+                    self.rows += entry["rows"]
+                elif _partition_epoch(entry, "first") < self.keep:
+                    times, values = _read_archive_day(existing, entry, index)
+                    kept = times < self.keep - _day_start(entry["mjd"])
+                    self._mjd = entry["mjd"]
+                    self._times.append(times[kept])
+                    self._values.append(values[kept])
+                    self.rows += int(kept.sum())
+
+    def _close(self) -> None:
+        self._finish_day()
+
+        index = json.dumps(self._index()).encode("utf-8")
+        self._stream.write(index)
+        self._stream.write(len(index).to_bytes(8, "little"))
+        self._stream.write(ARCHIVE_MAGIC)
+        self._stream.close()
+
+    def write(self, df: pd.DataFrame) -> None:
+        df = df.dropna()
+        self._check_columns(df)
+
+        if df.empty:
+            return
+
+        mjd_days, nsec_of_day = split_mjd(df.index.values)
+        values = df.to_numpy(dtype=np.float64)
+        bounds = (np.flatnonzero(np.diff(mjd_days)) + 1).tolist()
+
+        for first, stop in zip([0, *bounds], [*bounds, len(df)], strict=True):
+            mjd = int(mjd_days[first])
+
+            if self._mjd is not None and self._mjd != mjd:
+                self._finish_day()
+
+            self._mjd = mjd
+            self._times.append(nsec_of_day[first:stop])
+            self._values.append(values[first:stop])
+
+        self.rows += len(df)
+
+    def _finish_day(self) -> None:
+        if self._mjd is None:
+            return
+
+        times = np.concatenate(self._times)
+        values = np.concatenate(self._values)
+
+        if len(times):
+            block, entry = _encode_day(times, values, self.quantum)
+            block = ARCHIVE_CODECS[self.codec].compress(block)
+            entry = {
+                "mjd": self._mjd,
+                "offset": self._stream.tell(),
+                "size": len(block),
+                **entry,
+            }
+            self._stream.write(block)
+            self._days.append(entry)
+
+        self._mjd = None
+        self._times = []
+        self._values = []
+
+    def _index(self) -> dict:
+        return {
+            "format": ARCHIVE_FORMAT_NAME,
+            "version": ARCHIVE_FORMAT_VERSION,
+            "time_scale": "TT",
+            "codec": self.codec,
+            "quantum": self.quantum,
+            "delta_order": ARCHIVE_DELTA_ORDER,
+            "rows": self.rows,
+            "columns": self._columns or [],
+            "days": self._days,
+            **self.metadata,
+        }
+
+
+def check_output_format(output_format: str, partitioned: bool = False) -> None:
+    """Raise ValueError unless open_writer supports this kind of output."""
+
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Unsupported output format {output_format!r}; use one of {OUTPUT_FORMATS}"
+        )
+
+    if partitioned and output_format == "archive":
+        raise ValueError("Archive outputs are indexed by day and cannot be partitioned")
+
+
+def open_writer(
+    path: str | Path,
+    output_format: str = "csv",
+    metadata: dict | None = None,
+    keep: int = 0,
+    partitioned: bool = False,
+) -> _AttitudeWriter:
+    """
+    Return the writer for ``output_format``; use it as a context manager.
+
+    With ``partitioned`` the output is a directory of daily outputs of that
+    format; see PartitionedWriter.
+    """
+
+    check_output_format(output_format, partitioned)
+
+    if partitioned:
+        return PartitionedWriter(path, output_format, metadata=metadata, keep=keep)
+
+    if output_format == "csv":
+        return CsvWriter(path, keep=keep)
+
+    if output_format == "archive":
+        return ArchiveWriter(path, metadata=metadata, keep=keep)
+
+    return BinaryWriter(path, metadata=metadata, keep=keep)
+
+
+def _read_binary_header(path: Path) -> dict:
+    header = json.loads((path / BINARY_HEADER).read_text(encoding="utf-8"))
+
+    if header.get("format") != BINARY_FORMAT_NAME:
+        raise ValueError(f"{path} is not a binary attitude product")
+
+    if header.get("version") != BINARY_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported binary attitude version {header.get('version')} in {path}"
+        )
+
+    return header
+
+
+def is_partitioned(path: str | Path) -> bool:
+    """Whether ``path`` is a partitioned output written by PartitionedWriter."""
+
+    return (Path(path) / PARTITION_INDEX).is_file()
+
+
+def read_partition_index(path: str | Path) -> dict:
+    """The index of a partitioned output; see PartitionedWriter."""
+
+    path = Path(path)
+    index = json.loads((path / PARTITION_INDEX).read_text(encoding="utf-8"))
+
+    if index.get("format") != PARTITION_FORMAT_NAME:
+        raise ValueError(f"{path} is not a partitioned attitude product")
+
+    if index.get("version") != PARTITION_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported partitioned attitude version {index.get('version')} in {path}"
+        )
+
+    return index
+
+
+def _day_start(mjd: int) -> int:
+    """TT epoch (nanoseconds) of the start of day ``mjd``."""
+
+    return (mjd - MJD_UNIX_EPOCH) * NANOSECONDS_PER_DAY
+
+
+def _partition_epoch(entry: dict, which: str) -> int:
+    """TT epoch (nanoseconds) of the ``which`` ("first" or "last") row."""
+
+    return _day_start(entry["mjd"]) + entry[f"{which}_nsec_of_day"]
+
+
+def partition_files(
+    path: str | Path,
+    start: int | None = None,
+    end: int | None = None,
+) -> list[Path]:
+    """
+    Partitions of a partitioned output needed for the window [start, end].
+
+    ``start`` and ``end`` are TT nanoseconds (None for open ends).  Besides
+    the partitions with rows inside the window, the ones holding the rows
+    just before and after it are included, so that every epoch of the
+    window is bracketed by the rows read.
+    """
+
+    path = Path(path)
+    partitions = read_partition_index(path)["partitions"]
+
+    return [path / entry["file"] for entry in _covering(partitions, start, end)]
+
+
+def _covering(entries: list[dict], start: int | None, end: int | None) -> list[dict]:
+    """
+    The entries (partitions or archive days, in order) with rows inside the
+    window [start, end] and the ones holding the rows just outside it.
+    """
+
+    firsts = np.array([_partition_epoch(entry, "first") for entry in entries])
+    lasts = np.array([_partition_epoch(entry, "last") for entry in entries])
+    low, high = 0, len(entries)
+
+    if start is not None:
+        low = int(np.searchsorted(lasts, start, side="left"))
+
+        if low > 0 and (low == len(entries) or firsts[low] > start):
+            low -= 1
+
+    if end is not None:
+        high = int(np.searchsorted(firsts, end, side="right"))
+
+        if high < len(entries) and (high == 0 or lasts[high - 1] < end):
+            high += 1
+
+    return entries[low:high]
+
+
+def read_binary_attitude(path: str | Path, mmap: bool = True) -> dict[str, np.ndarray]:
+    """
+    Open a binary attitude product written by BinaryWriter.
+
+    Returns column name -> array.  With ``mmap`` (the default) the arrays are
+    read-only memory maps of the column files, so nothing is copied until it
+    is used.  The header is available under the ``"header"`` key.
+    """
+
+    path = Path(path)
+    header = _read_binary_header(path)
+    rows = header["rows"]
+    columns: dict[str, np.ndarray] = {}
+
+    for column in header["columns"]:
+        file = path / column["file"]
+        dtype = np.dtype(column["dtype"])
+
+        if rows == 0:
+            columns[column["name"]] = np.empty(0, dtype=dtype)
+        elif mmap:
+            columns[column["name"]] = np.memmap(file, dtype, "r", shape=(rows,))
+        else:
+            columns[column["name"]] = np.fromfile(file, dtype=dtype, count=rows)
+
+    columns["header"] = header
+
+    return columns
+
+
+def is_archive(path: str | Path) -> bool:
+    """Whether ``path`` is an archive written by ArchiveWriter."""
+
+    path = Path(path)
+
+    if not path.is_file():
+        return False
+
+    with path.open("rb") as stream:
+        return stream.read(len(ARCHIVE_MAGIC)) == ARCHIVE_MAGIC
+
+
+def read_archive_index(path: str | Path) -> dict:
+    """The index of an archive; see ArchiveWriter."""
+
+    path = Path(path)
+    trailer = 8 + len(ARCHIVE_MAGIC)
+
+    with path.open("rb") as stream:
+        head = stream.read(len(ARCHIVE_MAGIC))
+        size = stream.seek(0, os.SEEK_END)
+
+        if head != ARCHIVE_MAGIC or size < len(ARCHIVE_MAGIC) + trailer:
+            raise ValueError(f"{path} is not an attitude archive")
+
+        stream.seek(size - trailer)
+        length = int.from_bytes(stream.read(8), "little")
+
+        if stream.read() != ARCHIVE_MAGIC:
+            raise ValueError(f"{path} is an incomplete attitude archive")
+
+        stream.seek(size - trailer - length)
+        index = json.loads(stream.read(length).decode("utf-8"))
+
+    if index.get("format") != ARCHIVE_FORMAT_NAME:
+        raise ValueError(f"{path} is not an attitude archive")
+
+    if index.get("version") != ARCHIVE_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported attitude archive version {index.get('version')} in {path}"
+        )
+
+    return index
+
+
+def read_archive(
+    path: str | Path,
+    start: int | None = None,
+    end: int | None = None,
+) -> dict[str, np.ndarray]:
+    """
+    Decode an archive written by ArchiveWriter.
+
+    Returns column name -> array, as read_binary_attitude does: MJDay and
+    NSecOfDay hold the TT epochs exactly, the value columns are within half
+    the quantum of the archive of the written values (see ARCHIVE_QUANTUM).
+    The index is available under the ``"header"`` key.
+
+    With ``start`` or ``end`` (TT nanoseconds) only the days with rows in
+    the window [start, end], and the ones holding the rows just before and
+    after it, are decompressed and returned.
+    """
+
+    path = Path(path)
+    index = read_archive_index(path)
+    days = _covering(index["days"], start, end)
+    times = [np.empty(0, dtype=np.int64)]
+    values = [np.empty((0, len(index["columns"])), dtype=np.float64)]
+
+    with path.open("rb") as stream:
+        for entry in days:
+            day_times, day_values = _read_archive_day(stream, entry, index)
+            times.append(day_times + _day_start(entry["mjd"]))
+            values.append(day_values)
+
+    mjd_days, nsec_of_day = split_mjd(np.concatenate(times))
+    values = np.concatenate(values)
+    columns: dict[str, np.ndarray] = {
+        "MJDay": mjd_days.astype(BINARY_TIME_COLUMNS["MJDay"]),
+        "NSecOfDay": nsec_of_day.astype(BINARY_TIME_COLUMNS["NSecOfDay"]),
+    }
+
+    for position, name in enumerate(index["columns"]):
+        columns[name] = values[:, position]
+
+    columns["header"] = index
+
+    return columns
+
+
+def _shuffle(array: np.ndarray) -> bytes:
+    """The bytes of ``array`` grouped by significance, which compress better."""
+
+    array = np.ascontiguousarray(array)
+
+    return array.view(np.uint8).reshape(-1, array.itemsize).T.tobytes()
+
+
+def _unshuffle(data: bytes, dtype: str) -> np.ndarray:
+    dtype = np.dtype(dtype)
+
+    return (
+        np.frombuffer(data, dtype=np.uint8)
+        .reshape(dtype.itemsize, -1)
+        .T.copy()
+        .view(dtype)
+        .ravel()
+    )
+
+
+def _narrowest(values: np.ndarray) -> str:
+    """The smallest little-endian integer dtype that holds ``values``."""
+
+    for dtype in ("<i1", "<i2", "<i4"):
+        info = np.iinfo(dtype)
+
+        if not len(values) or (values.min() >= info.min and values.max() <= info.max):
+            return dtype
+
+    return "<i8"
+
+
+def _encode_day(
+    times: np.ndarray,
+    values: np.ndarray,
+    quantum: float,
+) -> tuple[bytes, dict]:
+    """
+    The uncompressed block and index fields of a day of rows.
+
+    ``times`` are increasing nanoseconds of day, ``values`` the (N, K) value
+    columns.
+    """
+
+    steps = np.diff(times)
+    step = 0
+
+    if len(steps):
+        candidates, counts = np.unique(steps, return_counts=True)
+        step = int(candidates[np.argmax(counts)])
+
+    starts = np.concatenate([[0], np.flatnonzero(steps != step) + 1])
+    segments = np.column_stack([times[starts], np.diff(np.append(starts, len(times)))])
+    parts = [_shuffle(segments.astype("<i8").ravel())]
+    heads, dtypes = [], []
+
+    for column in np.rint(values / quantum).astype(np.int64).T:
+        head = []
+
+        for _ in range(ARCHIVE_DELTA_ORDER):
+            if not len(column):
+                break
+
+            head.append(int(column[0]))
+            column = np.diff(column)
+
+        dtype = _narrowest(column)
+        parts.append(_shuffle(column.astype(dtype)))
+        heads.append(head)
+        dtypes.append(dtype)
+
+    entry = {
+        "rows": len(times),
+        "first_nsec_of_day": int(times[0]),
+        "last_nsec_of_day": int(times[-1]),
+        "step": step,
+        "segments": len(starts),
+        "heads": heads,
+        "dtypes": dtypes,
+    }
+
+    return b"".join(parts), entry
+
+
+def _read_archive_day(
+    stream,
+    entry: dict,
+    index: dict,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Nanoseconds of day and (N, K) values of a day block of an archive."""
+
+    stream.seek(entry["offset"])
+    block = ARCHIVE_CODECS[index["codec"]].decompress(stream.read(entry["size"]))
+    rows = entry["rows"]
+
+    size = 16 * entry["segments"]
+    firsts, counts = _unshuffle(block[:size], "<i8").reshape(-1, 2).T
+    offsets = np.arange(rows) - np.repeat(np.cumsum(counts) - counts, counts)
+    times = np.repeat(firsts, counts) + entry["step"] * offsets
+
+    values = np.empty((rows, len(index["columns"])), dtype=np.float64)
+
+    columns = zip(entry["heads"], entry["dtypes"], strict=True)
+
+    for position, (head, dtype) in enumerate(columns):
+        length = (rows - len(head)) * np.dtype(dtype).itemsize
+        column = _unshuffle(block[size : size + length], dtype).astype(np.int64)
+        size += length
+
+        for first in reversed(head):
+            column = np.cumsum(np.concatenate([[first], column]))
+
+        values[:, position] = column * index["quantum"]
+
+    return times, values
+
+
+def _copy_bytes(source, target, size: int) -> None:
+    while size > 0:
+        data = source.read(min(size, CSV_BUFFER_SIZE))
+
+        if not data:
+            raise ValueError("Existing output is shorter than the part to keep")
+
+        target.write(data)
+        size -= len(data)
+
+
+def _prefix_rows(path: Path, output_format: str, keep: int) -> int:
+    """Rows in the leading ``keep`` part of an output (see output_prefix)."""
+
+    if output_format == "binary":
+        return keep
+
+    rows = 0
+
+    with path.open("rb") as stream:
+        while keep > 0:
+            data = stream.read(min(keep, CSV_BUFFER_SIZE))
+            rows += data.count(b"\n")
+            keep -= len(data)
+
+    return rows
+
+
+def _same_output(new: Path, old: Path) -> bool:
+    """Whether two outputs (files or binary directories) hold the same bytes."""
+
+    if not new.is_dir():
+        return old.is_file() and filecmp.cmp(new, old, shallow=False)
+
+    if not old.is_dir():
+        return False
+
+    names = sorted(file.name for file in new.iterdir())
+
+    if names != sorted(file.name for file in old.iterdir()):
+        return False
+
+    return all(filecmp.cmp(new / name, old / name, shallow=False) for name in names)
+
+
+def _remove_output(path: Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path)
+    else:
+        path.unlink(missing_ok=True)
+
+
+def _csv_epoch(line: bytes) -> int:
+    """TT epoch in nanoseconds of an output line, to within ~0.1 microseconds."""
+
+    mjd, sod = line.split(maxsplit=2)[:2]
+
+    return (int(mjd) - MJD_UNIX_EPOCH) * NANOSECONDS_PER_DAY + round(
+        float(sod) * NANOSECONDS_PER_SECOND
+    )
+
+
+def _csv_fields(path: Path, end: int) -> int:
+    """Number of fields on the last line before byte ``end`` of a CSV output."""
+
+    with path.open("rb") as stream:
+        start = max(end - CSV_BUFFER_SIZE, 0)
+        stream.seek(start)
+        lines = stream.read(end - start).splitlines()
+
+    return len(next(line for line in reversed(lines) if line.strip()).split())
+
+
+def _csv_prefix(path: Path, before: int | None) -> tuple[int, int | None]:
+    """
+    Scan a CSV output backwards from its end.
+
+    Returns the byte length of the leading lines with epochs before
+    ``before``, and the epoch of the last line (None for an empty file).
+    Only the tail of the file past that point is read; with ``before`` None
+    the scan stops at the last line.
+    """
+
+    last = None
+
+    with path.open("rb") as stream:
+        start = stream.seek(0, os.SEEK_END)
+        buffer = b""
+        stop = 0
+
+        while True:
+            line_start = buffer.rfind(b"\n", 0, max(stop - 1, 0)) + 1
+
+            if line_start == 0 and start > 0:
+                read = min(CSV_BUFFER_SIZE, start)
+                start -= read
+                stream.seek(start)
+                buffer = stream.read(read) + buffer[:stop]
+                stop += read
+                continue
+
+            line = buffer[line_start:stop]
+
+            if line.strip():
+                epoch = _csv_epoch(line)
+
+                if last is None:
+                    last = epoch
+
+                if before is None or epoch < before:
+                    return start + stop, last
+
+            if line_start == 0:
+                return 0, last
+
+            stop = line_start
+
+
+def output_prefix(path: str | Path, output_format: str, before: int) -> int:
+    """
+    Length of the leading part of an existing output holding the epochs
+    before ``before`` (TT nanoseconds): bytes for CSV, rows for binary.
+
+    This is the ``keep`` argument of open_writer for replacing the tail of
+    the output from ``before`` on.  For partitioned outputs that is
+    ``before`` itself, as it is for archives.
+    """
+
+    path = Path(path)
+
+    if is_partitioned(path) or output_format == "archive":
+        return before
+
+    if output_format == "binary":
+        columns = read_binary_attitude(path)
+        epochs = (
+            columns["MJDay"].astype(np.int64) - MJD_UNIX_EPOCH
+        ) * NANOSECONDS_PER_DAY + columns["NSecOfDay"]
+
+        return int(np.searchsorted(epochs, before, side="left"))
+
+    return _csv_prefix(path, before)[0]
+
+
+def last_output_epoch(path: str | Path, output_format: str) -> int | None:
+    """TT epoch (nanoseconds) of the last row of an existing output, or None."""
+
+    path = Path(path)
+
+    if not path.exists():
+        return None
+
+    if is_partitioned(path):
+        partitions = read_partition_index(path)["partitions"]
+
+        return _partition_epoch(partitions[-1], "last") if partitions else None
+
+    if output_format == "archive":
+        days = read_archive_index(path)["days"]
+
+        return _partition_epoch(days[-1], "last") if days else None
+
+    if output_format == "binary":
+        columns = read_binary_attitude(path)
+
+        if not columns["header"]["rows"]:
+            return None
+
+        days = int(columns["MJDay"][-1]) - MJD_UNIX_EPOCH
+
+        return days * NANOSECONDS_PER_DAY + int(columns["NSecOfDay"][-1])
+
+    return _csv_prefix(path, None)[1]
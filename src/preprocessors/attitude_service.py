@@ -0,0 +1,510 @@
+from __future__ import annotations
+
+import datetime as dt
+import glob
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import threading
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import parse_qs, quote, urlsplit
+
+import numpy as np
+
+from preprocessors.attitude_cache import DEFAULT_CACHE_MAX_BYTES
+from preprocessors.timescales import as_nanoseconds
+
+if TYPE_CHECKING:
+    from preprocessors.attitude_interpolator import AttitudeInterpolator
+
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds between checks of the source files for changes.
+SERVICE_POLL_SEC = 10.0
+
+DEFAULT_SERVICE_HOST = "127.0.0.1"
+DEFAULT_SERVICE_PORT = 8642
+
+# Request bodies are little-endian int64 epochs (nanoseconds since 1970 in the
+# requested scale); responses little-endian float64 rows of the columns named
+# in the COLUMNS_HEADER header.
+EPOCH_DTYPE = "<i8"
+VALUE_DTYPE = "<f8"
+COLUMNS_HEADER = "X-Attitude-Columns"
+
+# Largest request body accepted: 16 Mi epochs.
+MAX_REQUEST_BYTES = 1 << 27
+
+
+@dataclass
+class AttitudeSource:
+    """
+    Where the attitude of one satellite is loaded from.
+
+    Either ``output``, a preprocessed output of any format (see
+    AttitudeInterpolator.from_output), or ``products``, glob patterns of raw
+    products, read as preprocess_attitude would.  The patterns are matched
+    again on every check, so products added later are picked up; with
+    ``cache_dir`` only those are parsed then.
+    """
+
+    satellite: str
+    output: Path | None = None
+    products: list[str] = field(default_factory=list)
+    max_gap: float | None = None
+    cache_dir: Path | None = None
+    cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES
+
+    def __post_init__(self) -> None:
+        self.satellite = self.satellite.lower()
+
+        if (self.output is None) == (not self.products):
+            raise ValueError(
+                f"Give either an output or product patterns for {self.satellite}"
+            )
+
+        if self.output is not None:
+            self.output = Path(self.output)
+
+    def files(self) -> list[Path]:
+        if self.output is not None:
+            return [self.output]
+
+        return sorted(
+            {Path(file) for pattern in self.products for file in glob.glob(pattern)}
+        )
+
+    def signature(self) -> tuple:
+        """
+        Path, modification time and size of every file the source is loaded
+        from (the files in it, for output directories); changes whenever one
+        of them is written, added or removed.
+        """
+
+        entries = []
+
+        for path in self.files():
+            members = sorted(path.iterdir()) if path.is_dir() else [path]
+
+            for member in members:
+                try:
+                    status = member.stat()
+                except FileNotFoundError:
+                    continue
+
+                entries.append((str(member), status.st_mtime_ns, status.st_size))
+
+        return tuple(entries)
+
+    def load(self) -> AttitudeInterpolator:
+        # pandas comes with the readers; clients of the service do not need it.
+        from preprocessors.attitude_interpolator import AttitudeInterpolator
+
+        if self.output is not None:
+            return AttitudeInterpolator.from_output(self.output, max_gap=self.max_gap)
+
+        files = self.files()
+
+        if not files:
+            raise ValueError(
+                f"No attitude products of {self.satellite} match {self.products}"
+            )
+
+        return AttitudeInterpolator.from_files(
+            self.satellite,
+            files,
+            max_gap=self.max_gap,
+            cache_dir=self.cache_dir,
+            cache_max_bytes=self.cache_max_bytes,
+        )
+
+
+@dataclass
+class _Loaded:
+    interpolator: AttitudeInterpolator
+    signature: tuple
+    loaded: dt.datetime
+    loads: int
+
+
+class AttitudeService:
+    """
+    Attitude interpolators of a set of satellites, kept loaded and current.
+
+    Every source is loaded when the service is created.  check (run every
+    ``poll`` seconds by a background thread after start) reloads the
+    sources whose files changed since; a load that fails is logged and the
+    previous interpolator kept.  An interpolator is replaced as a whole once
+    the new one is ready, so evaluate calls running meanwhile, from any
+    thread, use either the old or the new one; they never wait for a load.
+    """
+
+    def __init__(
+        self,
+        sources: list[AttitudeSource],
+        poll: float = SERVICE_POLL_SEC,
+    ) -> None:
+        if not sources:
+            raise ValueError("An attitude service needs at least one source")
+
+        self.sources: dict[str, AttitudeSource] = {}
+
+        for source in sources:
+            if source.satellite in self.sources:
+                raise ValueError(f"Several sources for satellite {source.satellite}")
+
+            self.sources[source.satellite] = source
+
+        self.poll = poll
+        self._loaded: dict[str, _Loaded] = {}
+        # Guards _loaded; only held to look up or swap an interpolator.
+        self._lock = threading.Lock()
+        # Held while a satellite loads, so that it loads once at a time.
+        self._loading = {satellite: threading.Lock() for satellite in self.sources}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        for satellite in self.sources:
+            self.reload(satellite)
+
+    def interpolator(self, satellite: str) -> AttitudeInterpolator:
+        with self._lock:
+            loaded = self._loaded.get(satellite.lower())
+
+        if loaded is None:
+            raise ValueError(f"No attitude loaded for satellite {satellite}")
+
+        return loaded.interpolator
+
+    def evaluate(self, satellite: str, epochs, scale: str = "tt") -> np.ndarray:
+        """AttitudeInterpolator.evaluate of ``satellite``."""
+
+        return self.interpolator(satellite).evaluate(epochs, scale=scale)
+
+    def reload(self, satellite: str, force: bool = False) -> bool:
+        """
+        Load ``satellite`` again if its files changed since it was loaded
+        (or with ``force``).  Returns whether it was loaded.
+        """
+
+        source = self.sources[satellite]
+
+        with self._loading[satellite]:
+            with self._lock:
+                current = self._loaded.get(satellite)
+
+            # Taken first: files written during the load show up next check.
+            signature = source.signature()
+
+            if current is not None and current.signature == signature and not force:
+                return False
+
+            interpolator = source.load()
+
+            with self._lock:
+                self._loaded[satellite] = _Loaded(
+                    interpolator,
+                    signature,
+                    dt.datetime.now(dt.UTC),
+                    1 if current is None else current.loads + 1,
+                )
+
+        logger.info(
+            "Loaded attitude of %s from %s to %s (TT)", satellite, *interpolator.span
+        )
+
+        return True
+
+    def check(self) -> None:
+        """Reload every source whose files changed."""
+
+        for satellite in self.sources:
+            try:
+                self.reload(satellite)
+            except Exception:
+                logger.exception("Keeping the attitude of %s loaded before", satellite)
+
+    def start(self) -> None:
+        """Check the sources for changes every ``poll`` seconds from now on."""
+
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="attitude-service-watch", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll):
+            self.check()
+
+    def status(self) -> dict:
+        """Columns, span, files and load time of every loaded satellite."""
+
+        status = {}
+
+        with self._lock:
+            snapshot = dict(self._loaded)
+
+        for satellite, loaded in snapshot.items():
+            interpolator = loaded.interpolator
+            status[satellite] = {
+                "columns": interpolator.columns,
+                "span_tt": [str(epoch) for epoch in interpolator.span],
+                "files": len(self.sources[satellite].files()),
+                "loaded": loaded.loaded.isoformat(),
+                "loads": loaded.loads,
+            }
+
+        return status
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """
+    GET /satellites: status of the service as JSON.
+
+    POST /attitude/<satellite>?scale=<scale>: the body holds EPOCH_DTYPE
+    epochs in ``scale`` (default tt); the response holds a VALUE_DTYPE row
+    of the COLUMNS_HEADER columns per epoch, as AttitudeInterpolator.evaluate
+    returns them.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "attitude-service"
+
+    def do_GET(self) -> None:
+        if urlsplit(self.path).path.rstrip("/") != "/satellites":
+            self._send_error(HTTPStatus.NOT_FOUND, f"No resource {self.path}")
+            return
+
+        body = json.dumps(self.server.service.status(), indent=2).encode("utf-8")
+        self._send(body, "application/json")
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        parts = url.path.strip("/").split("/")
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+
+        if length < 0:
+            # The end of the body is unknown, so the connection cannot be reused.
+            self.close_connection = True
+            self._send_error(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+            return
+
+        # Read first, so that the connection can be reused after an error.
+        data = self.rfile.read(length) if length <= MAX_REQUEST_BYTES else None
+
+        if len(parts) != 2 or parts[0] != "attitude":
+            self._send_error(HTTPStatus.NOT_FOUND, f"No resource {self.path}")
+            return
+
+        if data is None:
+            self.close_connection = True
+            self._send_error(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"Requests are limited to {MAX_REQUEST_BYTES} bytes",
+            )
+            return
+
+        if length % np.dtype(EPOCH_DTYPE).itemsize:
+            self._send_error(HTTPStatus.BAD_REQUEST, "The body must hold int64 epochs")
+            return
+
+        satellite = parts[1]
+        scale = parse_qs(url.query).get("scale", ["tt"])[-1]
+        service = self.server.service
+
+        if satellite.lower() not in service.sources:
+            self._send_error(HTTPStatus.NOT_FOUND, f"No satellite {satellite}")
+            return
+
+        try:
+            interpolator = service.interpolator(satellite)
+            values = interpolator.evaluate(
+                np.frombuffer(data, dtype=EPOCH_DTYPE), scale=scale
+            )
+        except ValueError as exc:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(exc))
+            return
+
+        self._send(
+            values.astype(VALUE_DTYPE, copy=False).tobytes(),
+            "application/octet-stream",
+            {COLUMNS_HEADER: ",".join(interpolator.columns)},
+        )
+
+    def _send(
+        self,
+        body: bytes,
+        content_type: str,
+        headers: dict | None = None,
+        status: HTTPStatus = HTTPStatus.OK,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: HTTPStatus, message: str) -> None:
+        self._send(message.encode("utf-8"), "text/plain; charset=utf-8", status=status)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format, *args)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(
+    service: AttitudeService,
+    port: int | None = None,
+    socket_path: str | Path | None = None,
+    host: str = DEFAULT_SERVICE_HOST,
+) -> socketserver.BaseServer:
+    """
+    HTTP server of ``service``, on ``host``:``port`` or on the Unix socket
+    ``socket_path``; run it with ``serve_forever``.  A socket file left
+    behind by a server that is gone is replaced.
+    """
+
+    if (port is None) == (socket_path is None):
+        raise ValueError("Serve either on a port or on a Unix socket")
+
+    if socket_path is None:
+        server = ThreadingHTTPServer((host, port), _RequestHandler)
+    else:
+        socket_path = Path(socket_path)
+
+        if _stale_socket(socket_path):
+            socket_path.unlink()
+
+        server = _UnixHTTPServer(str(socket_path), _RequestHandler)
+
+    server.service = service
+
+    return server
+
+
+def _stale_socket(path: Path) -> bool:
+    try:
+        if not stat.S_ISSOCK(path.stat().st_mode):
+            return False
+    except FileNotFoundError:
+        return False
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(str(path))
+        except OSError:
+            return True
+
+    raise ValueError(f"Another server is listening on {path}")
+
+
+class _UnixHTTPConnection(HTTPConnection):
+    def __init__(self, path: str | Path, timeout: float | None = None) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = os.fspath(path)
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class AttitudeClient:
+    """
+    Client of an attitude service (see make_server), on a port or a Unix
+    socket.  The connection is kept open between requests.
+    """
+
+    def __init__(
+        self,
+        port: int | None = None,
+        socket_path: str | Path | None = None,
+        host: str = DEFAULT_SERVICE_HOST,
+        timeout: float | None = 60.0,
+    ) -> None:
+        if (port is None) == (socket_path is None):
+            raise ValueError("Connect either to a port or to a Unix socket")
+
+        if socket_path is None:
+            self._connection = HTTPConnection(host, port, timeout=timeout)
+        else:
+            self._connection = _UnixHTTPConnection(socket_path, timeout=timeout)
+
+    def __enter__(self) -> AttitudeClient:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def satellites(self) -> dict:
+        """The status of the service; see AttitudeService.status."""
+
+        body, _ = self._request("GET", "/satellites")
+
+        return json.loads(body)
+
+    def evaluate(self, satellite: str, epochs, scale: str = "tt") -> np.ndarray:
+        """
+        Attitude of ``satellite`` at ``epochs`` in ``scale``, as
+        AttitudeInterpolator.evaluate returns it.
+        """
+
+        epochs = as_nanoseconds(np.atleast_1d(epochs)).astype(EPOCH_DTYPE, copy=False)
+        body, response = self._request(
+            "POST",
+            f"/attitude/{quote(satellite)}?scale={quote(scale)}",
+            epochs.tobytes(),
+        )
+        columns = response.getheader(COLUMNS_HEADER).split(",")
+
+        return np.frombuffer(body, dtype=VALUE_DTYPE).reshape(-1, len(columns))
+
+    def _request(self, method: str, path: str, body: bytes | None = None):
+        headers = {"Content-Type": "application/octet-stream"} if body else {}
+        self._connection.request(method, path, body=body, headers=headers)
+        response = self._connection.getresponse()
+        data = response.read()
+
+        if response.status != HTTPStatus.OK:
+            raise ValueError(
+                f"Attitude service answered {response.status}: "
+                f"{data.decode('utf-8', 'replace')}"
+            )
+
+        return data, response
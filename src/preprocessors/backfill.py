@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+import logging
+import shutil
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from preprocessors.attitude import (
+    _attitude_frame,
+    _attitude_inputs,
+    _interval_to_nanoseconds,
+    _output_frames,
+    _products_in_range,
+    _write_outputs,
+    preprocess_attitude,
+)
+from preprocessors.attitude_cache import DEFAULT_CACHE_MAX_BYTES
+from preprocessors.attitude_output import (
+    BINARY_TIME_COLUMNS,
+    check_output_format,
+    default_output_file,
+    open_writer,
+    read_binary_attitude,
+)
+from preprocessors.decimation import Decimator
+from preprocessors.metrics import RunMetrics
+from preprocessors.timescales import (
+    MJD_UNIX_EPOCH,
+    NANOSECONDS_PER_DAY,
+    as_nanoseconds,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+BACKFILL_FORMAT_NAME = "attitude-backfill"
+BACKFILL_FORMAT_VERSION = 2
+BACKFILL_MANIFEST = "backfill.json"
+
+# Seconds by which the products read for a chunk reach past its edges, since
+# the times in product names need not match the samples exactly.
+BACKFILL_OVERLAP = 6 * 3600.0
+
+# TT days streamed at a time within a chunk, which bounds worker memory.
+CHUNK_STREAM_DAYS = 1.0
+
+# Rows of a chunk output handed to the final writer at a time.
+STITCH_BLOCK_ROWS = 1 << 20
+
+
+def _chunk_ranges(
+    start: dt.datetime,
+    end: dt.datetime,
+    chunk_days: float,
+) -> list[tuple[dt.datetime, dt.datetime]]:
+    if chunk_days <= 0:
+        raise ValueError("Backfill chunk length must be positive")
+
+    if end <= start:
+        raise ValueError("The backfill range must end after it starts")
+
+    step = dt.timedelta(days=chunk_days)
+    ranges = []
+
+    while start < end:
+        ranges.append((start, min(start + step, end)))
+        start += step
+
+    return ranges
+
+
+def _process_chunk(
+    satellite: str,
+    files: list[Path],
+    start: dt.datetime,
+    end: dt.datetime,
+    output_file: Path,
+    options: dict,
+    trace_memory: bool,
+) -> RunMetrics:
+    """Write one chunk as a binary output; runs in the worker processes."""
+
+    metrics = RunMetrics(trace_memory)
+
+    if not files:
+        # Nothing to read: an empty output still marks the chunk as done.
+        with open_writer(output_file, "binary"):
+            pass
+
+        return metrics
+
+    preprocess_attitude(
+        satellite,
+        files,
+        start=start,
+        end=end,
+        output_file=output_file,
+        output_format="binary",
+        chunk_days=CHUNK_STREAM_DAYS,
+        metrics=metrics,
+        **options,
+    )
+
+    return metrics
+
+
+def _chunk_frames(path: Path) -> Iterator[pd.DataFrame]:
+    """The rows of a chunk output, STITCH_BLOCK_ROWS at a time."""
+
+    columns = read_binary_attitude(path)
+    names = [
+        column["name"]
+        for column in columns["header"]["columns"]
+        if column["name"] not in BINARY_TIME_COLUMNS
+    ]
+
+    for first in range(0, columns["header"]["rows"], STITCH_BLOCK_ROWS):
+        block = slice(first, first + STITCH_BLOCK_ROWS)
+        times = (
+            columns["MJDay"][block].astype(np.int64) - MJD_UNIX_EPOCH
+        ) * NANOSECONDS_PER_DAY + columns["NSecOfDay"][block]
+        values = np.column_stack([columns[name][block] for name in names])
+
+        yield _attitude_frame(values, times, names)
+
+
+def _gap_marked(frames: Iterator[pd.DataFrame], step: int) -> Iterator[pd.DataFrame]:
+    """
+    Put a row of NaNs back wherever consecutive rows are more than ``step``
+    apart.
+
+    Chunk outputs hold no NaN rows, so without these a Decimator would not
+    see where a gap interrupts the series.
+    """
+
+    previous = None
+
+    for df in frames:
+        if df.empty:
+            yield df
+            continue
+
+        times = as_nanoseconds(df.index.values)
+        gaps = np.flatnonzero(
+            np.diff(times, prepend=times[0] if previous is None else previous) > step
+        )
+        previous = times[-1]
+
+        if len(gaps):
+            df = _attitude_frame(
+                np.insert(df.to_numpy(dtype=np.float64), gaps, np.nan, axis=0),
+                np.insert(times, gaps, times[gaps] - step),
+                list(df.columns),
+            )
+
+        yield df
+
+
+def _manifest(
+    satellite: str,
+    files: list[Path],
+    start: dt.datetime,
+    end: dt.datetime,
+    chunk_days: float,
+    options: dict,
+) -> dict:
+    """What the chunk outputs of a backfill depend on."""
+
+    return {
+        "format": BACKFILL_FORMAT_NAME,
+        "version": BACKFILL_FORMAT_VERSION,
+        "satellite": satellite,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "chunk_days": chunk_days,
+        **options,
+        "files": [
+            [str(file), stat.st_size, stat.st_mtime_ns]
+            for file, stat in ((file, file.stat()) for file in files)
+        ],
+    }
+
+
+def _checkpoint(work_dir: Path, manifest: dict) -> None:
+    """Start a work directory, or check that it belongs to this backfill."""
+
+    path = work_dir / BACKFILL_MANIFEST
+
+    if path.exists():
+        existing = json.loads(path.read_text(encoding="utf-8"))
+
+        if existing != json.loads(json.dumps(manifest)):
+            raise ValueError(
+                f"{work_dir} holds a backfill with other inputs or settings; "
+                "remove it to start over"
+            )
+
+        return
+
+    work_dir.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+
+
+def backfill_attitude(
+    satellite: str,
+    qfns: list[str | Path],
+    start: dt.datetime,
+    end: dt.datetime,
+    nsec: float = 5.0,
+    output_file: str | Path | None = None,
+    chunk_days: float = 30.0,
+    jobs: int | None = None,
+    max_gap: float | None = None,
+    output_format: str = "csv",
+    partitioned: bool = False,
+    tolerance: float | None = None,
+    work_dir: str | Path | None = None,
+    keep_chunks: bool = False,
+    overlap: float = BACKFILL_OVERLAP,
+    cache_dir: str | Path | None = None,
+    cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+    metrics: RunMetrics | None = None,
+) -> Path:
+    """
+    Preprocess a long range in chunks on a process pool and stitch them.
+
+    [start, end) (UTC) is split into chunks of ``chunk_days`` days, each
+    processed by preprocess_attitude in one of ``jobs`` worker processes,
+    from the products that may hold samples within ``overlap`` seconds of
+    its edges (and the nearest ones beyond; see _products_in_range).  Grid
+    epochs are absolute multiples of ``nsec`` and every epoch only depends on
+    the samples bracketing it, so each chunk holds exactly the rows of a
+    serial run in its range, and the stitched output is identical to that of
+    ``preprocess_attitude(satellite, qfns, nsec, start, end, ...)``, also
+    when decimated with ``tolerance``: the rows a gap left out of the chunk
+    outputs are marked again before decimation, so it restarts at them.
+
+    Chunk outputs are written in the binary format into ``work_dir``
+    (default ``<output_file>.backfill``), each one as it completes, with a
+    manifest of the inputs and settings.  Running the same backfill again
+    after an interruption only processes the chunks that are missing.  The
+    work directory is removed once the output is written, unless
+    ``keep_chunks``.
+
+    ``output_format``, ``partitioned``, ``max_gap``, ``cache_dir`` and
+    ``cache_max_bytes`` work as in preprocess_attitude.  Per-stage metrics
+    of the chunks are added to ``metrics``, with the "stitch" stage.
+    """
+
+    check_output_format(output_format, partitioned)
+
+    if jobs is not None and jobs < 1:
+        raise ValueError("Number of backfill jobs must be at least 1")
+
+    satellite = satellite.lower()
+    files = [Path(file) for file in qfns]
+
+    if not files:
+        raise ValueError(f"No attitude files provided for satellite {satellite}")
+
+    if output_file is None:
+        output_file = default_output_file(
+            files[0].parent, satellite, output_format, partitioned
+        )
+    else:
+        output_file = Path(output_file)
+
+    work_dir = (
+        output_file.with_name(output_file.name + ".backfill")
+        if work_dir is None
+        else Path(work_dir)
+    )
+    ranges = _chunk_ranges(start, end, chunk_days)
+    body_files, panel_files = _attitude_inputs(satellite, files)
+    options = {"nsec": nsec, "max_gap": max_gap}
+    metrics = metrics if metrics is not None else RunMetrics()
+
+    _checkpoint(
+        work_dir,
+        _manifest(
+            satellite,
+            files,
+            start,
+            end,
+            chunk_days,
+            {**options, "overlap": overlap},
+        ),
+    )
+
+    chunk_files = [
+        work_dir / f"chunk_{index:05d}.columns" for index in range(len(ranges))
+    ]
+    pending = [
+        (chunk_file, chunk_start, chunk_end)
+        for chunk_file, (chunk_start, chunk_end) in zip(
+            chunk_files, ranges, strict=True
+        )
+        if not chunk_file.is_dir()
+    ]
+    margin = dt.timedelta(seconds=overlap)
+
+    logger.info(
+        "Backfilling %s from %s to %s: %d of %d chunks to process",
+        satellite,
+        start,
+        end,
+        len(pending),
+        len(ranges),
+    )
+
+    options.update(cache_dir=cache_dir, cache_max_bytes=cache_max_bytes)
+    tasks = [
+        (
+            satellite,
+            _products_in_range(body_files, chunk_start - margin, chunk_end + margin)
+            + _products_in_range(panel_files, chunk_start - margin, chunk_end + margin),
+            chunk_start,
+            chunk_end,
+            chunk_file,
+            options,
+            metrics.trace_memory,
+        )
+        for chunk_file, chunk_start, chunk_end in pending
+    ]
+
+    with metrics.tracing():
+        if (jobs or 1) == 1:
+            for task in tasks:
+                metrics.add(_process_chunk(*task))
+                logger.info("Finished backfill chunk %s", task[4].name)
+        else:
+            pool = ProcessPoolExecutor(jobs)
+
+            try:
+                futures = {pool.submit(_process_chunk, *task): task for task in tasks}
+
+                for future in as_completed(futures):
+                    metrics.add(future.result())
+                    logger.info("Finished backfill chunk %s", futures[future][4].name)
+            finally:
+                pool.shutdown(cancel_futures=True)
+
+        logger.info("Stitching %d chunks into %s", len(chunk_files), output_file)
+
+        metadata = {"satellite": satellite, "interval_sec": nsec}
+        decimator = None
+
+        if tolerance is not None:
+            decimator = Decimator(tolerance)
+            metadata["tolerance_rad"] = tolerance
+
+        with metrics.stage("stitch"):
+            frames = (
+                df for chunk_file in chunk_files for df in _chunk_frames(chunk_file)
+            )
+
+            if decimator is not None:
+                frames = _gap_marked(frames, _interval_to_nanoseconds(nsec))
+            _write_outputs(
+                [
+                    (
+                        output_file,
+                        metadata,
+                        0,
+                        _output_frames(frames, decimator=decimator, metrics=metrics),
+                    )
+                ],
+                output_format,
+                metrics,
+                partitioned,
+            )
+
+    if not keep_chunks:
+        shutil.rmtree(work_dir)
+
+    return output_file
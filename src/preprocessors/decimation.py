@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from preprocessors.interpolation import _SMALL_ANGLE
+from preprocessors.timescales import as_nanoseconds
+
+
+# Candidate steps tried in one vectorised evaluation; see Decimator._farthest.
+DENSE_SEARCH = 16
+
+
+def _dot(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # Dot products along the last axis.
+    return np.einsum("...i,...i->...", a, b)
+
+
+def quaternion_angle(p: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """
+    Rotation angle (radians) between rows of two (N, 4) unit quaternion arrays.
+
+    Computed as 4 atan2(|p - q|, |p + q|) on the same hemisphere, which
+    stays accurate for the micro-radian angles decimation is about (unlike
+    2 arccos of the dot product).
+    """
+
+    q = q * np.where(_dot(p, q) < 0.0, -1.0, 1.0)[:, None]
+    difference = p - q
+    total = p + q
+
+    return 4.0 * np.arctan2(
+        np.sqrt(_dot(difference, difference)), np.sqrt(_dot(total, total))
+    )
+
+
+class Decimator:
+    """
+    Drop output rows that interpolation between the kept ones reproduces.
+
+    Frames are TT-indexed like the preprocessed output: the first four
+    columns are a unit quaternion, any further columns (panel angles) are
+    interpolated linearly.  Rows are kept greedily: from each kept row the
+    next one is (about) the farthest such that SLERP between the two
+    reproduces every row in between within ``tolerance`` radians, and linear
+    interpolation the other columns within ``panel_tolerance`` (in their
+    own units; ``tolerance`` if None).  The first and last row of every run of
+    valid rows are always kept; rows with NaNs are dropped.
+
+    The next row is searched by doubling the step, then bisecting, so each
+    kept row costs O(L log L) for L rows to the next one.  Frames are
+    pushed in time order; rows that may still depend on later frames are
+    held back until they do not, so decimating a series in chunks gives the
+    same rows as decimating it at once.
+    """
+
+    def __init__(self, tolerance: float, panel_tolerance: float | None = None) -> None:
+        if tolerance <= 0.0:
+            raise ValueError(f"Decimation tolerance must be positive, got {tolerance}")
+
+        self.tolerance = tolerance
+        self.panel_tolerance = tolerance if panel_tolerance is None else panel_tolerance
+        self._chord2 = (2.0 * math.sin(tolerance / 4.0)) ** 2
+        self.rows_in = 0
+        self.rows_out = 0
+        # Rows not decided yet; the first one is kept already if _anchored.
+        self._pending: pd.DataFrame | None = None
+        self._anchored = False
+        self._empty = pd.DataFrame()
+
+    def push(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Add the next frame; return the rows that are decided to be kept."""
+
+        self.rows_in += len(df)
+        frame = df if self._pending is None else pd.concat([self._pending, df])
+
+        return self._decimate(frame, final=False)
+
+    def finish(self) -> pd.DataFrame:
+        """Return the rows still held back, at the end of the series."""
+
+        if self._pending is None:
+            return self._empty
+
+        return self._decimate(self._pending, final=True)
+
+    def _fits(
+        self,
+        times: np.ndarray,
+        values: np.ndarray,
+        anchor: int,
+        ends: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Whether interpolating from ``anchor`` to each of ``ends`` reproduces
+        the rows in between.
+
+        Same arithmetic as the slerp and interp_linear kernels, evaluated for
+        all the ends at once on a padded (ends, rows) array, since for short
+        steps calling the kernels per end costs more than the evaluation.
+        """
+
+        ends = np.asarray(ends)
+        rows = np.arange(anchor + 1, ends.max())
+
+        if not len(rows):
+            return np.ones(len(ends), dtype=bool)
+
+        inside = rows[None, :] < ends[:, None]
+        elapsed = times[rows] - times[anchor]
+        span = times[ends] - times[anchor]
+        tau = elapsed[None, :] / span[:, None]
+
+        q0 = values[anchor, :4]
+        q1 = values[ends, :4]
+        cos_theta = _dot(q1, q0)
+        q1 = np.where((cos_theta < 0.0)[:, None], -q1, q1)
+        theta = np.arccos(np.clip(np.abs(cos_theta), 0.0, 1.0))[:, None]
+
+        small = theta < _SMALL_ANGLE
+        safe_sin = np.where(small, 1.0, np.sin(theta))
+        w0 = np.where(small, 1.0 - tau, np.sin((1.0 - tau) * theta) / safe_sin)
+        w1 = np.where(small, tau, np.sin(tau * theta) / safe_sin)
+
+        estimate = w0[..., None] * q0 + w1[..., None] * q1[:, None, :]
+        estimate /= np.sqrt(_dot(estimate, estimate))[..., None]
+
+        # Compare chords rather than angles: two unit quaternions a rotation
+        # angle x apart are 2 sin(x / 4) apart, on the same hemisphere.
+        reference = values[rows, :4]
+        estimate *= np.where(_dot(estimate, reference) < 0.0, -1.0, 1.0)[..., None]
+        chord = estimate - reference
+        misfit = _dot(chord, chord) > self._chord2
+
+        if values.shape[1] > 4:
+            v0 = values[anchor, 4:]
+            estimate = v0 + tau[..., None] * (values[ends, 4:] - v0)[:, None, :]
+            error = np.abs(estimate - values[rows, 4:])
+            misfit |= (error > self.panel_tolerance).any(axis=-1)
+
+        return ~(misfit & inside).any(axis=1)
+
+    def _first_misfit(
+        self,
+        times: np.ndarray,
+        values: np.ndarray,
+        anchor: int,
+        first: int,
+        last: int,
+    ) -> int | None:
+        """First row in [first, last] that does not fit as the next one."""
+
+        if first > last:
+            return None
+
+        fits = self._fits(times, values, anchor, np.arange(first, last + 1))
+
+        if fits.all():
+            return None
+
+        return first + int(np.argmin(fits))
+
+    def _farthest(
+        self,
+        times: np.ndarray,
+        values: np.ndarray,
+        anchor: int,
+        limit: int,
+        closed: bool,
+    ) -> int | None:
+        """
+        Row up to ``limit`` to keep after ``anchor``.
+
+        The DENSE_SEARCH rows after ``anchor`` are tried together; past them
+        the step is doubled until it does not fit, then bisected down to
+        DENSE_SEARCH candidates, which are tried together again.  None if the
+        result depends on rows past ``limit`` that are not there yet
+        (``closed`` False).
+        """
+
+        last = min(anchor + DENSE_SEARCH, limit)
+        misfit = self._first_misfit(times, values, anchor, anchor + 2, last)
+
+        if misfit is not None:
+            return misfit - 1
+
+        if last < anchor + DENSE_SEARCH:
+            return limit if closed else None
+
+        good, bad, step = last, None, 2 * DENSE_SEARCH
+
+        while bad is None and good < limit:
+            probe = anchor + step
+
+            if probe > limit:
+                if not closed:
+                    return None
+                probe = limit
+
+            if self._fits(times, values, anchor, [probe])[0]:
+                good = probe
+            else:
+                bad = probe
+
+            step *= 2
+
+        if bad is None:
+            return good if closed else None
+
+        while bad - good > DENSE_SEARCH:
+            middle = (good + bad) // 2
+
+            if self._fits(times, values, anchor, [middle])[0]:
+                good = middle
+            else:
+                bad = middle
+
+        misfit = self._first_misfit(times, values, anchor, good + 1, bad - 1)
+
+        return (bad if misfit is None else misfit) - 1
+
+    def _decimate(self, frame: pd.DataFrame, final: bool) -> pd.DataFrame:
+        times = as_nanoseconds(frame.index.values)
+        values = frame.to_numpy(dtype=np.float64)
+        is_valid = ~np.isnan(values).any(axis=1)
+        valid = np.flatnonzero(is_valid)
+        invalid = np.flatnonzero(~is_valid)
+
+        kept = []
+        anchored = self._anchored
+        row = 0
+
+        while row < len(frame):
+            if not is_valid[row]:
+                # Skip to the next valid row.
+                following = np.searchsorted(valid, row)
+                row = valid[following] if following < len(valid) else len(frame)
+                anchored = False
+                continue
+
+            if not anchored:
+                kept.append(row)
+                anchored = True
+
+            following = np.searchsorted(invalid, row)
+            if following < len(invalid):
+                limit, closed = invalid[following] - 1, True
+            else:
+                limit, closed = len(frame) - 1, final
+
+            if limit == row:
+                if not closed:
+                    break
+                row += 1
+                anchored = False
+                continue
+
+            farthest = self._farthest(times, values, row, limit, closed)
+
+            if farthest is None:
+                break
+
+            row = farthest
+            anchored = False
+
+        self._empty = frame.iloc[:0]
+        self._pending = frame.iloc[row:] if row < len(frame) else None
+        self._anchored = anchored and self._pending is not None
+        self.rows_out += len(kept)
+
+        return frame.iloc[kept]
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+# Number of target epochs evaluated per block; bounds the size of the
+# temporaries independently of the grid length.
+BLOCK_SIZE = 65536
+
+# Below this angle between bracketing quaternions SLERP weights are replaced
+# by linear ones (the two agree to machine precision there).
+_SMALL_ANGLE = 1e-10
+
+
+def _brackets(
+    source_times: np.ndarray,
+    target_times: np.ndarray,
+    max_gap: float | None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Locate the source interval [i, i + 1] holding each target epoch.
+
+    Returns the left indices, the normalised position inside the interval and
+    a mask of targets that fall inside a source gap longer than ``max_gap``.
+    Targets before (after) the source span get the first (last) interval,
+    with ``tau`` below 0 (above 1).
+    """
+
+    last = len(source_times) - 1
+    left = np.searchsorted(source_times, target_times, side="right") - 1
+    np.clip(left, 0, last - 1, out=left)
+
+    t0 = source_times[left]
+    t1 = source_times[left + 1]
+    span = t1 - t0
+    tau = (target_times - t0) / span
+
+    if max_gap is None:
+        in_gap = np.zeros(len(target_times), dtype=bool)
+    else:
+        # An exact hit on a source epoch is still valid at the edge of a gap.
+        in_gap = (span > max_gap) & (tau != 0.0) & (tau != 1.0)
+
+    return left, tau, in_gap
+
+
+def _check_source(source_times: np.ndarray, source_values: np.ndarray) -> None:
+    if len(source_times) < 2:
+        raise ValueError("Interpolation needs at least two source epochs")
+
+    if len(source_values) != len(source_times):
+        raise ValueError("Source epochs and values have different lengths")
+
+    if np.any(np.diff(source_times) <= 0):
+        raise ValueError("Source epochs must be strictly increasing")
+
+
+def _output_buffer(out: np.ndarray | None, rows: int, columns: int) -> np.ndarray:
+    if out is None:
+        return np.empty((rows, columns), dtype=np.float64)
+
+    if out.shape != (rows, columns) or out.dtype != np.float64:
+        raise ValueError(f"Output buffer must be a ({rows}, {columns}) float64 array")
+
+    return out
+
+
+def _unit_quaternions(quaternions: np.ndarray) -> np.ndarray:
+    quaternions = np.array(quaternions, dtype=np.float64, order="C", ndmin=2)
+    quaternions /= np.linalg.norm(quaternions, axis=1, keepdims=True)
+
+    return quaternions
+
+
+def slerp(
+    source_times: np.ndarray,
+    source_quaternions: np.ndarray,
+    target_times: np.ndarray,
+    max_gap: float | None = None,
+    out: np.ndarray | None = None,
+    validate: bool = True,
+) -> np.ndarray:
+    """
+    Spherical linear interpolation of unit quaternions.
+
+    ``source_times`` must be strictly increasing; ``source_quaternions`` is a
+    (N, 4) array in any component order (the kernel does not care which
+    component is the scalar).  Times may be in any unit as long as
+    ``target_times`` and ``max_gap`` use the same one; with int64 epochs the
+    interpolation weights are computed from exact integer differences.
+
+    q and -q are the same rotation: when the two quaternions bracketing a
+    target lie in opposite hemispheres the second one is negated, so every
+    bracket takes the short arc.  The sign of each result follows the left
+    quaternion of its bracket, which makes results independent of how much
+    of the source series is passed in.
+
+    Targets outside the source span, or inside a source gap longer than
+    ``max_gap``, are set to NaN.  The result is written to ``out`` (a (M, 4)
+    float64 array, possibly a column slice of a wider one) if given,
+    otherwise to a new array.
+
+    With ``validate=False`` the source is used as given: the caller has
+    checked it and normalised the quaternions once, up front.  This makes a
+    call cost independent of the source length.
+    """
+
+    source_times = np.asarray(source_times)
+    target_times = np.asarray(target_times)
+
+    if validate:
+        _check_source(source_times, source_quaternions)
+        quaternions = _unit_quaternions(source_quaternions)
+    else:
+        quaternions = source_quaternions
+
+    out = _output_buffer(out, len(target_times), 4)
+
+    for first in range(0, len(target_times), BLOCK_SIZE):
+        block = slice(first, first + BLOCK_SIZE)
+        left, tau, in_gap = _brackets(source_times, target_times[block], max_gap)
+
+        q0 = quaternions[left]
+        q1 = quaternions[left + 1]
+
+        cos_theta = np.einsum("ij,ij->i", q0, q1)
+        opposite = cos_theta < 0.0
+        q1[opposite] *= -1.0
+        cos_theta = np.clip(np.abs(cos_theta), 0.0, 1.0)
+        theta = np.arccos(cos_theta)
+        sin_theta = np.sin(theta)
+
+        small = theta < _SMALL_ANGLE
+        safe_sin = np.where(small, 1.0, sin_theta)
+        w0 = np.where(small, 1.0 - tau, np.sin((1.0 - tau) * theta) / safe_sin)
+        w1 = np.where(small, tau, np.sin(tau * theta) / safe_sin)
+
+        result = out[block]
+        np.multiply(q0, w0[:, None], out=result)
+        result += q1 * w1[:, None]
+        result /= np.linalg.norm(result, axis=1, keepdims=True)
+        result[in_gap | (tau < 0.0) | (tau > 1.0)] = np.nan
+
+    return out
+
+
+def interp_linear(
+    source_times: np.ndarray,
+    source_values: np.ndarray,
+    target_times: np.ndarray,
+    max_gap: float | None = None,
+    out: np.ndarray | None = None,
+    left: float = np.nan,
+    right: float | None = None,
+    validate: bool = True,
+) -> np.ndarray:
+    """
+    Linear interpolation of the columns of a (N, K) array, like ``np.interp``.
+
+    Targets before the first source epoch get ``left``; targets after the
+    last one get ``right``, or hold the last source value if ``right`` is
+    None.  Targets inside a source gap longer than ``max_gap`` are NaN.  The
+    result is written to ``out`` (a (M, K) float64 array) if given.
+    ``validate=False`` skips the source checks, as for slerp.
+    """
+
+    source_times = np.asarray(source_times)
+    target_times = np.asarray(target_times)
+    values = np.asarray(source_values, dtype=np.float64)
+
+    if values.ndim == 1:
+        values = values[:, None]
+
+    if validate:
+        _check_source(source_times, values)
+
+    out = _output_buffer(out, len(target_times), values.shape[1])
+
+    for first in range(0, len(target_times), BLOCK_SIZE):
+        block = slice(first, first + BLOCK_SIZE)
+        index, tau, in_gap = _brackets(source_times, target_times[block], max_gap)
+
+        result = out[block]
+        v0 = values[index]
+        np.subtract(values[index + 1], v0, out=result)
+        result *= tau[:, None]
+        result += v0
+
+        result[tau < 0.0] = left
+        result[tau > 1.0] = values[-1] if right is None else right
+        result[in_gap] = np.nan
+
+    return out
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+@dataclass
+class MergeStats:
+    """What was seen while merging products into one series."""
+
+    runs: int = 0
+    samples: int = 0
+    duplicates: int = 0
+    unsorted_runs: int = 0
+    overlapping_runs: int = 0
+    overlap_samples: int = 0
+    _latest: int | None = field(default=None, repr=False, compare=False)
+
+    @property
+    def merged(self) -> int:
+        """Samples left after dropping those overridden by a later one."""
+
+        return self.samples - self.duplicates
+
+    def add_run(self, times: np.ndarray) -> None:
+        """Count a sorted run against the runs added before it."""
+
+        self.runs += 1
+
+        if self._latest is not None and times[0] <= self._latest:
+            self.overlapping_runs += 1
+            self.overlap_samples += int(
+                np.searchsorted(times, self._latest, side="right")
+            )
+
+        if self._latest is None or times[-1] > self._latest:
+            self._latest = int(times[-1])
+
+
+def sorted_run(
+    times: np.ndarray,
+    values: np.ndarray,
+    stats: MergeStats | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Make one product a strictly increasing run.
+
+    Products are normally sorted already, which is checked in O(n).
+    Otherwise they are sorted stably and, for repeated epochs, the last
+    sample is kept, as for repeated epochs across products.
+    """
+
+    if stats is not None:
+        stats.samples += len(times)
+
+    if len(times) < 2 or np.all(times[1:] > times[:-1]):
+        return times, values
+
+    order = np.argsort(times, kind="stable")
+    times = times[order]
+    values = values[order]
+
+    last = np.append(times[1:] != times[:-1], True)
+
+    if stats is not None:
+        stats.unsorted_runs += 1
+        stats.duplicates += int(len(last) - np.count_nonzero(last))
+
+    return times[last], values[last]
+
+
+def merge_pair(
+    a_times: np.ndarray,
+    a_values: np.ndarray,
+    b_times: np.ndarray,
+    b_values: np.ndarray,
+    stats: MergeStats | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Merge two strictly increasing runs; ``b`` wins on equal epochs.
+
+    Only the window where the runs overlap is merged element by element,
+    the parts before and after it are copied as they are, so merging
+    products that barely overlap costs little more than concatenating them.
+    """
+
+    if not len(a_times):
+        return b_times, b_values
+
+    if not len(b_times):
+        return a_times, a_values
+
+    if a_times[-1] < b_times[0]:
+        return (
+            np.concatenate([a_times, b_times]),
+            np.concatenate([a_values, b_values]),
+        )
+
+    first = np.searchsorted(a_times, b_times[0], side="left")
+    stop = np.searchsorted(b_times, a_times[-1], side="right")
+
+    x_times, x_values = a_times[first:], a_values[first:]
+    y_times, y_values = b_times[:stop], b_values[:stop]
+
+    # Drop the samples of ``a`` that ``b`` overrides.
+    index = np.searchsorted(y_times, x_times, side="left")
+    kept = y_times[np.minimum(index, len(y_times) - 1)] != x_times
+    x_times, x_values = x_times[kept], x_values[kept]
+
+    if stats is not None:
+        stats.duplicates += int(len(kept) - np.count_nonzero(kept))
+
+    size = len(x_times) + len(y_times)
+    x_slots = np.arange(len(x_times)) + np.searchsorted(y_times, x_times)
+    y_slots = np.arange(len(y_times)) + np.searchsorted(x_times, y_times)
+
+    times = np.empty(size, dtype=a_times.dtype)
+    values = np.empty((size, *a_values.shape[1:]), dtype=a_values.dtype)
+    times[x_slots], values[x_slots] = x_times, x_values
+    times[y_slots], values[y_slots] = y_times, y_values
+
+    return (
+        np.concatenate([a_times[:first], times, b_times[stop:]]),
+        np.concatenate([a_values[:first], values, b_values[stop:]]),
+    )
+
+
+def merge_runs(
+    runs,
+    stats: MergeStats | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    K-way merge of products into one strictly increasing series.
+
+    ``runs`` is an iterable of (int64 epochs, (n, K) values) pairs in
+    product order; for equal epochs the sample of the later product wins,
+    which is the same result as a stable sort of the concatenation keeping
+    the last duplicate.  Adjacent runs are merged pairwise, level by level,
+    in O(N log k) for N samples in k products.  Overlap statistics are
+    added to ``stats``.
+    """
+
+    stats = stats if stats is not None else MergeStats()
+    prepared = []
+
+    for times, values in runs:
+        if not len(times):
+            continue
+
+        times, values = sorted_run(times, values, stats)
+        stats.add_run(times)
+        prepared.append((times, values))
+
+    if not prepared:
+        raise ValueError("No attitude samples to merge")
+
+    while len(prepared) > 1:
+        merged = [
+            merge_pair(*prepared[i], *prepared[i + 1], stats)
+            for i in range(0, len(prepared) - 1, 2)
+        ]
+
+        if len(prepared) % 2:
+            merged.append(prepared[-1])
+
+        prepared = merged
+
+    return prepared[0]
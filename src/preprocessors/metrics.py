@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import json
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from preprocessors.merge import MergeStats
+
+
+@dataclass
+class StageMetrics:
+    """Totals over every call of one processing stage."""
+
+    calls: int = 0
+    wall_sec: float = 0.0
+    cpu_sec: float = 0.0
+    # Largest traced memory seen during a call, or None if not traced.
+    peak_bytes: int | None = None
+    rows_in: int = 0
+    rows_out: int = 0
+
+    def add(self, other: StageMetrics) -> None:
+        self.calls += other.calls
+        self.wall_sec += other.wall_sec
+        self.cpu_sec += other.cpu_sec
+        self.rows_in += other.rows_in
+        self.rows_out += other.rows_out
+        self._peak(other.peak_bytes)
+
+    def _peak(self, peak: int | None) -> None:
+        if peak is not None:
+            self.peak_bytes = max(self.peak_bytes or 0, peak)
+
+
+@dataclass
+class RunMetrics:
+    """
+    Per-stage timing, memory and row counts of a preprocess_attitude run.
+
+    Stages are timed with a wall and a CPU clock; with ``trace_memory`` the
+    peak traced memory (tracemalloc, which slows allocation-heavy code
+    down) is recorded as well.  Stages may nest.  Stages run in parser
+    worker processes are measured there and added up, so with several jobs
+    their times can exceed the elapsed time of the run.
+
+    ``sources`` holds the merge statistics of each source series ("body",
+    "panel").
+    """
+
+    trace_memory: bool = False
+    stages: dict[str, StageMetrics] = field(default_factory=dict)
+    sources: dict[str, MergeStats] = field(default_factory=dict)
+    _open: list[StageMetrics] = field(default_factory=list, repr=False)
+
+    def __getstate__(self) -> dict:
+        # Sent back from worker processes between stages; nothing is open.
+        return {"trace_memory": self.trace_memory, "stages": self.stages}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(**state)
+
+    def source(self, name: str) -> MergeStats:
+        return self.sources.setdefault(name, MergeStats())
+
+    def _fold_peak(self) -> None:
+        # Charge the peak since the last fold to every open stage, then start
+        # a new measurement, so that nested stages all see their own peak.
+        if not (self.trace_memory and tracemalloc.is_tracing()):
+            return
+
+        _, peak = tracemalloc.get_traced_memory()
+        for record in self._open:
+            record._peak(peak)
+
+        tracemalloc.reset_peak()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageMetrics]:
+        """
+        Time the body as one call of stage ``name``.
+
+        Yields the stage totals, for the caller to add its row counts to.
+        """
+
+        record = self.stages.setdefault(name, StageMetrics())
+        self._fold_peak()
+        self._open.append(record)
+        wall = time.perf_counter()
+        cpu = time.process_time()
+
+        try:
+            yield record
+        finally:
+            record.calls += 1
+            record.wall_sec += time.perf_counter() - wall
+            record.cpu_sec += time.process_time() - cpu
+            self._fold_peak()
+            del self._open[
+                next(i for i, open_ in enumerate(self._open) if open_ is record)
+            ]
+
+    @contextmanager
+    def tracing(self) -> Iterator[None]:
+        """Trace memory allocations in the body if ``trace_memory`` is set."""
+
+        start = self.trace_memory and not tracemalloc.is_tracing()
+
+        if start:
+            tracemalloc.start()
+
+        try:
+            yield
+        finally:
+            if start:
+                tracemalloc.stop()
+
+    def add(self, other: RunMetrics) -> None:
+        """Add the stage totals measured in another process."""
+
+        for name, record in other.stages.items():
+            self.stages.setdefault(name, StageMetrics()).add(record)
+
+    def as_dict(self) -> dict:
+        return {
+            "stages": {name: asdict(record) for name, record in self.stages.items()},
+            "sources": {
+                name: {
+                    key: value
+                    for key, value in asdict(stats).items()
+                    if not key.startswith("_")
+                }
+                for name, stats in self.sources.items()
+            },
+        }
+
+    def write_json(self, path: str | Path, **extra) -> None:
+        """Write as_dict, plus any ``extra`` top-level entries, as JSON."""
+
+        with open(path, "w") as out:
+            json.dump({**extra, **self.as_dict()}, out, indent=2)
+            out.write("\n")
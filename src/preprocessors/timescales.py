@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import datetime as dt
+
+import numpy as np
+
+
+NANOSECONDS_PER_SECOND = 1_000_000_000
+NANOSECONDS_PER_DAY = 86_400 * NANOSECONDS_PER_SECOND
+
+# MJD of the datetime64 epoch, 1970-01-01T00:00:00.
+MJD_UNIX_EPOCH = 40587
+
+TT_MINUS_TAI_NS = 32_184_000_000
+TAI_MINUS_GPST_NS = 19 * NANOSECONDS_PER_SECOND
+
+SUPPORTED_SCALES = ("utc", "tai", "gpst", "tt")
+
+# UTC dates from which TAI - UTC takes the given (integer) number of seconds.
+# Source: IERS Bulletin C.  No leap second has been announced after 2017-01-01;
+# extend this table when one is.
+LEAP_SECONDS = (
+    (dt.date(1972, 1, 1), 10),
+    (dt.date(1972, 7, 1), 11),
+    (dt.date(1973, 1, 1), 12),
+    (dt.date(1974, 1, 1), 13),
+    (dt.date(1975, 1, 1), 14),
+    (dt.date(1976, 1, 1), 15),
+    (dt.date(1977, 1, 1), 16),
+    (dt.date(1978, 1, 1), 17),
+    (dt.date(1979, 1, 1), 18),
+    (dt.date(1980, 1, 1), 19),
+    (dt.date(1981, 7, 1), 20),
+    (dt.date(1982, 7, 1), 21),
+    (dt.date(1983, 7, 1), 22),
+    (dt.date(1985, 7, 1), 23),
+    (dt.date(1988, 1, 1), 24),
+    (dt.date(1990, 1, 1), 25),
+    (dt.date(1991, 1, 1), 26),
+    (dt.date(1992, 7, 1), 27),
+    (dt.date(1993, 7, 1), 28),
+    (dt.date(1994, 7, 1), 29),
+    (dt.date(1996, 1, 1), 30),
+    (dt.date(1997, 7, 1), 31),
+    (dt.date(1999, 1, 1), 32),
+    (dt.date(2006, 1, 1), 33),
+    (dt.date(2009, 1, 1), 34),
+    (dt.date(2012, 7, 1), 35),
+    (dt.date(2015, 7, 1), 36),
+    (dt.date(2017, 1, 1), 37),
+)
+
+_LEAP_UTC_NS = np.array(
+    [np.datetime64(date, "ns").astype(np.int64) for date, _ in LEAP_SECONDS],
+    dtype=np.int64,
+)
+_LEAP_OFFSET_NS = np.array(
+    [seconds * NANOSECONDS_PER_SECOND for _, seconds in LEAP_SECONDS],
+    dtype=np.int64,
+)
+# The same instants expressed in TAI, for the inverse lookup.
+_LEAP_TAI_NS = _LEAP_UTC_NS + _LEAP_OFFSET_NS
+
+
+def as_nanoseconds(times) -> np.ndarray:
+    """Return datetime-like input as an int64 nanosecond array (a view if possible)."""
+
+    array = np.asarray(times)
+
+    if array.dtype.kind == "M":
+        return array.astype("datetime64[ns]", copy=False).view(np.int64)
+
+    if array.dtype.kind == "O":
+        return array.astype("datetime64[ns]").view(np.int64)
+
+    if array.dtype.kind in "iu":
+        return array.astype(np.int64, copy=False)
+
+    raise TypeError(f"Cannot interpret {array.dtype} values as epochs")
+
+
+def _check_scale(scale: str) -> str:
+    scale = scale.lower()
+
+    if scale not in SUPPORTED_SCALES:
+        raise ValueError(
+            f"Unsupported time scale {scale!r}; use one of {SUPPORTED_SCALES}"
+        )
+
+    return scale
+
+
+def _lookup(table: np.ndarray, nsec: np.ndarray) -> np.ndarray:
+    index = np.searchsorted(table, nsec, side="right") - 1
+
+    if nsec.size and index.min() < 0:
+        raise ValueError("UTC is only supported from 1972-01-01 onwards")
+
+    return _LEAP_OFFSET_NS[index]
+
+
+def tai_minus_utc(times) -> np.ndarray:
+    """Return TAI - UTC in int64 nanoseconds for UTC epochs."""
+
+    return _lookup(_LEAP_UTC_NS, as_nanoseconds(times))
+
+
+def _to_tai_ns(nsec: np.ndarray, scale: str) -> np.ndarray:
+    if scale == "tai":
+        return nsec
+    if scale == "utc":
+        return nsec + _lookup(_LEAP_UTC_NS, nsec)
+    if scale == "gpst":
+        return nsec + TAI_MINUS_GPST_NS
+    return nsec - TT_MINUS_TAI_NS
+
+
+def _from_tai_ns(nsec: np.ndarray, scale: str) -> np.ndarray:
+    if scale == "tai":
+        return nsec
+    if scale == "utc":
+        return nsec - _lookup(_LEAP_TAI_NS, nsec)
+    if scale == "gpst":
+        return nsec - TAI_MINUS_GPST_NS
+    return nsec + TT_MINUS_TAI_NS
+
+
+def convert(times, from_scale: str, to_scale: str = "tt") -> np.ndarray:
+    """
+    Convert datetime64 epochs between the UTC, TAI, GPST and TT time scales.
+
+    All arithmetic is done on int64 nanoseconds, so the conversion is exact.
+    Epochs inside a positive leap second cannot be represented by datetime64
+    and are not supported.  Returns datetime64[ns].
+    """
+
+    from_scale = _check_scale(from_scale)
+    to_scale = _check_scale(to_scale)
+
+    nsec = as_nanoseconds(times)
+
+    if from_scale != to_scale:
+        nsec = _from_tai_ns(_to_tai_ns(nsec, from_scale), to_scale)
+
+    return nsec.view("datetime64[ns]")
+
+
+def to_tt(times, scale: str) -> np.ndarray:
+    """Convert datetime64 epochs in ``scale`` to TT datetime64[ns]."""
+
+    return convert(times, scale, "tt")
+
+
+def split_mjd(times) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Split datetime64 epochs into integer MJD and integer nanoseconds of day.
+
+    The split is done in whatever time scale the epochs are expressed in.
+    """
+
+    days, nsec_of_day = np.divmod(as_nanoseconds(times), NANOSECONDS_PER_DAY)
+
+    return days + MJD_UNIX_EPOCH, nsec_of_day
+
+
+def to_mjd(times) -> np.ndarray:
+    """Return datetime64 epochs as (float) Modified Julian Dates."""
+
+    mjd, nsec_of_day = split_mjd(times)
+
+    return mjd + nsec_of_day / NANOSECONDS_PER_DAY
+
+
+def from_mjd(mjd) -> np.ndarray:
+    """Return (float) Modified Julian Dates as datetime64[ns], rounded to 1 ns."""
+
+    mjd = np.asarray(mjd, dtype=float)
+    days = np.floor(mjd)
+    nsec = np.rint((mjd - days) * NANOSECONDS_PER_DAY).astype(np.int64)
+
+    epochs = (days.astype(np.int64) - MJD_UNIX_EPOCH) * NANOSECONDS_PER_DAY + nsec
+
+    return epochs.view("datetime64[ns]")
@@ -5,8 +5,6 @@ import logging
 from pathlib import Path
 from os.path import expanduser
 
-import boto3
-
 from sources.attitude import (
     dates_to_scan_for_range,
     product_overlaps_range,
@@ -57,6 +55,9 @@ def read_s3cfg(path: str | Path | None = None) -> dict[str, str]:
 
 
 def eodata_bucket(s3cfg: str | Path | None = None):
+    # boto3 takes most of a second to import; only the S3 access needs it.
+    import boto3
+
     config = read_s3cfg(s3cfg)
 
     s3 = boto3.resource(
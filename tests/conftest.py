@@ -0,0 +1,78 @@
+"""Shared fixtures: small synthetic attitude products."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests.helpers import attitude_profile
+
+
+def write_jason_products(
+    directory: Path,
+    start: str = "2024-01-01",
+    hours: float = 6.0,
+    rate: float = 1.0,
+    panel_rate: float = 3.0,
+) -> list[Path]:
+    """
+    Write a Jason-2/3 style qbody/qsolp pair and return both paths.
+
+    Body epochs carry a sub-millisecond jitter so that the output grid never
+    coincides with source epochs.
+    """
+
+    directory.mkdir(parents=True, exist_ok=True)
+    t0 = pd.Timestamp(start)
+    tag = t0.strftime("%Y%m%d%H%M%S")
+    rng = np.random.default_rng(int(t0.timestamp()))
+
+    nbody = int(hours * 3600 / rate)
+    seconds = np.arange(nbody) * rate + rng.uniform(0.0, 1e-3, nbody)
+    epochs = t0 + pd.to_timedelta(seconds, unit="s")
+    quaternions = attitude_profile(seconds)
+
+    body_file = directory / f"ja3qbody{tag}"
+    with body_file.open("w") as out:
+        out.write("# synthetic qbody\n")
+        for epoch, q in zip(epochs, quaternions, strict=True):
+            out.write(
+                f"{epoch:%Y/%m/%d %H:%M:%S.%f} Q0 {q[0]:.15e} x Q1 {q[1]:.15e} "
+                f"x Q2 {q[2]:.15e} x Q3 {q[3]:.15e}\n"
+            )
+
+    npanel = int(hours * 3600 / panel_rate)
+    panel_seconds = np.arange(npanel) * panel_rate
+    panel_epochs = t0 + pd.to_timedelta(panel_seconds, unit="s")
+    phase = 2.0 * np.pi * panel_seconds / 6745.0
+
+    panel_file = directory / f"ja3qsolp{tag}"
+    with panel_file.open("w") as out:
+        for epoch, lp, rp in zip(
+            panel_epochs, np.sin(phase), np.cos(phase), strict=True
+        ):
+            out.write(f"{epoch:%Y/%m/%d %H:%M:%S.%f} LP {lp:.10f} x RP {rp:.10f}\n")
+
+    return [body_file, panel_file]
+
+
+@pytest.fixture
+def jason_files(tmp_path) -> list[Path]:
+    return write_jason_products(tmp_path / "raw")
+
+
+@pytest.fixture
+def jason_days(tmp_path) -> list[Path]:
+    """Three daily Jason-3 product pairs, each overlapping the next by 30 min."""
+
+    files: list[Path] = []
+
+    for day in ("2024-01-01", "2024-01-02", "2024-01-03"):
+        files.extend(
+            write_jason_products(
+                tmp_path / "raw", start=day, hours=24.5, rate=10.0, panel_rate=30.0
+            )
+        )
+
+    return files
@@ -0,0 +1,19 @@
+"""Helpers shared by the tests."""
+
+import numpy as np
+
+
+def attitude_profile(seconds: np.ndarray) -> np.ndarray:
+    """Scalar-first unit quaternions for a slow yaw-steering-like rotation."""
+
+    angle = 2.0 * np.pi * seconds / 6745.0
+    axis = np.array([0.6, 0.8, 0.0])
+
+    return np.column_stack(
+        [
+            np.cos(angle / 2.0),
+            axis[0] * np.sin(angle / 2.0),
+            axis[1] * np.sin(angle / 2.0),
+            axis[2] * np.sin(angle / 2.0),
+        ]
+    )
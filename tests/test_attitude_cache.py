@@ -0,0 +1,121 @@
+"""Tests for preprocessors.attitude_cache."""
+
+import os
+
+import numpy as np
+
+from preprocessors import attitude
+from preprocessors.attitude import preprocess_attitude
+from preprocessors.attitude_cache import ParsedFileCache
+
+
+def test_cached_run_matches_uncached_and_skips_parsing(
+    jason_files, tmp_path, monkeypatch
+):
+    cache_dir = tmp_path / "cache"
+
+    plain = preprocess_attitude("ja3", jason_files, output_file=tmp_path / "a.csv")
+    first = preprocess_attitude(
+        "ja3", jason_files, output_file=tmp_path / "b.csv", cache_dir=cache_dir
+    )
+
+    assert len(list(cache_dir.glob("*.npz"))) == 2
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cached product was parsed again")
+
+    monkeypatch.setattr(attitude, "read_attitude_file", fail)
+    second = preprocess_attitude(
+        "ja3", jason_files, output_file=tmp_path / "c.csv", cache_dir=cache_dir
+    )
+
+    assert first.read_bytes() == plain.read_bytes()
+    assert second.read_bytes() == plain.read_bytes()
+
+
+def test_modified_file_is_a_miss(tmp_path):
+    raw = tmp_path / "product"
+    raw.write_text("one")
+    cache = ParsedFileCache(tmp_path / "cache", version="1")
+    cache.put("ja3", raw, np.arange(3), np.zeros((3, 4)), ["q0", "q1", "q2", "q3"])
+
+    times, values, columns = cache.get("ja3", raw)
+    assert times.tolist() == [0, 1, 2]
+    assert columns == ["q0", "q1", "q2", "q3"]
+
+    assert ParsedFileCache(tmp_path / "cache", version="2").get("ja3", raw) is None
+
+    raw.write_text("other")
+    assert cache.get("ja3", raw) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    values = np.zeros((1000, 4))
+    files = []
+
+    for i in range(3):
+        raw = tmp_path / f"product{i}"
+        raw.write_text(str(i))
+        files.append(raw)
+
+    cache = ParsedFileCache(tmp_path / "cache", max_bytes=10**9)
+    for i, raw in enumerate(files):
+        cache.put("ja3", raw, np.arange(1000), values, ["q0", "q1", "q2", "q3"])
+        entry = cache._entry("ja3", raw)
+        os.utime(entry, ns=(i * 10**9, i * 10**9))
+
+    # Touch the oldest entry, then shrink the cache to two entries.
+    assert cache.get("ja3", files[0]) is not None
+    cache.max_bytes = 2 * cache._entry("ja3", files[0]).stat().st_size
+    cache.evict()
+
+    assert cache.get("ja3", files[0]) is not None
+    assert cache.get("ja3", files[1]) is None
+    assert cache.get("ja3", files[2]) is not None
+
+
+def test_directory_is_only_scanned_past_the_limit(tmp_path, monkeypatch):
+    values = np.zeros((1000, 4))
+    cache = ParsedFileCache(tmp_path / "cache", max_bytes=10**9)
+    scans = []
+    entries = cache._entries
+
+    def counted_entries():
+        scans.append(1)
+        return entries()
+
+    monkeypatch.setattr(cache, "_entries", counted_entries)
+
+    for i in range(4):
+        raw = tmp_path / f"product{i}"
+        raw.write_text(str(i))
+        cache.put("ja3", raw, np.arange(1000), values, ["q0", "q1", "q2", "q3"])
+
+    entry_size = cache._entry("ja3", raw).stat().st_size
+
+    assert len(scans) == 1
+    assert cache.size() == 4 * entry_size
+
+    # Past the limit the directory is scanned again and trimmed.
+    cache.max_bytes = 2 * entry_size
+    raw = tmp_path / "product4"
+    raw.write_text("4")
+    cache.put("ja3", raw, np.arange(1000), values, ["q0", "q1", "q2", "q3"])
+
+    assert len(scans) == 2
+    assert cache.size() == 2 * entry_size
+    assert len(list((tmp_path / "cache").iterdir())) == 2
+
+
+def test_failed_touch_is_still_a_hit(tmp_path, monkeypatch):
+    raw = tmp_path / "product"
+    raw.write_text("0")
+    cache = ParsedFileCache(tmp_path / "cache")
+    cache.put("ja3", raw, np.arange(3), np.zeros((3, 4)), ["q0", "q1", "q2", "q3"])
+
+    def read_only(*args, **kwargs):
+        raise PermissionError("read-only cache")
+
+    monkeypatch.setattr(os, "utime", read_only)
+
+    assert cache.get("ja3", raw) is not None
@@ -0,0 +1,105 @@
+"""Tests for preprocessors.attitude_interpolator."""
+
+import numpy as np
+import pytest
+
+from preprocessors.attitude import preprocess_attitude
+from preprocessors.attitude_interpolator import AttitudeInterpolator
+from preprocessors.attitude_output import read_binary_attitude
+from preprocessors.timescales import convert
+
+
+def _output_epochs(columns) -> np.ndarray:
+    days = columns["MJDay"].astype(np.int64) - 40587
+    return days * 86_400_000_000_000 + columns["NSecOfDay"]
+
+
+@pytest.fixture
+def binary_output(jason_files, tmp_path):
+    return preprocess_attitude(
+        "ja3",
+        jason_files,
+        output_file=tmp_path / "q.columns",
+        output_format="binary",
+        max_gap=30.0,
+    )
+
+
+def test_matches_preprocessed_output(jason_files, binary_output):
+    columns = read_binary_attitude(binary_output)
+    names = ["q0", "q1", "q2", "q3", "left_panel", "right_panel"]
+    expected = np.column_stack([columns[name] for name in names])
+
+    interpolator = AttitudeInterpolator.from_files("ja3", jason_files, max_gap=30.0)
+    result = interpolator.evaluate(_output_epochs(columns))
+
+    assert interpolator.columns[-1] == "right_panel"
+    assert np.array_equal(result, expected)
+
+
+def test_time_scales_and_order(jason_files):
+    interpolator = AttitudeInterpolator.from_files("ja3", jason_files)
+    utc = np.datetime64("2024-01-01T01:00:00", "ns") + np.array(
+        [7_000_000_000, 123_456_789, 3_600_000_000_000], dtype="timedelta64[ns]"
+    )
+
+    by_utc = interpolator.evaluate(utc, scale="utc")
+    by_tt = interpolator.evaluate(convert(utc, "utc", "tt"))
+    by_gpst = interpolator.evaluate(convert(utc, "utc", "gpst"), scale="gpst")
+    sorted_order = interpolator.evaluate(np.sort(utc), scale="utc")
+
+    assert np.array_equal(by_utc, by_tt)
+    assert np.array_equal(by_utc, by_gpst)
+    assert np.array_equal(by_utc[[1, 0, 2]], sorted_order)
+    assert interpolator.evaluate(utc[0], scale="utc").shape == (1, 6)
+
+
+def test_outside_span_is_nan(jason_files):
+    interpolator = AttitudeInterpolator.from_files("ja3", jason_files)
+    first, last = interpolator.span
+
+    result = interpolator.evaluate(
+        np.array([first - np.timedelta64(1, "s"), last + np.timedelta64(1, "s")])
+    )
+
+    assert np.isnan(result[:, :4]).all()
+
+
+# Archives store values to within half their quantum.
+@pytest.mark.parametrize(
+    "output_format, atol", [("csv", 1e-12), ("binary", 1e-12), ("archive", 1e-10)]
+)
+def test_from_output_reproduces_its_samples(jason_files, tmp_path, output_format, atol):
+    output = preprocess_attitude(
+        "ja3",
+        jason_files,
+        output_file=tmp_path / "q",
+        output_format=output_format,
+    )
+
+    interpolator = AttitudeInterpolator.from_output(output)
+    expected = AttitudeInterpolator.from_files("ja3", jason_files)
+    epochs = interpolator._times[::37]
+
+    assert np.allclose(
+        interpolator.evaluate(epochs), expected.evaluate(epochs), rtol=0, atol=atol
+    )
+
+
+@pytest.mark.parametrize(
+    "options", [{"partitioned": True}, {"output_format": "archive"}]
+)
+def test_from_day_indexed_output_reads_only_the_window(jason_days, tmp_path, options):
+    output = preprocess_attitude(
+        "ja3", jason_days, nsec=30.0, output_file=tmp_path / "days", **options
+    )
+    # From just before the end of the first TT day to the middle of the second.
+    start = np.datetime64("2024-01-01T23:59:50", "ns")
+    end = np.datetime64("2024-01-02T12:00:00", "ns")
+
+    window = AttitudeInterpolator.from_output(output, start=start, end=end)
+    whole = AttitudeInterpolator.from_output(output)
+    epochs = np.arange(start, end, np.timedelta64(7_300_000_001, "ns"))
+
+    assert window.span[0] < start and window.span[1] < np.datetime64("2024-01-03")
+    assert np.array_equal(window.evaluate(epochs), whole.evaluate(epochs))
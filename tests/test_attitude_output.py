@@ -0,0 +1,302 @@
+"""Tests for preprocessors.attitude_output."""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from preprocessors.attitude import preprocess_attitude
+from preprocessors.attitude_output import (
+    ARCHIVE_QUANTUM,
+    ArchiveWriter,
+    CsvWriter,
+    last_output_epoch,
+    read_archive,
+    read_binary_attitude,
+    read_partition_index,
+)
+from preprocessors.timescales import split_mjd
+
+
+def _pandas_csv(df: pd.DataFrame) -> bytes:
+    """The original pandas formatting of the CSV product."""
+
+    mjd_days, nsec_of_day = split_mjd(df.index.values)
+    df = df.copy()
+    df["MJDay"] = mjd_days
+    df["SecOfDay"] = nsec_of_day / 1e9
+    df = df.reset_index(drop=True).set_index(["MJDay", "SecOfDay"]).dropna()
+
+    return df.to_csv(sep=" ", float_format="%.12e", header=False).encode()
+
+
+def test_csv_writer_matches_pandas_formatting(tmp_path):
+    rng = np.random.default_rng(4)
+    rows = 40_000
+    index = pd.DatetimeIndex(
+        np.datetime64("2024-01-01T23:00:00", "ns")
+        + np.arange(rows) * np.timedelta64(250_000_000, "ns"),
+        name="date_time",
+    )
+    scale = 10.0 ** rng.integers(-300, 300, (rows, 1))
+    values = rng.normal(scale=scale, size=(rows, 6))
+    values[::97, 2] = np.nan
+    values[5, :] = [-0.0, 0.0, 1.0, -1.0, 5e-324, np.inf]
+    df = pd.DataFrame(values, index=index, columns=list("abcdef"))
+
+    with CsvWriter(tmp_path / "q.csv") as writer:
+        writer.write(df.iloc[:25_000])
+        writer.write(df.iloc[25_000:])
+
+    assert (tmp_path / "q.csv").read_bytes() == _pandas_csv(df)
+    assert writer.rows == df.dropna().shape[0]
+
+
+def test_csv_writer_rejects_other_columns(tmp_path):
+    index = pd.DatetimeIndex(
+        np.datetime64("2024-01-01", "ns") + np.arange(4) * np.timedelta64(1, "s"),
+        name="date_time",
+    )
+    df = pd.DataFrame(np.ones((4, 6)), index=index, columns=list("abcdef"))
+    output = tmp_path / "q.csv"
+
+    with pytest.raises(ValueError, match="same columns"):
+        with CsvWriter(output) as writer:
+            writer.write(df.iloc[:2])
+            writer.write(df.iloc[2:, :4])
+
+    assert not output.exists()
+
+    with CsvWriter(output) as writer:
+        writer.write(df.iloc[:2])
+
+    # Appending after the rows kept: the text only tells the column count.
+    with pytest.raises(ValueError, match="has 6 value columns, not 4"):
+        with CsvWriter(output, keep=output.stat().st_size) as writer:
+            writer.write(df.iloc[2:, :4])
+
+    with CsvWriter(output, keep=output.stat().st_size) as writer:
+        writer.write(df.iloc[2:])
+
+    assert writer.rows == 2
+    assert len(output.read_bytes().splitlines()) == 4
+
+
+def test_binary_output_matches_csv(jason_files, tmp_path):
+    kwargs = dict(
+        nsec=5.0,
+        start=datetime.datetime(2024, 1, 1, 1),
+        end=datetime.datetime(2024, 1, 1, 3),
+    )
+
+    csv = preprocess_attitude(
+        "ja3", jason_files, output_file=tmp_path / "q.csv", **kwargs
+    )
+    binary = preprocess_attitude(
+        "ja3",
+        jason_files,
+        output_file=tmp_path / "q.columns",
+        output_format="binary",
+        **kwargs,
+    )
+
+    text = np.loadtxt(csv, ndmin=2)
+    columns = read_binary_attitude(binary)
+
+    assert isinstance(columns["q0"], np.memmap)
+    assert columns["header"]["rows"] == len(text)
+    assert columns["header"]["satellite"] == "ja3"
+    assert np.array_equal(columns["MJDay"], text[:, 0])
+    assert np.array_equal(columns["NSecOfDay"] / 1e9, text[:, 1])
+
+    names = ["q0", "q1", "q2", "q3", "left_panel", "right_panel"]
+    values = np.column_stack([columns[name] for name in names])
+    # The CSV keeps 13 significant digits; the binary columns are exact.
+    assert np.allclose(values, text[:, 2:], rtol=1e-12, atol=1e-15)
+
+
+def test_chunked_binary_output_matches_full_run(jason_days, tmp_path):
+    full = preprocess_attitude(
+        "ja3", jason_days, output_file=tmp_path / "full", output_format="binary"
+    )
+    chunked = preprocess_attitude(
+        "ja3",
+        jason_days,
+        output_file=tmp_path / "chunked",
+        output_format="binary",
+        chunk_days=0.3,
+    )
+
+    a = read_binary_attitude(full, mmap=False)
+    b = read_binary_attitude(chunked, mmap=False)
+
+    assert a["header"] == b["header"]
+    for column in a["header"]["columns"]:
+        assert np.array_equal(a[column["name"]], b[column["name"]])
+    assert not (tmp_path / "chunked.part").exists()
+
+
+def test_rejects_unknown_output_format(jason_files, tmp_path):
+    with pytest.raises(ValueError):
+        preprocess_attitude(
+            "ja3", jason_files, output_file=tmp_path / "q", output_format="parquet"
+        )
+
+
+@pytest.mark.parametrize("output_format", ["csv", "binary"])
+def test_partitioned_output_matches_single_output(jason_days, tmp_path, output_format):
+    kwargs = dict(nsec=30.0, output_format=output_format, chunk_days=0.3)
+    single = preprocess_attitude(
+        "ja3", jason_days, output_file=tmp_path / "single", **kwargs
+    )
+    partitioned = preprocess_attitude(
+        "ja3", jason_days, output_file=tmp_path / "days", partitioned=True, **kwargs
+    )
+
+    index = read_partition_index(partitioned)
+    parts = [partitioned / entry["file"] for entry in index["partitions"]]
+
+    mjds = [entry["mjd"] for entry in index["partitions"]]
+
+    assert mjds == [60310, 60311, 60312, 60313]
+    assert last_output_epoch(partitioned, output_format) == last_output_epoch(
+        single, output_format
+    )
+
+    if output_format == "csv":
+        assert b"".join(part.read_bytes() for part in parts) == single.read_bytes()
+        assert index["rows"] == len(single.read_bytes().splitlines())
+    else:
+        for name in ["MJDay", "NSecOfDay", "q0", "right_panel"]:
+            assert (
+                b"".join((part / f"{name}.bin").read_bytes() for part in parts)
+                == (single / f"{name}.bin").read_bytes()
+            )
+
+        assert index["rows"] == read_binary_attitude(single)["header"]["rows"]
+
+    for entry, part in zip(index["partitions"], parts, strict=True):
+        mjd, nsec_of_day = _output_epochs(part, output_format)
+
+        assert (mjd == entry["mjd"]).all()
+        assert nsec_of_day[0] == entry["first_nsec_of_day"]
+        assert nsec_of_day[-1] == entry["last_nsec_of_day"]
+        assert len(mjd) == entry["rows"]
+
+
+def _output_epochs(path, output_format):
+    if output_format == "binary":
+        columns = read_binary_attitude(path)
+        return columns["MJDay"], columns["NSecOfDay"]
+
+    data = np.loadtxt(path, ndmin=2)
+    return data[:, 0], np.round(data[:, 1] * 1e9).astype(np.int64)
+
+
+def test_partitioned_updates_rewrite_only_changed_days(jason_days, tmp_path):
+    full = preprocess_attitude(
+        "ja3", jason_days, output_file=tmp_path / "full", partitioned=True
+    )
+
+    output = tmp_path / "days"
+    preprocess_attitude("ja3", jason_days[:4], output_file=output, partitioned=True)
+    first_day = (output / "60310.csv").stat()
+
+    preprocess_attitude(
+        "ja3", jason_days[2:], output_file=output, partitioned=True, append=True
+    )
+
+    assert (output / "60310.csv").stat().st_mtime_ns == first_day.st_mtime_ns
+    assert read_partition_index(output) == read_partition_index(full)
+
+    for entry in read_partition_index(full)["partitions"]:
+        assert (output / entry["file"]).read_bytes() == (
+            full / entry["file"]
+        ).read_bytes()
+
+    # A rebuild that changes nothing leaves every partition alone.
+    before = {part.name: part.stat().st_mtime_ns for part in output.glob("*.csv")}
+    preprocess_attitude("ja3", jason_days, output_file=output, partitioned=True)
+
+    assert {
+        part.name: part.stat().st_mtime_ns for part in output.glob("*.csv")
+    } == before
+
+    # A shorter rebuild drops the partitions it no longer covers.
+    preprocess_attitude("ja3", jason_days[:2], output_file=output, partitioned=True)
+
+    assert sorted(part.name for part in output.glob("*.csv")) == [
+        "60310.csv",
+        "60311.csv",
+    ]
+
+
+@pytest.mark.parametrize("codec", ["lzma", "zlib"])
+def test_archive_round_trips_gaps_and_irregular_steps(tmp_path, codec):
+    rng = np.random.default_rng(7)
+    nanoseconds = np.cumsum(rng.choice([1, 1, 1, 1, 2, 3600], size=200_000)) * 10**9
+    nanoseconds[::1000] += rng.integers(1, 10**6, size=200)
+    index = pd.DatetimeIndex(np.datetime64("2024-01-01T00:00:00", "ns") + nanoseconds)
+    values = np.column_stack(
+        [np.sin(np.arange(len(index)) / 5000.0), rng.uniform(-180.0, 180.0, len(index))]
+    )
+    df = pd.DataFrame(values, index=index, columns=["q0", "left_panel"])
+
+    path = tmp_path / "q.qar"
+    with ArchiveWriter(path, metadata={"satellite": "ja3"}, codec=codec) as writer:
+        for first in range(0, len(df), 30_000):
+            writer.write(df.iloc[first : first + 30_000])
+
+    columns = read_archive(path)
+    mjd_days, nsec_of_day = split_mjd(index.values)
+
+    assert columns["header"]["rows"] == writer.rows == len(df)
+    assert columns["header"]["satellite"] == "ja3"
+    assert np.array_equal(columns["MJDay"], mjd_days)
+    assert np.array_equal(columns["NSecOfDay"], nsec_of_day)
+    for position, name in enumerate(df.columns):
+        error = np.abs(columns[name] - values[:, position])
+        assert error.max() <= ARCHIVE_QUANTUM / 2 + 1e-13
+
+
+def test_archive_output_reads_only_the_days_asked_for(jason_days, tmp_path):
+    kwargs = dict(nsec=30.0, chunk_days=0.3)
+    binary = preprocess_attitude(
+        "ja3", jason_days, output_file=tmp_path / "b", output_format="binary", **kwargs
+    )
+    archive = preprocess_attitude(
+        "ja3", jason_days, output_file=tmp_path / "q", output_format="archive", **kwargs
+    )
+
+    whole = read_archive(archive)
+    mjds = [day["mjd"] for day in whole["header"]["days"]]
+
+    assert mjds == [60310, 60311, 60312, 60313]
+    assert last_output_epoch(archive, "archive") == last_output_epoch(binary, "binary")
+
+    binary = read_binary_attitude(binary)
+    assert np.array_equal(whole["MJDay"], binary["MJDay"])
+    assert np.array_equal(whole["NSecOfDay"], binary["NSecOfDay"])
+    assert np.abs(whole["q2"] - binary["q2"]).max() <= ARCHIVE_QUANTUM / 2
+
+    # Noon of the second TT day up to its last epoch: one day block.
+    start = (60311 - 40587) * 86400 * 10**9 + 43200 * 10**9
+    end = start + 43170 * 10**9
+    window = read_archive(archive, start, end)
+
+    assert np.unique(window["MJDay"]).tolist() == [60311]
+    rows = whole["MJDay"] == 60311
+    assert np.array_equal(window["NSecOfDay"], whole["NSecOfDay"][rows])
+    assert np.array_equal(window["right_panel"], whole["right_panel"][rows])
+
+
+def test_archive_output_cannot_be_partitioned(jason_files, tmp_path):
+    with pytest.raises(ValueError):
+        preprocess_attitude(
+            "ja3",
+            jason_files,
+            output_file=tmp_path / "days",
+            output_format="archive",
+            partitioned=True,
+        )
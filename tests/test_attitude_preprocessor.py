@@ -0,0 +1,299 @@
+"""Tests for preprocessors.attitude."""
+
+import datetime
+
+import numpy as np
+import pytest
+
+from preprocessors.attitude import (
+    _fix_time,
+    _interpolate,
+    _window_mask,
+    preprocess_attitude,
+    read_attitude_file,
+)
+from preprocessors.metrics import RunMetrics
+
+
+def _read_output(path) -> np.ndarray:
+    return np.loadtxt(path, ndmin=2)
+
+
+def test_read_jason_body_file(jason_files):
+    df = read_attitude_file("ja3", jason_files[0])
+
+    assert list(df.columns) == ["q0", "q1", "q2", "q3", "date_time"]
+    assert df["date_time"].dtype == np.dtype("datetime64[ns]")
+    assert len(df) == 6 * 3600
+
+
+def test_output_grid_is_on_integer_interval_boundaries(jason_files, tmp_path):
+    output = preprocess_attitude(
+        "ja3",
+        jason_files,
+        nsec=5.0,
+        start=datetime.datetime(2024, 1, 1, 1),
+        end=datetime.datetime(2024, 1, 1, 3),
+        output_file=tmp_path / "qua_ja3.csv",
+    )
+
+    data = _read_output(output)
+    sod = data[:, 1]
+
+    assert data.shape[1] == 8
+    assert (data[:, 0] == 60310).all()
+    assert np.array_equal(sod, np.round(sod / 5.0) * 5.0)
+    assert np.all(np.diff(sod) == 5.0)
+    # 01:00 UTC is 01:01:09.184 TT; the first grid epoch is the next 5 s mark.
+    assert sod[0] == 3670.0
+    assert sod[-1] == 3 * 3600 + 65.0
+
+
+def test_interpolate_quaternions_stay_normalised(jason_files):
+    df = _fix_time("ja3", read_attitude_file("ja3", jason_files[0]))
+    out, times = _interpolate(df, 1.0)
+
+    assert times.dtype == np.int64
+    assert np.allclose(np.linalg.norm(out.to_numpy(), axis=1), 1.0)
+
+
+def test_interpolate_rejects_non_positive_interval(jason_files):
+    df = _fix_time("ja3", read_attitude_file("ja3", jason_files[0]))
+
+    with pytest.raises(ValueError):
+        _interpolate(df, 0.0)
+
+
+def test_max_gap_drops_epochs_inside_outages(jason_files, tmp_path):
+    body = jason_files[0]
+    lines = body.read_text().splitlines(keepends=True)
+    # Remove ten minutes of body samples starting one hour into the file.
+    body.write_text("".join(lines[: 1 + 3600] + lines[1 + 4200 :]))
+
+    output = preprocess_attitude(
+        "ja3", jason_files, nsec=5.0, output_file=tmp_path / "gap.csv", max_gap=30.0
+    )
+    sod = _read_output(output)[:, 1]
+
+    assert np.diff(sod).max() > 550.0
+
+
+@pytest.mark.parametrize("chunk_days", [1.0, 0.3, 0.05, 10.0])
+def test_chunked_output_matches_full_run(jason_days, tmp_path, chunk_days):
+    kwargs = dict(
+        nsec=5.0,
+        start=datetime.datetime(2024, 1, 1, 6),
+        end=datetime.datetime(2024, 1, 3, 18),
+    )
+
+    full = preprocess_attitude(
+        "ja3", jason_days, output_file=tmp_path / "full.csv", **kwargs
+    )
+    chunked = preprocess_attitude(
+        "ja3",
+        jason_days,
+        output_file=tmp_path / "chunked.csv",
+        chunk_days=chunk_days,
+        **kwargs,
+    )
+
+    assert chunked.read_bytes() == full.read_bytes()
+    assert not (tmp_path / "chunked.csv.part").exists()
+
+
+@pytest.mark.parametrize("chunk_days", [None, 0.3])
+def test_parallel_parsing_matches_serial(jason_days, tmp_path, chunk_days):
+    serial = preprocess_attitude(
+        "ja3", jason_days, output_file=tmp_path / "serial.csv", chunk_days=chunk_days
+    )
+    parallel = preprocess_attitude(
+        "ja3",
+        jason_days,
+        output_file=tmp_path / "parallel.csv",
+        chunk_days=chunk_days,
+        jobs=2,
+    )
+
+    assert parallel.read_bytes() == serial.read_bytes()
+
+
+def test_rejects_non_positive_jobs(jason_files, tmp_path):
+    with pytest.raises(ValueError):
+        preprocess_attitude("ja3", jason_files, output_file=tmp_path / "q.csv", jobs=0)
+
+
+@pytest.mark.parametrize(
+    "output_format, chunk_days",
+    [("csv", None), ("csv", 0.3), ("binary", None), ("archive", None)],
+)
+def test_append_matches_full_rebuild(jason_days, tmp_path, output_format, chunk_days):
+    kwargs = dict(nsec=5.0, output_format=output_format, chunk_days=chunk_days)
+    start = datetime.datetime(2024, 1, 1, 6)
+
+    full = preprocess_attitude(
+        "ja3", jason_days, output_file=tmp_path / "full", start=start, **kwargs
+    )
+
+    appended = tmp_path / "appended"
+    preprocess_attitude(
+        "ja3",
+        jason_days[:4],
+        output_file=appended,
+        start=start,
+        end=datetime.datetime(2024, 1, 2, 12),
+        **kwargs,
+    )
+    # The daily run only passes the products of the last two days.
+    preprocess_attitude(
+        "ja3", jason_days[2:], output_file=appended, append=True, **kwargs
+    )
+
+    if output_format != "binary":
+        assert appended.read_bytes() == full.read_bytes()
+    else:
+        for name in ["MJDay", "NSecOfDay", "q0", "q3", "right_panel"]:
+            assert (appended / f"{name}.bin").read_bytes() == (
+                full / f"{name}.bin"
+            ).read_bytes()
+
+
+def test_append_needs_products_reaching_the_output_end(jason_days, tmp_path):
+    output = tmp_path / "q.csv"
+    preprocess_attitude("ja3", jason_days[:2], output_file=output)
+    before = output.read_bytes()
+
+    with pytest.raises(ValueError):
+        preprocess_attitude("ja3", jason_days[4:], output_file=output, append=True)
+
+    assert output.read_bytes() == before
+
+
+@pytest.mark.parametrize("chunk_days", [None, 0.3])
+def test_multi_rate_output_matches_single_rate_runs(jason_days, tmp_path, chunk_days):
+    kwargs = dict(start=datetime.datetime(2024, 1, 1, 6), chunk_days=chunk_days)
+    intervals = [1.0, 30.0, 7.0]
+
+    outputs = preprocess_attitude(
+        "ja3",
+        jason_days,
+        nsec=intervals,
+        output_file=[tmp_path / f"multi_{nsec:g}.csv" for nsec in intervals],
+        **kwargs,
+    )
+
+    assert len(outputs) == len(intervals)
+
+    for nsec, output in zip(intervals, outputs, strict=True):
+        single = preprocess_attitude(
+            "ja3",
+            jason_days,
+            nsec=nsec,
+            output_file=tmp_path / f"single_{nsec:g}.csv",
+            **kwargs,
+        )
+
+        assert output.read_bytes() == single.read_bytes()
+
+
+def test_multi_rate_append_matches_full_rebuild(jason_days, tmp_path):
+    intervals = [1.0, 30.0]
+    full = preprocess_attitude(
+        "ja3",
+        jason_days,
+        nsec=intervals,
+        output_file=[tmp_path / "full_1.csv", tmp_path / "full_30.csv"],
+    )
+
+    appended = [tmp_path / "appended_1.csv", tmp_path / "appended_30.csv"]
+    preprocess_attitude("ja3", jason_days[:4], nsec=intervals, output_file=appended)
+    preprocess_attitude(
+        "ja3", jason_days[2:], nsec=intervals, output_file=appended, append=True
+    )
+
+    for output, reference in zip(appended, full, strict=True):
+        assert output.read_bytes() == reference.read_bytes()
+
+
+def test_multi_rate_needs_one_output_file_per_interval(jason_files, tmp_path):
+    with pytest.raises(ValueError):
+        preprocess_attitude(
+            "ja3", jason_files, nsec=[1.0, 30.0], output_file=[tmp_path / "q.csv"]
+        )
+
+    with pytest.raises(ValueError):
+        preprocess_attitude(
+            "ja3",
+            jason_files,
+            nsec=[1.0, 30.0],
+            output_file=[tmp_path / "q.csv", tmp_path / "q.csv"],
+        )
+
+
+def test_window_mask_keeps_padding_samples_in_input_order():
+    times = np.array([50, 10, 40, 20, 60, 30, 80, 70, 90, 0])
+
+    keep = _window_mask(times, (35, 55))
+
+    assert times[keep].tolist() == [50, 40, 20, 60, 30, 70]
+    assert _window_mask(times, (None, 15)).sum() == 4
+    assert _window_mask(times, (100, None)).sum() == 2
+
+
+@pytest.mark.parametrize("chunk_days", [None, 0.3])
+def test_range_is_pushed_down_to_reading(jason_days, tmp_path, chunk_days):
+    start = datetime.datetime(2024, 1, 2, 3, 0, 7)
+    end = datetime.datetime(2024, 1, 2, 9)
+
+    full = preprocess_attitude(
+        "ja3", jason_days, nsec=5.0, output_file=tmp_path / "full.csv"
+    )
+    metrics = RunMetrics()
+    window = preprocess_attitude(
+        "ja3",
+        jason_days,
+        nsec=5.0,
+        start=start,
+        end=end,
+        output_file=tmp_path / "window.csv",
+        chunk_days=chunk_days,
+        metrics=metrics,
+    )
+
+    rows = _read_output(full)
+    # MJD 60311 is 2024-01-02; the range is UTC, the output TT (+69.184 s).
+    sod = (rows[:, 0] - 60311) * 86400.0 + rows[:, 1] - 69.184
+    inside = (sod >= 3 * 3600 + 7) & (sod < 9 * 3600)
+
+    assert np.array_equal(_read_output(window), rows[inside])
+    # Only the 2880 body and panel samples of the range, and a few around it,
+    # are kept out of 35280.
+    assert metrics.stages["fix_time"].rows_in < 2880 + 50
+    assert metrics.stages["interpolate"].rows_out < inside.sum() + 2
+
+
+def test_products_outside_the_range_are_not_read(jason_days, tmp_path):
+    start = datetime.datetime(2024, 1, 1, 3)
+    end = datetime.datetime(2024, 1, 1, 9)
+
+    metrics = RunMetrics()
+    window = preprocess_attitude(
+        "ja3",
+        jason_days,
+        nsec=5.0,
+        start=start,
+        end=end,
+        output_file=tmp_path / "window.csv",
+        metrics=metrics,
+    )
+    # The products of the first two days, without those of the third.
+    expected = preprocess_attitude(
+        "ja3",
+        jason_days[:4],
+        nsec=5.0,
+        start=start,
+        end=end,
+        output_file=tmp_path / "expected.csv",
+    )
+
+    assert metrics.stages["read"].calls == 4
+    assert np.array_equal(_read_output(window), _read_output(expected))
@@ -0,0 +1,171 @@
+"""Tests for preprocessors.attitude_service."""
+
+import shutil
+import threading
+from http.client import HTTPConnection
+
+import numpy as np
+import pytest
+
+from preprocessors.attitude import preprocess_attitude
+from preprocessors.attitude_interpolator import AttitudeInterpolator
+from preprocessors.attitude_service import (
+    AttitudeClient,
+    AttitudeService,
+    AttitudeSource,
+    make_server,
+)
+
+
+@pytest.fixture
+def serve():
+    """Serve an AttitudeService in a thread; yields a function making a client."""
+
+    servers = []
+
+    def start(service, **address):
+        server = make_server(service, **address)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+
+        if "socket_path" in address:
+            return AttitudeClient(socket_path=address["socket_path"])
+
+        return AttitudeClient(port=server.server_address[1])
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_client_gets_the_interpolated_attitude(jason_files, tmp_path, serve):
+    output = preprocess_attitude(
+        "ja3", jason_files, output_file=tmp_path / "q", output_format="binary"
+    )
+    service = AttitudeService([AttitudeSource("JA3", output=output, max_gap=30.0)])
+    expected = AttitudeInterpolator.from_output(output, max_gap=30.0)
+    epochs = np.datetime64("2024-01-01T00:59:00", "ns") + np.arange(
+        0, 3 * 3600 * 10**9, 1_234_567_891
+    ).astype("timedelta64[ns]")
+
+    with serve(service, port=0) as client:
+        for scale in ["tt", "utc"]:
+            result = client.evaluate("ja3", epochs, scale=scale)
+
+            assert np.array_equal(
+                result, expected.evaluate(epochs, scale=scale), equal_nan=True
+            )
+
+        status = client.satellites()["ja3"]
+
+        assert status["columns"][-1] == "right_panel"
+        assert status["loads"] == 1
+        assert client.evaluate("ja3", epochs[:0]).shape == (0, 6)
+
+        # Errors are reported and the connection stays usable.
+        with pytest.raises(ValueError, match="404"):
+            client.evaluate("s6a", epochs)
+        with pytest.raises(ValueError, match="400"):
+            client.evaluate("ja3", epochs, scale="gmt")
+
+        assert client.evaluate("ja3", epochs[:3]).shape == (3, 6)
+
+
+def test_new_products_are_loaded_on_the_next_check(jason_days, tmp_path, serve):
+    served = tmp_path / "served"
+    served.mkdir()
+
+    for file in jason_days[:2]:
+        shutil.copy(file, served)
+
+    service = AttitudeService(
+        [AttitudeSource("ja3", products=[str(served / "ja3q*")], max_gap=60.0)]
+    )
+    epoch = np.datetime64("2024-01-02T12:00:00", "ns")
+
+    with serve(service, socket_path=tmp_path / "s") as client:
+        assert np.isnan(client.evaluate("ja3", epoch, scale="utc")[:, :4]).all()
+
+        service.check()
+        assert client.satellites()["ja3"]["loads"] == 1
+
+        for file in jason_days[2:4]:
+            shutil.copy(file, served)
+        service.check()
+
+        expected = AttitudeInterpolator.from_files("ja3", jason_days[:4], max_gap=60.0)
+
+        assert client.satellites()["ja3"]["loads"] == 2
+        assert np.array_equal(
+            client.evaluate("ja3", epoch, scale="utc"),
+            expected.evaluate(epoch, scale="utc"),
+        )
+
+
+def test_failed_reload_keeps_the_loaded_attitude(jason_files, tmp_path):
+    output = preprocess_attitude("ja3", jason_files, output_file=tmp_path / "q.csv")
+    service = AttitudeService([AttitudeSource("ja3", output=output)])
+    before = service.interpolator("ja3")
+
+    output.write_text("not an attitude output\n")
+    service.check()
+
+    assert service.interpolator("ja3") is before
+
+
+def test_queries_go_on_while_a_satellite_reloads(jason_files, tmp_path):
+    output = preprocess_attitude("ja3", jason_files, output_file=tmp_path / "q.csv")
+    source = AttitudeSource("ja3", output=output)
+    service = AttitudeService([source])
+    before = service.interpolator("ja3")
+    loading, release = threading.Event(), threading.Event()
+    load = source.load
+
+    def slow_load():
+        loading.set()
+        release.wait(10.0)
+        return load()
+
+    source.load = slow_load
+    reload = threading.Thread(target=service.reload, args=("ja3", True))
+    reload.start()
+
+    try:
+        assert loading.wait(10.0)
+        assert service.interpolator("ja3") is before
+        assert service.status()["ja3"]["loads"] == 1
+    finally:
+        release.set()
+        reload.join()
+
+    assert service.interpolator("ja3") is not before
+    assert service.status()["ja3"]["loads"] == 2
+
+
+def test_invalid_content_length_is_a_bad_request(jason_files, tmp_path):
+    output = preprocess_attitude("ja3", jason_files, output_file=tmp_path / "q.csv")
+    server = make_server(AttitudeService([AttitudeSource("ja3", output=output)]), 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        for length in ["eight", "-8"]:
+            connection = HTTPConnection(*server.server_address, timeout=10.0)
+            connection.putrequest("POST", "/attitude/ja3")
+            connection.putheader("Content-Length", length)
+            connection.endheaders()
+
+            assert connection.getresponse().status == 400
+
+            connection.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_sources_need_exactly_one_origin(tmp_path):
+    with pytest.raises(ValueError):
+        AttitudeSource("ja3")
+    with pytest.raises(ValueError):
+        AttitudeSource("ja3", output=tmp_path / "q.csv", products=["ja3q*"])
@@ -0,0 +1,123 @@
+"""Tests for preprocessors.backfill."""
+
+import datetime
+import os
+import shutil
+
+import pytest
+
+from preprocessors.attitude import preprocess_attitude
+from preprocessors.backfill import backfill_attitude
+from preprocessors.metrics import RunMetrics
+
+START = datetime.datetime(2024, 1, 1, 2, 0, 3)
+END = datetime.datetime(2024, 1, 3, 21)
+
+
+@pytest.mark.parametrize(
+    "output_format, jobs, tolerance",
+    [("csv", None, None), ("csv", 2, None), ("binary", 2, None), ("csv", 2, 2e-4)],
+)
+def test_backfill_matches_serial_run(
+    jason_days, tmp_path, output_format, jobs, tolerance
+):
+    kwargs = dict(
+        nsec=5.0, start=START, end=END, output_format=output_format, tolerance=tolerance
+    )
+    serial = preprocess_attitude(
+        "ja3", jason_days, output_file=tmp_path / "serial", **kwargs
+    )
+    backfill = backfill_attitude(
+        "ja3",
+        jason_days,
+        output_file=tmp_path / "backfill",
+        chunk_days=0.35,
+        jobs=jobs,
+        **kwargs,
+    )
+
+    if output_format == "csv":
+        assert backfill.read_bytes() == serial.read_bytes()
+    else:
+        for name in ["MJDay", "NSecOfDay", "q0", "q3", "left_panel"]:
+            assert (backfill / f"{name}.bin").read_bytes() == (
+                serial / f"{name}.bin"
+            ).read_bytes()
+
+    assert not (tmp_path / "backfill.backfill").exists()
+
+
+@pytest.mark.parametrize("tolerance", [1e-2, 5e-2])
+def test_decimated_backfill_restarts_at_gaps(jason_days, tmp_path, tolerance):
+    # Outages in the body products: one within a chunk, one across the edge
+    # of the first two (10:24:03).
+    for file in jason_days:
+        if "qbody" in file.name:
+            lines = file.read_text().splitlines(keepends=True)
+            file.write_text(
+                "".join(
+                    line
+                    for line in lines
+                    if not line.startswith(
+                        ("2024/01/01 09:0", "2024/01/01 09:1", "2024/01/01 10:2")
+                    )
+                )
+            )
+
+    kwargs = dict(nsec=5.0, start=START, end=END, max_gap=60.0, tolerance=tolerance)
+    serial = preprocess_attitude(
+        "ja3", jason_days, output_file=tmp_path / "serial.csv", **kwargs
+    )
+    backfill = backfill_attitude(
+        "ja3",
+        jason_days,
+        output_file=tmp_path / "backfill.csv",
+        chunk_days=0.35,
+        **kwargs,
+    )
+
+    assert backfill.read_bytes() == serial.read_bytes()
+
+
+def test_backfill_resumes_from_completed_chunks(jason_days, tmp_path):
+    kwargs = dict(start=START, end=END, chunk_days=0.5)
+    output = tmp_path / "q.csv"
+
+    backfill_attitude("ja3", jason_days, output_file=output, keep_chunks=True, **kwargs)
+    expected = output.read_bytes()
+    output.unlink()
+
+    # As if the run had been interrupted before these two chunks were done.
+    work_dir = tmp_path / "q.csv.backfill"
+    shutil.rmtree(work_dir / "chunk_00002.columns")
+    shutil.rmtree(work_dir / "chunk_00004.columns")
+
+    metrics = RunMetrics()
+    backfill_attitude("ja3", jason_days, output_file=output, metrics=metrics, **kwargs)
+
+    assert output.read_bytes() == expected
+    assert metrics.stages["total"].calls == 2
+    assert not work_dir.exists()
+
+
+def test_backfill_refuses_a_work_dir_of_other_settings(jason_days, tmp_path):
+    output = tmp_path / "q.csv"
+    kwargs = dict(start=START, end=END, chunk_days=1.0, keep_chunks=True)
+
+    backfill_attitude("ja3", jason_days, output_file=output, **kwargs)
+
+    with pytest.raises(ValueError):
+        backfill_attitude("ja3", jason_days, output_file=output, nsec=10.0, **kwargs)
+
+
+def test_backfill_refuses_a_work_dir_of_changed_inputs(jason_days, tmp_path):
+    output = tmp_path / "q.csv"
+    kwargs = dict(start=START, end=END, chunk_days=1.0, keep_chunks=True)
+
+    backfill_attitude("ja3", jason_days, output_file=output, **kwargs)
+    # Rewritten in place with the same size, as a reprocessed product may be.
+    stat = jason_days[0].stat()
+    os.utime(jason_days[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    with pytest.raises(ValueError):
+        backfill_attitude("ja3", jason_days, output_file=output, **kwargs)
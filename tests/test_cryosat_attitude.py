@@ -0,0 +1,114 @@
+"""Tests for parsers.cryosat_attitude."""
+
+import io
+import tarfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from parsers import cryosat_attitude
+from parsers.cryosat_attitude import read_cryosat_quaternion_file
+from tests.helpers import attitude_profile
+
+NAME = "CS_OPER_AUX_PROQUA_20240101T000000_20240101T010000_0001"
+
+
+def _eef_text(samples: int, reference: str = "TAI=") -> bytes:
+    seconds = np.arange(samples, dtype=float) + 0.25
+    epochs = pd.Timestamp("2024-01-01") + pd.to_timedelta(seconds, unit="s")
+    records = [
+        f"<Quaternions><Time>{reference}{epoch:%Y-%m-%dT%H:%M:%S.%f}</Time>"
+        f"<Q1>{q[1]:.15e}</Q1><Q2>{q[2]:.15e}</Q2><Q3>{q[3]:.15e}</Q3>"
+        f"<Q4>{q[0]:.15e}</Q4></Quaternions>"
+        for epoch, q in zip(epochs, attitude_profile(seconds), strict=True)
+    ]
+    document = "\n".join(
+        [
+            '<?xml version="1.0"?>',
+            '<Earth_Explorer_File xmlns="http://eop-cfi.esa.int/CFI">',
+            "<Data_Block><List_of_Quaternions>",
+            *records,
+            "</List_of_Quaternions></Data_Block></Earth_Explorer_File>",
+        ]
+    )
+
+    return document.encode()
+
+
+def _archive(tmp_path, eef: bytes, members: dict[str, bytes] | None = None):
+    """A product archive, with ``members`` in place of the usual HDR and EEF."""
+
+    archive_file = tmp_path / f"{NAME}.TGZ"
+
+    if members is None:
+        members = {f"{NAME}.HDR": b"<Earth_Explorer_Header/>\n", f"{NAME}.EEF": eef}
+
+    with tarfile.open(archive_file, "w:gz") as archive:
+        for member, data in members.items():
+            info = tarfile.TarInfo(member)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+    return archive_file
+
+
+@pytest.mark.parametrize("reference", ["TAI=", ""])
+def test_reads_scalar_first_quaternions(tmp_path, reference):
+    samples = 100
+    result = read_cryosat_quaternion_file(
+        _archive(tmp_path, _eef_text(samples, reference))
+    )
+    seconds = np.arange(samples, dtype=float) + 0.25
+
+    assert list(result.columns) == ["date_time", "q0", "q1", "q2", "q3"]
+    assert result["date_time"].dtype == "datetime64[ns]"
+    np.testing.assert_array_equal(
+        result["date_time"].to_numpy(),
+        np.datetime64("2024-01-01", "ns") + (seconds * 1e9).astype("timedelta64[ns]"),
+    )
+    np.testing.assert_allclose(
+        result[["q0", "q1", "q2", "q3"]].to_numpy(),
+        attitude_profile(seconds),
+        rtol=0,
+        atol=1e-15,
+    )
+
+
+def test_streamed_blocks_match_a_single_block(tmp_path, monkeypatch):
+    eef = tmp_path / f"{NAME}.EEF"
+    eef.write_bytes(_eef_text(1000))
+    expected = read_cryosat_quaternion_file(eef)
+
+    # Blocks much smaller than the file and too little room up front, so the
+    # arrays grow while the archive member is streamed.
+    monkeypatch.setattr(cryosat_attitude, "PARSE_BLOCK_ROWS", 64)
+    monkeypatch.setattr(cryosat_attitude, "RECORD_BYTES_GUESS", 1 << 20)
+    result = read_cryosat_quaternion_file(_archive(tmp_path, eef.read_bytes()))
+
+    assert len(result) == 1000
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_archive_member_is_the_first_eef_by_name(tmp_path):
+    members = {
+        "B.EEF": _eef_text(10),
+        "A.xml": _eef_text(20),
+        "A.EEF": _eef_text(30),
+        "C.EEF": _eef_text(40),
+    }
+    result = read_cryosat_quaternion_file(_archive(tmp_path, b"", members))
+
+    assert len(result) == 30
+
+
+def test_unsupported_time_reference_raises(tmp_path):
+    with pytest.raises(ValueError, match="time reference 'UTC'"):
+        read_cryosat_quaternion_file(_archive(tmp_path, _eef_text(10, "UTC=")))
+
+
+def test_missing_tag_raises(tmp_path):
+    eef = _eef_text(10).replace(b"<Q3>", b"<Q9>", 1).replace(b"</Q3>", b"</Q9>", 1)
+
+    with pytest.raises(ValueError, match="tag 'Q3'"):
+        read_cryosat_quaternion_file(_archive(tmp_path, eef))
@@ -0,0 +1,106 @@
+"""Tests for preprocessors.decimation."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from preprocessors.attitude import preprocess_attitude
+from preprocessors.attitude_interpolator import AttitudeInterpolator
+from preprocessors.decimation import Decimator, quaternion_angle
+from preprocessors.interpolation import interp_linear, slerp
+from tests.helpers import attitude_profile
+
+
+def _wobbling_frame(rows: int = 20000) -> pd.DataFrame:
+    seconds = np.arange(rows, dtype=float)
+    quaternions = attitude_profile(seconds + 30.0 * np.sin(seconds / 900.0))
+    panels = np.column_stack([np.sin(seconds / 9000.0), np.cos(seconds / 7000.0)])
+    values = np.column_stack([quaternions, panels])
+    values[5000:5040] = np.nan
+
+    index = np.datetime64("2024-01-01", "ns") + (seconds * 1e9).astype("m8[ns]")
+
+    return pd.DataFrame(values, index=index)
+
+
+def _decimate(frame: pd.DataFrame, tolerance: float, chunk: int) -> pd.DataFrame:
+    decimator = Decimator(tolerance)
+    parts = [
+        decimator.push(frame.iloc[i : i + chunk]) for i in range(0, len(frame), chunk)
+    ]
+
+    return pd.concat([*parts, decimator.finish()])
+
+
+def test_kept_rows_reproduce_every_row():
+    frame = _wobbling_frame()
+    tolerance = 1e-6
+    kept = _decimate(frame, tolerance, len(frame))
+
+    times = frame.index.values.view("i8")
+    kept_times = kept.index.values.view("i8")
+
+    assert len(kept) < len(frame) / 5
+    assert set(kept_times) <= set(times)
+
+    for segment in [times < times[5000], times >= times[5040]]:
+        rows = frame.to_numpy()[segment]
+        used = np.isin(kept_times, times[segment])
+        source = kept.to_numpy()[used]
+
+        assert kept_times[used][[0, -1]].tolist() == times[segment][[0, -1]].tolist()
+
+        quaternions = slerp(kept_times[used], source[:, :4], times[segment])
+        panels = interp_linear(kept_times[used], source[:, 4:], times[segment])
+
+        assert quaternion_angle(quaternions, rows[:, :4]).max() <= tolerance
+        assert np.abs(panels - rows[:, 4:]).max() <= tolerance
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 333, 4999])
+def test_chunks_give_the_same_rows(chunk):
+    frame = _wobbling_frame(8000)
+
+    pd.testing.assert_frame_equal(
+        _decimate(frame, 1e-6, chunk), _decimate(frame, 1e-6, len(frame))
+    )
+
+
+def test_rejects_non_positive_tolerance():
+    with pytest.raises(ValueError):
+        Decimator(0.0)
+
+
+@pytest.mark.parametrize("chunk_days", [None, 0.3])
+def test_decimated_output(jason_files, tmp_path, chunk_days):
+    dense = preprocess_attitude(
+        "ja3", jason_files, nsec=1.0, output_file=tmp_path / "dense.csv"
+    )
+    decimated = preprocess_attitude(
+        "ja3",
+        jason_files,
+        nsec=1.0,
+        output_file=tmp_path / "decimated.csv",
+        chunk_days=chunk_days,
+        tolerance=1e-6,
+    )
+
+    dense_rows = np.loadtxt(dense, ndmin=2)
+    decimated_rows = np.loadtxt(decimated, ndmin=2)
+    epochs = AttitudeInterpolator.from_output(dense)._times
+    result = AttitudeInterpolator.from_output(decimated).evaluate(epochs)
+
+    assert len(decimated_rows) < len(dense_rows) / 2
+    assert quaternion_angle(result[:, :4], dense_rows[:, 2:6]).max() < 1.001e-6
+    assert np.abs(result[:, 4:] - dense_rows[:, 6:]).max() < 1.001e-6
+
+
+def test_decimated_output_cannot_be_appended(jason_files, tmp_path):
+    with pytest.raises(ValueError, match="appended"):
+        preprocess_attitude(
+            "ja3",
+            jason_files,
+            output_file=tmp_path / "q.csv",
+            append=True,
+            tolerance=1e-6,
+        )
@@ -0,0 +1,143 @@
+"""Tests for preprocessors.interpolation."""
+
+import numpy as np
+import pytest
+
+from preprocessors.interpolation import interp_linear, slerp
+
+
+def _random_walk_quaternions(n: int, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    q = np.cumsum(rng.normal(scale=0.05, size=(n, 4)), axis=0) + [1.0, 0, 0, 0]
+    return q / np.linalg.norm(q, axis=1, keepdims=True)
+
+
+def _same_rotation(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Angle-free comparison: q and -q describe the same rotation."""
+
+    return np.abs(np.abs(np.einsum("ij,ij->i", a, b)) - 1.0)
+
+
+def test_slerp_matches_scipy():
+    transform = pytest.importorskip("scipy.spatial.transform")
+
+    source_times = np.cumsum(np.random.default_rng(2).uniform(0.5, 2.0, 500))
+    quaternions = _random_walk_quaternions(500)
+    target_times = np.linspace(source_times[0], source_times[-1], 3001)
+
+    rotations = transform.Rotation.from_quat(quaternions, scalar_first=True)
+    expected = transform.Slerp(source_times, rotations)(target_times)
+
+    result = slerp(source_times, quaternions, target_times)
+
+    assert _same_rotation(result, expected.as_quat(scalar_first=True)).max() < 1e-12
+
+
+def test_hemisphere_flips_are_ignored():
+    quaternions = _random_walk_quaternions(50)
+    flipped = quaternions.copy()
+    flipped[1::2] *= -1.0
+    times = np.arange(50.0)
+    targets = np.linspace(0.0, 49.0, 400)
+
+    a = slerp(times, quaternions, targets)
+    b = slerp(times, flipped, targets)
+
+    assert _same_rotation(a, b).max() < 1e-12
+
+
+def test_result_does_not_depend_on_source_extent():
+    times = np.arange(0, 100_000_000_000, 1_000_000_000, dtype=np.int64)
+    quaternions = _random_walk_quaternions(100)
+    quaternions[::3] *= -1.0
+    targets = np.arange(50_000_000_000, 60_000_000_000, 250_000_000, dtype=np.int64)
+
+    full = slerp(times, quaternions, targets)
+    part = slerp(times[45:65], quaternions[45:65], targets)
+
+    assert np.array_equal(full, part)
+
+
+def test_max_gap_produces_nan():
+    times = np.array([0.0, 1.0, 2.0, 10.0, 11.0])
+    quaternions = _random_walk_quaternions(5)
+    targets = np.array([0.5, 2.0, 5.0, 10.0, 10.5])
+
+    result = slerp(times, quaternions, targets, max_gap=2.0)
+
+    assert np.isnan(result[2]).all()
+    assert not np.isnan(result[[0, 1, 3, 4]]).any()
+
+
+def test_out_of_span_targets_are_nan():
+    times = np.array([0.0, 1.0])
+    quaternions = _random_walk_quaternions(2)
+
+    result = slerp(times, quaternions, np.array([-0.1, 0.0, 1.0, 1.1]))
+
+    assert np.isnan(result[[0, 3]]).all()
+    assert np.allclose(result[1], quaternions[0])
+    assert np.allclose(result[2], quaternions[1])
+
+
+def test_preallocated_output_buffer():
+    times = np.arange(10.0)
+    quaternions = _random_walk_quaternions(10)
+    targets = np.linspace(0.0, 9.0, 25)
+    out = np.empty((25, 4))
+
+    result = slerp(times, quaternions, targets, out=out)
+
+    assert result is out
+
+
+def test_rejects_unsorted_source():
+    with pytest.raises(ValueError):
+        slerp(np.array([0.0, 2.0, 1.0]), _random_walk_quaternions(3), np.array([0.5]))
+
+
+def test_interp_linear_matches_pandas_index_interpolation():
+    pd = pytest.importorskip("pandas")
+
+    rng = np.random.default_rng(3)
+    source_times = np.cumsum(rng.uniform(0.5, 3.0, 200)) + 10.0
+    values = rng.normal(size=(200, 2))
+    target_times = np.linspace(0.0, source_times[-1] + 20.0, 1001)
+
+    numeric = pd.DataFrame(values, index=source_times)
+    target = pd.Index(target_times)
+    expected = (
+        numeric.reindex(numeric.index.union(target))
+        .sort_index()
+        .interpolate(method="index")
+        .loc[target]
+        .to_numpy()
+    )
+
+    result = interp_linear(source_times, values, target_times)
+
+    assert np.array_equal(np.isnan(result), np.isnan(expected))
+    assert np.nanmax(np.abs(result - expected)) < 1e-12
+
+
+def test_interp_linear_writes_into_column_slice():
+    block = np.zeros((5, 6))
+    times = np.array([0.0, 4.0])
+    values = np.array([[0.0, 10.0], [4.0, 50.0]])
+
+    interp_linear(times, values, np.arange(5.0), out=block[:, 4:])
+
+    assert np.array_equal(block[:, 4], np.arange(5.0))
+    assert np.array_equal(block[:, 5], 10.0 + 10.0 * np.arange(5.0))
+    assert not block[:, :4].any()
+
+
+def test_interp_linear_max_gap():
+    times = np.array([0.0, 1.0, 10.0])
+    values = np.array([0.0, 1.0, 10.0])
+
+    result = interp_linear(times, values, np.array([0.5, 5.0, 10.0]), max_gap=2.0)
+
+    assert result[0, 0] == 0.5
+    assert np.isnan(result[1, 0])
+    assert result[2, 0] == 10.0
@@ -0,0 +1,68 @@
+"""Tests for preprocessors.merge."""
+
+import numpy as np
+import pytest
+
+from preprocessors.merge import MergeStats, merge_runs
+
+
+def _random_runs(rng, count):
+    runs = []
+    start = 0
+
+    for _ in range(count):
+        start += int(rng.integers(-40, 60))
+        times = start + np.sort(rng.integers(0, 100, size=int(rng.integers(0, 50))))
+        if rng.random() < 0.3:
+            rng.shuffle(times)
+        values = rng.normal(size=(len(times), 3))
+        runs.append((times.astype(np.int64), values))
+
+    return runs
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_stable_sort_keeping_last(seed):
+    rng = np.random.default_rng(seed)
+    runs = _random_runs(rng, 12)
+
+    times = np.concatenate([t for t, _ in runs])
+    values = np.concatenate([v for _, v in runs])
+    order = np.argsort(times, kind="stable")
+    times, values = times[order], values[order]
+    last = np.append(times[1:] != times[:-1], True)
+
+    stats = MergeStats()
+    merged_times, merged_values = merge_runs(runs, stats)
+
+    assert np.array_equal(merged_times, times[last])
+    assert np.array_equal(merged_values, values[last])
+    assert stats.samples == len(times)
+    assert stats.merged == len(merged_times)
+
+
+def test_stats():
+    runs = [
+        (np.array([0, 1, 2, 3]), np.zeros((4, 1))),
+        (np.array([2, 3, 4, 5]), np.ones((4, 1))),
+        (np.array([7, 6, 6]), np.full((3, 1), 2.0)),
+    ]
+
+    stats = MergeStats()
+    times, values = merge_runs(runs, stats)
+
+    assert times.tolist() == [0, 1, 2, 3, 4, 5, 6, 7]
+    assert values[:, 0].tolist() == [0, 0, 1, 1, 1, 1, 2, 2]
+    assert stats == MergeStats(
+        runs=3,
+        samples=11,
+        duplicates=3,
+        unsorted_runs=1,
+        overlapping_runs=1,
+        overlap_samples=2,
+    )
+
+
+def test_nothing_to_merge():
+    with pytest.raises(ValueError):
+        merge_runs([(np.empty(0, dtype=np.int64), np.empty((0, 4)))])
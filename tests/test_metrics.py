@@ -0,0 +1,52 @@
+"""Tests for preprocessors.metrics."""
+
+import datetime
+import json
+
+import pytest
+
+from preprocessors.attitude import preprocess_attitude
+from preprocessors.metrics import RunMetrics
+
+
+@pytest.mark.parametrize("chunk_days, jobs", [(None, None), (0.3, 2)])
+def test_stages_of_a_run(jason_days, tmp_path, chunk_days, jobs):
+    metrics = RunMetrics(trace_memory=True)
+
+    output = preprocess_attitude(
+        "ja3",
+        jason_days,
+        output_file=tmp_path / "q.csv",
+        chunk_days=chunk_days,
+        jobs=jobs,
+        start=datetime.datetime(2024, 1, 1, 6),
+        metrics=metrics,
+    )
+    stages = metrics.stages
+    rows = len(output.read_text().splitlines())
+
+    assert stages["read"].calls == len(jason_days)
+    assert stages["read"].rows_out == stages["fix_time"].rows_in
+    assert stages["interpolate"].rows_out == stages["clip"].rows_in
+    assert stages["clip"].rows_out == stages["write"].rows_in
+    assert stages["write"].rows_out == rows
+    assert stages["total"].wall_sec >= stages["write"].wall_sec
+    assert all(stage.peak_bytes > 0 for stage in stages.values())
+    assert stages["total"].peak_bytes >= stages["interpolate"].peak_bytes
+    assert metrics.sources["body"].runs == len(jason_days) // 2
+    assert metrics.sources["panel"].runs == len(jason_days) // 2
+
+
+def test_metrics_json(jason_files, tmp_path):
+    metrics = RunMetrics()
+    preprocess_attitude(
+        "ja3", jason_files, output_file=tmp_path / "q.csv", metrics=metrics
+    )
+
+    metrics.write_json(tmp_path / "metrics.json", satellite="ja3")
+    result = json.loads((tmp_path / "metrics.json").read_text())
+
+    assert result["satellite"] == "ja3"
+    assert result["stages"]["write"]["peak_bytes"] is None
+    assert result["stages"]["write"]["rows_out"] > 0
+    assert set(result["sources"]["body"]) >= {"runs", "samples", "duplicates"}
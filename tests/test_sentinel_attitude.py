@@ -0,0 +1,86 @@
+"""Tests for parsers.sentinel_attitude."""
+
+import io
+import tarfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from parsers import sentinel_attitude
+from parsers.sentinel_attitude import read_sentinel_attitude_file
+from preprocessors.attitude import preprocess_attitude
+from tests.helpers import attitude_profile
+
+
+def _dbl_text(start: str, samples: int) -> bytes:
+    seconds = np.arange(samples, dtype=float)
+    epochs = pd.Timestamp(start) + pd.to_timedelta(seconds, unit="s")
+    lines = ["# synthetic Sentinel attitude"]
+
+    for epoch, q in zip(epochs, attitude_profile(seconds), strict=True):
+        lines.append(
+            f"{epoch:%Y-%m-%d %H:%M:%S.%f} {q[0]:.15e} {q[1]:.15e} "
+            f"{q[2]:.15e} {q[3]:.15e}"
+        )
+
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _add_member(archive: tarfile.TarFile, name: str, data: bytes) -> None:
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    archive.addfile(info, io.BytesIO(data))
+
+
+@pytest.fixture
+def sentinel_archive(tmp_path):
+    name = "S6A_OPER_AUX_PROQUA_20240101T000000_20240101T020000_0001"
+    members = {
+        f"{name}/{name}.HDR": b"<header/>\n",
+        f"{name}/{name}_1.DBL": _dbl_text("2024-01-01 00:00:00", 3600),
+        f"{name}/{name}_2.DBL": _dbl_text("2024-01-01 01:00:00", 3600),
+    }
+
+    archive_file = tmp_path / f"{name}.TGZ"
+    with tarfile.open(archive_file, "w:gz") as archive:
+        for member, data in members.items():
+            _add_member(archive, member, data)
+
+    return archive_file, members
+
+
+def test_archive_matches_plain_dbl_files(sentinel_archive, tmp_path, monkeypatch):
+    archive_file, members = sentinel_archive
+    # Small blocks, so members span many queued blocks.
+    monkeypatch.setattr(sentinel_attitude, "READ_AHEAD_BLOCK", 4096)
+
+    expected = []
+    for member, data in members.items():
+        if member.endswith(".DBL"):
+            dbl = tmp_path / member.rsplit("/", 1)[-1]
+            dbl.write_bytes(data)
+            expected.append(read_sentinel_attitude_file(dbl))
+
+    result = read_sentinel_attitude_file(archive_file)
+
+    pd.testing.assert_frame_equal(result, pd.concat(expected, ignore_index=True))
+
+
+def test_preprocessing_an_archive_writes_nothing_else(sentinel_archive, tmp_path):
+    archive_file, _ = sentinel_archive
+    before = sorted(tmp_path.rglob("*"))
+
+    output = preprocess_attitude("s6a", [archive_file], output_file=tmp_path / "q.csv")
+
+    assert sorted(tmp_path.rglob("*")) == sorted([*before, output])
+    assert np.loadtxt(output, ndmin=2).shape[1] == 6
+
+
+def test_corrupt_archive_raises(sentinel_archive, tmp_path):
+    archive_file, _ = sentinel_archive
+    truncated = tmp_path / "truncated.TGZ"
+    truncated.write_bytes(archive_file.read_bytes()[:2000])
+
+    with pytest.raises((tarfile.TarError, EOFError, OSError)):
+        read_sentinel_attitude_file(truncated)
@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+import tomllib
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Imported only by the code paths that use them, not at command start-up.
+HEAVY = ("pandas", "boto3", "requests", "matplotlib", "astropy", "scipy")
+
+
+def _entry_modules() -> list[str]:
+    with (ROOT / "pyproject.toml").open("rb") as fp:
+        scripts = tomllib.load(fp)["project"]["scripts"]
+
+    return sorted({target.split(":")[0] for target in scripts.values()})
+
+
+@pytest.mark.parametrize("module", _entry_modules())
+def test_entry_point_does_not_import_heavy_dependencies(module):
+    env = dict(os.environ, PYTHONPATH=str(ROOT / "src"))
+    code = (
+        f"import sys, {module}; "
+        f"print(' '.join(name for name in {HEAVY!r} if name in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.split() == []
@@ -0,0 +1,76 @@
+"""Tests for preprocessors.timescales."""
+
+import datetime
+
+import numpy as np
+import pytest
+
+from preprocessors.timescales import LEAP_SECONDS, convert, split_mjd, to_mjd, to_tt
+
+atime = pytest.importorskip("astropy.time")
+
+
+def _sample_epochs() -> np.ndarray:
+    """Epochs spread over 1980-2026, plus the instants around every leap second."""
+
+    rng = np.random.default_rng(42)
+    start = np.datetime64("1980-01-01T00:00:00", "ns").astype(np.int64)
+    stop = np.datetime64("2026-01-01T00:00:00", "ns").astype(np.int64)
+    epochs = rng.integers(start, stop, 2000)
+
+    for date, _ in LEAP_SECONDS:
+        edge = np.datetime64(date, "ns").astype(np.int64)
+        if edge >= start:
+            epochs = np.append(epochs, [edge - 1_000_000, edge, edge + 1_000_000])
+
+    return np.sort(epochs).view("datetime64[ns]")
+
+
+@pytest.mark.parametrize("scale", ["utc", "tai", "tt"])
+def test_to_tt_matches_astropy(scale):
+    epochs = _sample_epochs()
+
+    expected = atime.Time(epochs, scale=scale).tt.to_value(format="datetime64")
+    difference = (to_tt(epochs, scale) - expected).astype("timedelta64[ns]")
+
+    assert np.abs(difference.astype(np.int64)).max() <= 1_000
+
+
+def test_gpst_is_tai_minus_19s():
+    epochs = _sample_epochs()
+
+    tai = convert(epochs, "gpst", "tai")
+
+    assert ((tai - epochs) == np.timedelta64(19, "s")).all()
+
+
+@pytest.mark.parametrize("scale", ["utc", "gpst", "tai"])
+def test_round_trip(scale):
+    epochs = _sample_epochs()
+
+    assert (convert(to_tt(epochs, scale), "tt", scale) == epochs).all()
+
+
+def test_split_mjd_matches_astropy():
+    epochs = _sample_epochs()
+    mjd, nsec_of_day = split_mjd(epochs)
+    expected = atime.Time(epochs, scale="tt").mjd
+
+    assert (mjd == np.floor(expected)).all()
+    assert np.abs(to_mjd(epochs) - expected).max() < 1e-9
+
+
+def test_scalar_datetime_input():
+    tt = to_tt(datetime.datetime(2024, 1, 1), "utc")
+
+    assert tt == np.datetime64("2024-01-01T00:01:09.184", "ns")
+
+
+def test_utc_before_1972_is_rejected():
+    with pytest.raises(ValueError):
+        to_tt(np.datetime64("1970-06-01", "ns"), "utc")
+
+
+def test_unknown_scale_is_rejected():
+    with pytest.raises(ValueError):
+        to_tt(np.datetime64("2024-01-01", "ns"), "tcg")
@@ -0,0 +1,89 @@
+"""Tests for parsers.timestamps."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from parsers.timestamps import combine_date_time, parse_datetimes
+
+valid_pairs = [
+    ("2024/01/01", "00:00:00.000000"),
+    ("2024/02/29", "23:59:59.999999"),
+    ("1999/12/31", "12:34:56.5"),
+    ("2016/01/17", "06:07:08.123456789"),
+    ("2070/07/04", "01:02:03"),
+]
+
+invalid_pairs = [
+    ("2024/13/01", "00:00:00.000000"),
+    ("2024/01/01", "24:00:00.000000"),
+    ("2024/01/01", "00-00-00.000000"),
+    ("2024/O1/01", "00:00:00.000000"),
+    ("2024/01/01", "00:00:00.0x0000"),
+    # Days past the end of the month.
+    ("2024/02/30", "00:00:00.000000"),
+    ("2023/02/29", "00:00:00.000000"),
+    ("1900/02/29", "00:00:00.000000"),
+    ("2024/04/31", "00:00:00.000000"),
+    # Separators other than / or -, or mixed ones.
+    ("2024x01x01", "00:00:00.000000"),
+    ("2024/01-01", "00:00:00.000000"),
+    ("2024/01/01", "00:00:00x000000"),
+    # Trailing characters.
+    ("2024/01/011", "00:00:00"),
+    ("2024/01/01", "00:00:00.0Z1"),
+    # Leap seconds.
+    ("2016/12/31", "23:59:60.000000"),
+    # Fractions finer than a nanosecond.
+    ("2024/01/01", "00:00:00.1234567891"),
+]
+
+
+@pytest.mark.parametrize("date,time", valid_pairs)
+def test_combine_date_time_matches_pandas(date, time):
+    parsed = combine_date_time(
+        np.array([date], dtype=object),
+        np.array([time], dtype=object),
+    )
+    expected = pd.Timestamp(f"{date.replace('/', '-')}T{time}").to_datetime64()
+
+    assert parsed.dtype == np.dtype("datetime64[ns]")
+    assert parsed[0] == expected
+
+
+@pytest.mark.parametrize("date,time", invalid_pairs)
+def test_combine_date_time_rejects_malformed(date, time):
+    with pytest.raises(ValueError):
+        combine_date_time(np.array([date]), np.array([time]))
+
+
+def test_mixed_fraction_widths():
+    times = np.array(["00:00:01.5", "00:00:01.25", "00:00:01"], dtype=object)
+    dates = np.array(["2024/01/01"] * 3, dtype=object)
+    parsed = combine_date_time(dates, times)
+
+    offsets = (parsed - parsed[2]).astype("int64").tolist()
+
+    assert offsets == [500_000_000, 250_000_000, 0]
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2019-11-02T21:55:23.000000",
+        "2019-11-02 21:55:23.25",
+        "2019-11-02T21:55:23Z",
+        "2019-11-02T21:55:23.123456Z",
+        "2019-11-02T21:55:23.123456789",
+        "2019/11/02 21:55:23",
+    ],
+)
+def test_parse_datetimes(value):
+    expected = pd.Timestamp(value.rstrip("Z").replace("/", "-")).to_datetime64()
+    assert parse_datetimes([value])[0] == expected
+
+
+def test_empty_input():
+    empty = np.array([], dtype=object)
+
+    assert len(combine_date_time(empty, empty)) == 0